@@ -0,0 +1,317 @@
+import atexit
+import base64
+import glob
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+SERVER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "java", "CompileServer.java")
+
+# Arrancar la JVM y compilar CompileServer.java en modo código fuente tarda unos segundos
+STARTUP_TIMEOUT = 60
+DEFAULT_COMPILE_TIMEOUT = 120
+
+# Como mucho se muestran estos diagnósticos al agente
+MAX_DIAGNOSTICS = 50
+
+
+def compile_server_enabled():
+    """El servidor de compilación se puede desactivar con COMPILE_SERVER=0"""
+    return os.environ.get("COMPILE_SERVER", "1") != "0"
+
+
+def configured_compile_timeout():
+    """Segundos máximos por compilación (COMPILE_TIMEOUT)"""
+    value = os.environ.get("COMPILE_TIMEOUT", "")
+    try:
+        return int(value) if value else DEFAULT_COMPILE_TIMEOUT
+    except ValueError:
+        print(f"   ⚠️  COMPILE_TIMEOUT inválido ({value}), usando {DEFAULT_COMPILE_TIMEOUT}")
+        return DEFAULT_COMPILE_TIMEOUT
+
+
+def find_java():
+    """Ruta del ejecutable java de un JDK (JAVA_HOME o PATH), o None si no hay JDK"""
+    java_home = os.environ.get("JAVA_HOME")
+    if java_home:
+        java = os.path.join(java_home, "bin", "java")
+        if os.path.exists(os.path.join(java_home, "bin", "javac")) and os.access(java, os.X_OK):
+            return java
+    java = shutil.which("java")
+    # Un JRE sin javac no puede compilar: el servidor lo detectaría igualmente, pero así no se arranca
+    if java and shutil.which("javac"):
+        return java
+    return None
+
+
+def _source_roots(project_path):
+    roots = [
+        os.path.join(project_path, relative)
+        for relative in ("src/main/java", "src/test/java")
+        if os.path.isdir(os.path.join(project_path, relative))
+    ]
+    return roots or [project_path]
+
+
+def _compiled_outputs(project_path):
+    outputs = [
+        os.path.join(project_path, relative)
+        for relative in ("target/classes", "target/test-classes", "build/classes/java/main", "build/classes/java/test")
+        if os.path.isdir(os.path.join(project_path, relative))
+    ]
+    for pattern in ("target/dependency/*.jar", "lib/*.jar", "libs/*.jar"):
+        outputs.extend(sorted(glob.glob(os.path.join(project_path, pattern))))
+    return outputs
+
+
+def build_compile_paths(project_paths):
+    """(classpath, sourcepath) para compilar contra el proyecto objetivo y las librerías del framework.
+
+    El sourcepath permite a javac resolver las clases de los repos desde sus
+    fuentes; el classpath suma COMPILE_CLASSPATH y las salidas/jars ya
+    compilados que existan (target/classes, target/dependency, lib/...).
+    """
+    classpath = [entry for entry in os.environ.get("COMPILE_CLASSPATH", "").split(os.pathsep) if entry]
+    sourcepath = []
+    for project_path in project_paths:
+        if not os.path.isdir(project_path):
+            continue
+        sourcepath.extend(_source_roots(project_path))
+        classpath.extend(_compiled_outputs(project_path))
+    return os.pathsep.join(classpath), os.pathsep.join(sourcepath)
+
+
+class CompileDiagnostic:
+    __slots__ = ("kind", "path", "line", "column", "code", "message")
+
+    def __init__(self, kind, path, line, column, code, message):
+        self.kind = kind
+        self.path = path
+        self.line = line
+        self.column = column
+        self.code = code
+        self.message = message
+
+    def __str__(self):
+        location = f"{self.path}:{self.line}:{self.column}" if self.path else "javac"
+        return f"{location}: {self.kind.lower()}: {self.message}"
+
+
+class CompileResult:
+    __slots__ = ("success", "diagnostics", "elapsed_ms")
+
+    def __init__(self, success, diagnostics, elapsed_ms):
+        self.success = success
+        self.diagnostics = diagnostics
+        self.elapsed_ms = elapsed_ms
+
+
+class CompileServer:
+    """Cliente de un proceso javac persistente (agent_tools/java/CompileServer.java).
+
+    La JVM se arranca una vez (en segundo plano con start_async) y cada compilación
+    reutiliza el compilador caliente. Si no hay JDK o el proceso no arranca,
+    available queda en False y unavailable_reason explica el motivo: las
+    herramientas deben degradar a la validación estructural.
+    """
+
+    def __init__(self, java=None, compile_timeout=None):
+        self.java = java or find_java()
+        self.compile_timeout = compile_timeout or configured_compile_timeout()
+        self.java_version = None
+        self.unavailable_reason = None if self.java else "no se encontró un JDK (JAVA_HOME o java/javac en el PATH)"
+        self.compilations = 0
+        self._process = None
+        self._lines = None
+        self._output_dir = None
+        self._stderr = None
+        self._lock = threading.Lock()
+        # Sin arranque en curso: compile() arranca el proceso si hace falta
+        self._started = threading.Event()
+        self._started.set()
+
+    @property
+    def available(self):
+        return self.unavailable_reason is None
+
+    def start_async(self):
+        """Arranca la JVM en segundo plano para que la primera compilación ya la encuentre caliente"""
+        if not self.available:
+            return
+        self._started.clear()
+        threading.Thread(target=self._start_locked, name="autoqa-javac-start", daemon=True).start()
+
+    def _start_locked(self):
+        with self._lock:
+            self._start()
+
+    def _start(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        try:
+            self._output_dir = self._output_dir or tempfile.mkdtemp(prefix="autoqa-javac-")
+            self._stderr = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+            self._process = subprocess.Popen(
+                [self.java, "-XX:+UseSerialGC", "-Xshare:auto", SERVER_SOURCE],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr,
+                text=True, encoding="utf-8", bufsize=1,
+            )
+            self._lines = queue.Queue()
+            threading.Thread(target=self._read_output, args=(self._process, self._lines), daemon=True).start()
+            header = self._next_line(STARTUP_TIMEOUT)
+            if header is None or not header.startswith("READY\t"):
+                reason = header.split("\t", 1)[-1] if header else self._stderr_tail() or "no respondió al arrancar"
+                self._stop()
+                self.unavailable_reason = f"el servidor javac no arrancó: {reason}"
+                return
+            self.java_version = header.split("\t", 1)[1]
+            print(f"☕ Servidor javac listo (Java {self.java_version})")
+        except OSError as e:
+            self.unavailable_reason = f"no se pudo ejecutar {self.java}: {e}"
+        finally:
+            self._started.set()
+
+    @staticmethod
+    def _read_output(process, lines):
+        for line in process.stdout:
+            lines.put(line.rstrip("\n"))
+        lines.put(None)
+
+    def _next_line(self, timeout):
+        try:
+            return self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _stderr_tail(self):
+        if self._stderr is None:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read()[-500:].strip()
+
+    def compile(self, sources, classpath="", sourcepath=""):
+        """Compila {ruta: contenido} y devuelve un CompileResult (None si no hay servidor disponible)"""
+        self._started.wait(STARTUP_TIMEOUT)
+        with self._lock:
+            if not self.available:
+                return None
+            self._start()
+            if not self.available:
+                return None
+
+            options = ["-d", self._output_dir, "-proc:none", "-implicit:none", "-encoding", "UTF-8", "-Xmaxerrs", "500"]
+            if classpath:
+                options += ["-classpath", classpath]
+            if sourcepath:
+                options += ["-sourcepath", sourcepath]
+            request = ["COMPILE"]
+            request.extend(f"OPTION\t{option}" for option in options)
+            request.extend(
+                f"SOURCE\t{path}\t{base64.b64encode(content.encode('utf-8')).decode('ascii')}"
+                for path, content in sources.items()
+            )
+            request.append("END")
+
+            started = time.perf_counter()
+            try:
+                self._process.stdin.write("\n".join(request) + "\n")
+                self._process.stdin.flush()
+            except OSError as e:
+                self._stop()
+                raise RuntimeError(f"el servidor javac terminó inesperadamente: {e}")
+
+            diagnostics = []
+            while True:
+                remaining = self.compile_timeout - (time.perf_counter() - started)
+                line = self._next_line(max(0.1, remaining))
+                if line is None:
+                    # Sin respuesta a tiempo o proceso muerto: se reinicia en la próxima compilación
+                    self._stop()
+                    raise RuntimeError(f"el servidor javac no respondió en {self.compile_timeout}s")
+                if line.startswith("DIAG\t"):
+                    _, kind, path, line_number, column, code, message = line.split("\t", 6)
+                    diagnostics.append(CompileDiagnostic(
+                        kind, path, int(line_number), int(column), code,
+                        base64.b64decode(message).decode("utf-8"),
+                    ))
+                elif line.startswith("DONE\t"):
+                    _, success, elapsed_ms = line.split("\t")
+                    self.compilations += 1
+                    return CompileResult(success == "true", diagnostics, int(elapsed_ms))
+
+    def _stop(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                process.stdin.write("QUIT\n")
+                process.stdin.flush()
+                process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+    def shutdown(self):
+        with self._lock:
+            self._stop()
+            if self._output_dir:
+                shutil.rmtree(self._output_dir, ignore_errors=True)
+                self._output_dir = None
+
+
+def format_compile_result(result, requested_paths, external_prefixes=()):
+    """Texto para el agente: diagnósticos de los archivos pedidos y aviso de dependencias ausentes"""
+    requested = {os.path.abspath(path) for path in requested_paths}
+    shown = []
+    missing_dependencies = set()
+    other_files = 0
+    for diagnostic in result.diagnostics:
+        if diagnostic.code == "compiler.err.doesnt.exist":
+            package = diagnostic.message.split("package ", 1)[-1].split(" ", 1)[0]
+            if package.startswith(tuple(prefix.rstrip(".") for prefix in external_prefixes)):
+                missing_dependencies.add(package)
+                continue
+        if diagnostic.path and os.path.abspath(diagnostic.path) not in requested:
+            other_files += 1
+            continue
+        shown.append(diagnostic)
+
+    errors = sum(1 for diagnostic in shown if diagnostic.kind == "ERROR")
+    lines = [
+        f"Compilación con javac ({result.elapsed_ms} ms): "
+        f"{'OK' if result.success else 'con errores'}, {errors} error(es) en los archivos indicados"
+    ]
+    lines.extend(str(diagnostic) for diagnostic in shown[:MAX_DIAGNOSTICS])
+    if len(shown) > MAX_DIAGNOSTICS:
+        lines.append(f"... y {len(shown) - MAX_DIAGNOSTICS} diagnósticos más")
+    if other_files:
+        lines.append(f"({other_files} diagnósticos en otros archivos del proyecto omitidos)")
+    if missing_dependencies:
+        lines.append(
+            "⚠️  Dependencias externas no disponibles en el classpath (configura COMPILE_CLASSPATH); "
+            "los errores derivados de ellas pueden ser falsos positivos: " + ", ".join(sorted(missing_dependencies))
+        )
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+
+
+def get_compile_server():
+    """Servidor compartido de la ejecución; arranca en segundo plano la primera vez"""
+    global _server
+    if _server is None:
+        _server = CompileServer()
+        if compile_server_enabled():
+            _server.start_async()
+        else:
+            _server.unavailable_reason = "desactivado con COMPILE_SERVER=0"
+        atexit.register(_server.shutdown)
+    return _server
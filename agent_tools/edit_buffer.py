@@ -0,0 +1,286 @@
+import os
+import stat
+import tempfile
+
+
+class _BufferedFile:
+    __slots__ = ("path", "content", "base_signature", "dirty", "edits", "write_error")
+
+    def __init__(self, path, content, base_signature):
+        self.path = path
+        self.content = content
+        # (mtime_ns, tamaño) del archivo en disco al cargarlo; None si no existía
+        self.base_signature = base_signature
+        self.dirty = False
+        self.edits = 0
+        # Último error de escritura ya reportado (se reintenta en cada flush sin repetir el aviso)
+        self.write_error = None
+
+
+def _disk_signature(path):
+    try:
+        file_stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (file_stat.st_mtime_ns, file_stat.st_size)
+
+
+def atomic_write(path, content):
+    """Escribe content en path de forma atómica (archivo temporal en el mismo directorio + os.replace)"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        # mkstemp crea el archivo con 0600: aplicar los permisos por defecto según la umask
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class EditResult:
+    """Resultado de una edición: aplicada o con el motivo del conflicto"""
+
+    __slots__ = ("index", "file_path", "applied", "message")
+
+    def __init__(self, index, file_path, applied, message):
+        self.index = index
+        self.file_path = file_path
+        self.applied = applied
+        self.message = message
+
+    def __str__(self):
+        return f"{'✅' if self.applied else '❌'} #{self.index} {self.file_path}: {self.message}"
+
+
+class WriteClaims:
+    """Registro compartido de qué sesión edita cada archivo cuando varias sesiones trabajan a la vez.
+
+    El primer buffer que crea o edita un archivo se queda con él; las demás
+    sesiones reciben un conflicto en lugar de pisar sus cambios.
+    """
+
+    def __init__(self):
+        self._owners = {}
+        # (ruta, sesión que no pudo editarla, dueño), una vez por ruta y sesión aunque reintente
+        self.conflicts = []
+        self._reported = set()
+
+    def claim(self, path, owner):
+        """Reserva path para owner; devuelve el dueño anterior si es otra sesión, o None"""
+        absolute_path = os.path.abspath(path)
+        current = self._owners.setdefault(absolute_path, owner)
+        if current == owner:
+            return None
+        if (absolute_path, owner) not in self._reported:
+            self._reported.add((absolute_path, owner))
+            self.conflicts.append((path, owner, current))
+        return current
+
+
+class EditBuffer:
+    """Buffer de escritura diferida para los archivos que edita el agente durante una ejecución.
+
+    Las creaciones y reemplazos se aplican en memoria y se escriben a disco de
+    forma atómica en flush() (en cada checkpoint y al terminar). Las lecturas de
+    las herramientas ven el contenido del buffer. Antes de escribir se comprueba
+    que el archivo no cambió en disco desde que se cargó; si cambió, se informa
+    del conflicto y no se sobrescribe.
+
+    Las rutas se normalizan a absolutas al entrar (como en WriteClaims), así que
+    ./x/A.java y x/A.java comparten el mismo buffer.
+    """
+
+    def __init__(self, on_flush=None, claims=None, owner=None):
+        self._files = {}
+        # Se llama con la ruta de cada archivo escrito (p. ej. para invalidar cachés de lectura)
+        self.on_flush = on_flush
+        # Con varias sesiones concurrentes, WriteClaims compartido y el identificador de esta sesión
+        self.claims = claims
+        self.owner = owner
+        self.flushed_files = 0
+        self.conflicted_paths = set()
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def _load(self, path):
+        buffered = self._files.get(path)
+        signature = _disk_signature(path)
+        # Un archivo sin cambios pendientes se recarga si cambió en disco
+        if buffered is not None and (buffered.dirty or buffered.base_signature == signature):
+            return buffered
+        if signature is None:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        buffered = self._files[path] = _BufferedFile(path, content, signature)
+        return buffered
+
+    def pending_content(self, path):
+        """Contenido pendiente de escribir de path, o None si no tiene cambios en el buffer"""
+        buffered = self._files.get(self._key(path))
+        if buffered is None or not buffered.dirty:
+            return None
+        return buffered.content
+
+    def read_text(self, path):
+        """Contenido actual de path: el del buffer si tiene cambios, si no el de disco"""
+        path = self._key(path)
+        pending = self.pending_content(path)
+        if pending is not None:
+            return pending
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def exists(self, path):
+        path = self._key(path)
+        return self.pending_content(path) is not None or os.path.exists(path)
+
+    @property
+    def touched_paths(self):
+        """Archivos creados o editados durante la ejecución (escritos o no)"""
+        return [path for path, buffered in self._files.items() if buffered.edits]
+
+    @property
+    def dirty_paths(self):
+        return [path for path, buffered in self._files.items() if buffered.dirty]
+
+    def _claim_conflict(self, path):
+        """Motivo del conflicto si otra sesión ya está editando path, o None"""
+        if self.claims is None:
+            return None
+        other = self.claims.claim(path, self.owner)
+        if other is None:
+            return None
+        self.conflicted_paths.add(path)
+        return f"el archivo lo está editando la sesión {other}"
+
+    def create(self, path, content):
+        """Crea o sobrescribe path en el buffer; devuelve un EditResult"""
+        key = self._key(path)
+        conflict = self._claim_conflict(key)
+        if conflict is not None:
+            return EditResult(1, path, False, conflict)
+        buffered = self._files.get(key)
+        if buffered is None:
+            buffered = self._files[key] = _BufferedFile(key, None, _disk_signature(key))
+        buffered.content = content
+        buffered.dirty = True
+        buffered.edits += 1
+        return EditResult(1, path, True, "creado")
+
+    def replace(self, path, old_string, new_string):
+        """Reemplaza todas las apariciones de old_string en path; devuelve un EditResult"""
+        return self.apply_edits([(path, old_string, new_string)])[0]
+
+    def apply_edits(self, edits):
+        """Aplica una lista de ediciones (ruta, old_string, new_string) en orden.
+
+        Las ediciones de un mismo archivo son atómicas: se aplican sobre una copia
+        de trabajo y, si alguna falla, no se aplica ninguna de ese archivo. Cada
+        edición se reporta por separado con su resultado o su conflicto.
+        """
+        working = {}
+        results = []
+        # Ruta normalizada de cada resultado, para agruparlos por archivo
+        result_keys = []
+        failed_paths = set()
+        for index, (path, old_string, new_string) in enumerate(edits, 1):
+            key = self._key(path)
+            result_keys.append(key)
+            if key in failed_paths:
+                results.append(EditResult(index, path, False, "no aplicada: otra edición del mismo archivo falló"))
+                continue
+            if key not in working:
+                conflict = self._claim_conflict(key)
+                if conflict is not None:
+                    results.append(EditResult(index, path, False, conflict))
+                    failed_paths.add(key)
+                    continue
+                try:
+                    buffered = self._load(key)
+                except (OSError, UnicodeDecodeError) as e:
+                    buffered = None
+                    load_error = f"no se pudo leer: {e}"
+                else:
+                    load_error = "el archivo no existe"
+                if buffered is None or buffered.content is None:
+                    results.append(EditResult(index, path, False, load_error))
+                    failed_paths.add(key)
+                    continue
+                working[key] = buffered.content
+
+            content = working[key]
+            if not old_string:
+                message = "old_string vacío"
+            elif old_string not in content:
+                message = "la cadena especificada no se encontró (quizá la cambió una edición anterior)"
+            else:
+                occurrences = content.count(old_string)
+                working[key] = content.replace(old_string, new_string)
+                results.append(EditResult(index, path, True, f"{occurrences} reemplazo(s)"))
+                continue
+            results.append(EditResult(index, path, False, message))
+            failed_paths.add(key)
+
+        for key, content in working.items():
+            if key in failed_paths:
+                continue
+            buffered = self._files[key]
+            buffered.content = content
+            buffered.dirty = True
+            buffered.edits += sum(1 for result_key in result_keys if result_key == key)
+
+        # Las ediciones ya aplicadas de un archivo que luego falló se revierten
+        for result, key in zip(results, result_keys):
+            if result.applied and key in failed_paths:
+                result.applied = False
+                result.message = "revertida: otra edición del mismo archivo falló"
+        return results
+
+    def flush(self):
+        """Escribe de forma atómica todos los archivos con cambios; devuelve (escritos, conflictos).
+
+        Cada conflicto se reporta una sola vez: si el archivo cambió en disco se
+        descartan los cambios del buffer (las lecturas vuelven a ver el disco), y
+        un error de escritura se reintenta en los siguientes flush sin volver a
+        reportarlo mientras sea el mismo.
+        """
+        written = []
+        conflicts = []
+        for path in self.dirty_paths:
+            buffered = self._files[path]
+            if _disk_signature(path) != buffered.base_signature:
+                conflicts.append(f"{path}: cambió en disco desde que se cargó; no se sobrescribe y se descartan los cambios")
+                self.conflicted_paths.add(path)
+                del self._files[path]
+                continue
+            try:
+                atomic_write(path, buffered.content)
+            except OSError as e:
+                message = f"{path}: error escribiendo: {e}"
+                if message != buffered.write_error:
+                    conflicts.append(message)
+                    buffered.write_error = message
+                self.conflicted_paths.add(path)
+                continue
+            buffered.base_signature = _disk_signature(path)
+            buffered.dirty = False
+            buffered.write_error = None
+            written.append(path)
+            if self.on_flush is not None:
+                self.on_flush(path)
+        self.flushed_files += len(written)
+        return written, conflicts
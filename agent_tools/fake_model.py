@@ -0,0 +1,301 @@
+import asyncio
+import json
+import os
+import random
+import time
+
+from agents import ComputerTool, FunctionTool, Model, ModelProvider
+from agents.items import ModelResponse
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputItem, ResponseStreamEvent
+from pydantic import TypeAdapter
+
+FAKE = "fake"
+
+DEFAULT_RANDOM_TURNS = 10
+
+# "wait" queda fuera por defecto porque el Computer duerme de verdad
+DEFAULT_COMPUTER_ACTIONS = ("screenshot", "click", "double_click", "move", "scroll", "type", "keypress", "drag")
+
+# Salidas de herramienta en el input: cada una cierra un turno del modelo
+_TOOL_OUTPUT_TYPES = ("function_call_output", "computer_call_output")
+
+_CHARS_PER_TOKEN = 4
+
+_stream_events = TypeAdapter(ResponseStreamEvent)
+_output_items = TypeAdapter(list[ResponseOutputItem])
+
+
+def fake_model_enabled():
+    """Modelo simulado activado con AUTOQA_MODEL_PROVIDER=fake"""
+    return os.environ.get("AUTOQA_MODEL_PROVIDER", "").strip().lower() == FAKE
+
+
+def load_fake_script(value=None):
+    """Guion del modelo simulado: JSON en línea o ruta a un archivo JSON (AUTOQA_FAKE_MODEL_SCRIPT).
+
+    {"steps": [...]} reproduce una secuencia fija de pasos:
+      {"tool": "read_file", "arguments": {"file_path": "..."}}
+      {"computer": {"type": "click", "x": 10, "y": 20}}
+      {"message": "texto final"}
+    {"random": {...}} genera llamadas aleatorias (deterministas por seed y turno):
+      turns (None = sin final, para agotar MAX_TURNS), tools (subconjunto de
+      herramientas), arguments ({herramienta: {argumento: valor}} fijos),
+      paths (valores para los argumentos con "path" en el nombre), computer_actions
+      (con "computer" en tools se incluye el ComputerTool).
+    latency_ms, ttft_ms y jitter_ms simulan la latencia de cada turno.
+    """
+    if value is None:
+        value = os.environ.get("AUTOQA_FAKE_MODEL_SCRIPT", "")
+    value = value.strip()
+    if not value:
+        return {"random": {}}
+    if not value.startswith("{"):
+        with open(value, 'r', encoding='utf-8') as f:
+            value = f.read()
+    script = json.loads(value)
+    if "steps" not in script and "random" not in script:
+        raise ValueError("El guion del modelo simulado necesita \"steps\" o \"random\"")
+    return script
+
+
+def _env_ms(name, default):
+    value = os.environ.get(name, "")
+    try:
+        return float(value) if value else default
+    except ValueError:
+        print(f"   ⚠️  {name} inválido ({value}), usando {default}")
+        return default
+
+
+def _estimate_tokens(value):
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def _completed_turns(input):
+    if isinstance(input, str):
+        return 0
+    return sum(
+        1 for item in input
+        if (item.get("type") if isinstance(item, dict) else getattr(item, "type", None)) in _TOOL_OUTPUT_TYPES
+    )
+
+
+def _resolve_schema(schema, root):
+    while "$ref" in schema:
+        schema = root.get("$defs", {}).get(schema["$ref"].rsplit("/", 1)[-1], {})
+    return schema
+
+
+class _ArgumentGenerator:
+    """Argumentos aleatorios válidos para el params_json_schema de una herramienta"""
+
+    def __init__(self, rng, paths):
+        self.rng = rng
+        self.paths = paths
+
+    def value(self, name, schema, root):
+        schema = _resolve_schema(schema, root)
+        if "anyOf" in schema:
+            options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+            return self.value(name, self.rng.choice(options or schema["anyOf"]), root)
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        kind = schema.get("type")
+        if kind == "object":
+            return self.object(schema, root)
+        if kind == "array":
+            return [self.value(name, schema.get("items", {}), root) for _ in range(self.rng.randint(1, 2))]
+        if kind == "integer":
+            return self.rng.randint(1, 50)
+        if kind == "number":
+            return round(self.rng.uniform(0, 50), 2)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "null":
+            return None
+        if "path" in name and self.paths:
+            return self.rng.choice(self.paths)
+        return f"{name}-{self.rng.randint(1, 999)}"
+
+    def object(self, schema, root):
+        properties = schema.get("properties", {})
+        required = schema.get("required", list(properties))
+        return {name: self.value(name, properties[name], root) for name in required if name in properties}
+
+
+class FakeModel(Model):
+    """Model sin red que responde con llamadas a herramientas guionizadas o aleatorias.
+
+    Sirve para medir el bucle del agente (Runner, herramientas, ComputerTool)
+    sin API: el turno se deduce de las salidas de herramienta que ya hay en el
+    input, así que el modelo no guarda estado y varias sesiones pueden
+    compartirlo. Cada turno emite response.created, un delta tras ttft_ms y
+    response.completed tras latency_ms (± jitter_ms), con un uso de tokens
+    estimado a partir del tamaño de la petición.
+    """
+
+    def __init__(self, model_name, script):
+        self.model_name = model_name
+        self.script = script
+        self.latency_ms = _env_ms("AUTOQA_FAKE_MODEL_LATENCY_MS", script.get("latency_ms", 0))
+        self.ttft_ms = _env_ms("AUTOQA_FAKE_MODEL_TTFT_MS", script.get("ttft_ms", 0))
+        self.jitter_ms = _env_ms("AUTOQA_FAKE_MODEL_JITTER_MS", script.get("jitter_ms", 0))
+        self.seed = script.get("seed", 0)
+
+    def _rng(self, turn):
+        return random.Random(f"{self.seed}:{turn}")
+
+    def _delays(self, turn):
+        """(segundos hasta el primer token, segundos restantes hasta completar) del turno"""
+        rng = self._rng(f"latency:{turn}")
+        latency = max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        ttft = min(latency, self.ttft_ms / 1000)
+        return ttft, latency - ttft
+
+    def simulated_latency_s(self, turn):
+        """Latencia simulada del turno (empezando en 0); el resto del tiempo del turno es del framework"""
+        return sum(self._delays(turn))
+
+    def _step(self, turn, tools):
+        if "steps" in self.script:
+            steps = self.script["steps"]
+            return steps[turn] if turn < len(steps) else {"message": f"Guion completado en {turn} turnos"}
+
+        config = self.script.get("random", {})
+        turns = config.get("turns", DEFAULT_RANDOM_TURNS)
+        if turns is not None and turn >= turns:
+            return {"message": f"Secuencia aleatoria completada en {turn} turnos"}
+        rng = self._rng(turn)
+        allowed = config.get("tools")
+        function_tools = [
+            tool for tool in tools
+            if isinstance(tool, FunctionTool) and (allowed is None or tool.name in allowed)
+        ]
+        computer_tools = [
+            tool for tool in tools
+            if isinstance(tool, ComputerTool) and (allowed is None or {"computer", tool.name} & set(allowed))
+        ]
+        candidates = function_tools + computer_tools
+        if not candidates:
+            return {"message": "No hay herramientas disponibles"}
+        tool = rng.choice(candidates)
+        if isinstance(tool, ComputerTool):
+            action = rng.choice(config.get("computer_actions", DEFAULT_COMPUTER_ACTIONS))
+            return {"computer": self._computer_action(rng, action, tool.computer.dimensions)}
+        arguments = _ArgumentGenerator(rng, config.get("paths", [])).object(
+            tool.params_json_schema, tool.params_json_schema,
+        )
+        arguments.update(config.get("arguments", {}).get(tool.name, {}))
+        return {"tool": tool.name, "arguments": arguments}
+
+    @staticmethod
+    def _computer_action(rng, action, dimensions):
+        width, height = dimensions
+
+        def point():
+            return {"x": rng.randrange(width), "y": rng.randrange(height)}
+
+        if action in ("click", "double_click", "move"):
+            return {"type": action, **point(), **({"button": "left"} if action == "click" else {})}
+        if action == "scroll":
+            return {"type": "scroll", **point(), "scroll_x": 0, "scroll_y": rng.choice((-3, 3))}
+        if action == "type":
+            return {"type": "type", "text": f"autoqa {rng.randint(1, 999)}"}
+        if action == "keypress":
+            return {"type": "keypress", "keys": rng.choice((["ENTER"], ["CTRL", "A"], ["TAB"]))}
+        if action == "drag":
+            return {"type": "drag", "path": [point(), point()]}
+        return {"type": action}
+
+    def _output(self, turn, step, tools):
+        item_id = f"fake_{turn}"
+        if "tool" in step:
+            if not any(isinstance(tool, FunctionTool) and tool.name == step["tool"] for tool in tools):
+                raise ValueError(f"El guion llama a la herramienta {step['tool']}, que el agente no tiene")
+            arguments = json.dumps(step.get("arguments", {}), ensure_ascii=False)
+            item = {
+                "type": "function_call", "id": item_id, "call_id": f"call_{item_id}",
+                "name": step["tool"], "arguments": arguments, "status": "completed",
+            }
+            delta = {"type": "response.function_call_arguments.delta", "item_id": item_id, "output_index": 0, "delta": arguments}
+        elif "computer" in step:
+            if not any(isinstance(tool, ComputerTool) for tool in tools):
+                raise ValueError("El guion usa el computer, pero el agente no tiene un ComputerTool")
+            item = {
+                "type": "computer_call", "id": item_id, "call_id": f"call_{item_id}",
+                "action": step["computer"], "pending_safety_checks": [], "status": "completed",
+            }
+            delta = None
+        else:
+            text = step.get("message", "")
+            item = {
+                "type": "message", "id": item_id, "role": "assistant", "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+            delta = {"type": "response.output_text.delta", "item_id": item_id, "output_index": 0, "content_index": 0, "delta": text}
+        return item, delta
+
+    def _response(self, turn, output, input_tokens, output_tokens, status):
+        return {
+            "id": f"fake_resp_{turn}_{time.monotonic_ns()}",
+            "object": "response",
+            "created_at": time.time(),
+            "model": self.model_name,
+            "status": status,
+            "output": output,
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+
+    def _turn(self, system_instructions, input, tools):
+        turn = _completed_turns(input)
+        step = self._step(turn, tools)
+        item, delta = self._output(turn, step, tools)
+        input_tokens = _estimate_tokens(system_instructions or "") + _estimate_tokens(input)
+        output_tokens = _estimate_tokens(item)
+        return turn, item, delta, input_tokens, output_tokens
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *, previous_response_id=None):
+        turn, item, _, input_tokens, output_tokens = self._turn(system_instructions, input, tools)
+        ttft, remaining = self._delays(turn)
+        await asyncio.sleep(ttft + remaining)
+        return ModelResponse(
+            output=_output_items.validate_python([item]),
+            usage=Usage(requests=1, input_tokens=input_tokens, output_tokens=output_tokens, total_tokens=input_tokens + output_tokens),
+            response_id=None,
+        )
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *, previous_response_id=None):
+        turn, item, delta, input_tokens, output_tokens = self._turn(system_instructions, input, tools)
+        ttft, remaining = self._delays(turn)
+        yield _stream_events.validate_python({
+            "type": "response.created", "response": self._response(turn, [], 0, 0, "in_progress"),
+        })
+        await asyncio.sleep(ttft)
+        if delta is not None:
+            yield _stream_events.validate_python(delta)
+        await asyncio.sleep(remaining)
+        yield _stream_events.validate_python({
+            "type": "response.completed",
+            "response": self._response(turn, [item], input_tokens, output_tokens, "completed"),
+        })
+
+
+class FakeModelProvider(ModelProvider):
+    """ModelProvider que sirve un FakeModel para cualquier nombre de modelo"""
+
+    def __init__(self, script=None):
+        self.script = script if script is not None else load_fake_script()
+
+    def get_model(self, model_name):
+        return FakeModel(model_name or FAKE, self.script)
@@ -0,0 +1,256 @@
+import bisect
+import mmap
+import os
+import re
+from collections import OrderedDict
+
+DEFAULT_MAX_CHARS = 20000
+
+# A partir de este tamaño el archivo se sirve con mmap en lugar de cargarlo entero
+MMAP_THRESHOLD = 256 * 1024
+
+CACHE_ENTRIES = 32
+CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+MAX_GREP_MATCHES = 50
+
+
+def configured_max_chars():
+    """Límite de caracteres devueltos por lectura (READ_FILE_MAX_CHARS)"""
+    value = os.environ.get("READ_FILE_MAX_CHARS", "")
+    try:
+        return int(value) if value else DEFAULT_MAX_CHARS
+    except ValueError:
+        print(f"   ⚠️  READ_FILE_MAX_CHARS inválido ({value}), usando {DEFAULT_MAX_CHARS}")
+        return DEFAULT_MAX_CHARS
+
+
+class _FileView:
+    """Contenido de un archivo en bytes (en memoria o mmap) con índice de líneas perezoso"""
+
+    __slots__ = ("path", "mtime_ns", "size", "data", "_mapped", "_line_starts", "_indexed_to")
+
+    def __init__(self, path, stat, data=None):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns if stat else None
+        self.size = stat.st_size if stat else len(data)
+        self._mapped = None
+        self._line_starts = [0]
+        self._indexed_to = 0
+        if data is not None:
+            self.data = data
+            return
+        with open(path, 'rb') as f:
+            if self.size >= MMAP_THRESHOLD:
+                self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.data = self._mapped
+            else:
+                self.data = f.read()
+
+    @property
+    def resident_bytes(self):
+        """Bytes que ocupa en memoria (las páginas de mmap las gestiona el sistema operativo)"""
+        return 0 if self._mapped is not None else len(self.data)
+
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def _index_lines(self, line_count=None):
+        """Extiende el índice de inicios de línea hasta line_count líneas (o hasta el final)"""
+        starts = self._line_starts
+        data = self.data
+        position = self._indexed_to
+        while position < self.size and (line_count is None or len(starts) <= line_count):
+            newline = data.find(b"\n", position)
+            if newline == -1 or newline + 1 >= self.size:
+                position = self.size
+                break
+            position = newline + 1
+            starts.append(position)
+        self._indexed_to = position
+
+    @property
+    def line_count(self):
+        self._index_lines()
+        return len(self._line_starts) if self.size else 0
+
+    def _line_offset(self, line_number):
+        """Offset del inicio de la línea (1-based); el tamaño del archivo si no existe"""
+        self._index_lines(line_number)
+        if line_number - 1 < len(self._line_starts):
+            return self._line_starts[line_number - 1]
+        return self.size
+
+    def decode(self, start, end):
+        return self.data[start:end].decode('utf-8', errors='replace')
+
+    def lines(self, start_line, end_line):
+        """Texto de las líneas start_line..end_line (1-based, inclusivas)"""
+        start = self._line_offset(start_line)
+        end = self._line_offset(end_line + 1)
+        return self.decode(start, end)
+
+    def known_line_count(self, line_number):
+        """Indexa hasta line_number; devuelve el total de líneas si ya se conoce, o None"""
+        self._index_lines(line_number)
+        return self.line_count if self._indexed_to >= self.size else None
+
+    def line_of(self, offset):
+        """Número de línea (1-based) que contiene el offset"""
+        self._index_lines()
+        return bisect.bisect_right(self._line_starts, offset)
+
+
+class FileReader:
+    """Lecturas acotadas de archivos para las herramientas del agente.
+
+    Soporta rangos de líneas y de bytes y búsqueda con contexto, siempre con un
+    límite de caracteres. Los archivos grandes se sirven con mmap, de modo que
+    un rango no carga el archivo completo. Las vistas se guardan en una caché LRU
+    pequeña validada por mtime y tamaño, así que releer un archivo que no cambió
+    no vuelve a tocar el disco.
+
+    overlay(path) puede devolver contenido aún no escrito en disco (p. ej. el de
+    un EditBuffer); si devuelve texto, se lee ese contenido en lugar del archivo.
+    """
+
+    def __init__(self, max_chars=None, cache_entries=CACHE_ENTRIES, cache_max_bytes=CACHE_MAX_BYTES, overlay=None):
+        self.max_chars = max_chars or configured_max_chars()
+        self.overlay = overlay
+        self.cache_entries = cache_entries
+        self.cache_max_bytes = cache_max_bytes
+        self._views = OrderedDict()
+        self._resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _view(self, path):
+        if self.overlay is not None:
+            pending = self.overlay(path)
+            if pending is not None:
+                return _FileView(path, None, pending.encode('utf-8'))
+        stat = os.stat(path)
+        # Misma clave que las rutas normalizadas de EditBuffer (invalidate tras escribir)
+        key = os.path.abspath(path)
+        view = self._views.get(key)
+        if view is not None and view.mtime_ns == stat.st_mtime_ns and view.size == stat.st_size:
+            self._views.move_to_end(key)
+            self.hits += 1
+            return view
+        if view is not None:
+            self.invalidate(key)
+
+        self.misses += 1
+        view = _FileView(path, stat)
+        self._views[key] = view
+        self._resident_bytes += view.resident_bytes
+        while len(self._views) > self.cache_entries or (
+            self._resident_bytes > self.cache_max_bytes and len(self._views) > 1
+        ):
+            _, evicted = self._views.popitem(last=False)
+            self._resident_bytes -= evicted.resident_bytes
+            evicted.close()
+        return view
+
+    def invalidate(self, path):
+        """Descarta la vista cacheada de un archivo (p. ej. después de escribirlo)"""
+        view = self._views.pop(os.path.abspath(path), None)
+        if view is not None:
+            self._resident_bytes -= view.resident_bytes
+            view.close()
+
+    def clear(self):
+        for path in list(self._views):
+            self.invalidate(path)
+
+    def _capped(self, text, hint):
+        if len(text) <= self.max_chars:
+            return text
+        return (
+            text[:self.max_chars]
+            + f"\n... [truncado: se muestran {self.max_chars} de {len(text)} caracteres; {hint}]"
+        )
+
+    def read(self, path):
+        """Contenido completo si cabe en el límite; si no, el principio y cómo seguir leyendo"""
+        view = self._view(path)
+        # Solo se decodifica el prefijo necesario (con margen para caracteres multibyte)
+        prefix_bytes = min(view.size, self.max_chars * 4)
+        text = view.decode(0, prefix_bytes)
+        if prefix_bytes == view.size and len(text) <= self.max_chars:
+            return text
+        return (
+            text[:self.max_chars]
+            + f"\n... [truncado: se muestran {self.max_chars} caracteres de un archivo de {view.size} bytes; "
+            f"usa read_file_lines(), read_file_bytes() o grep_file()]"
+        )
+
+    def read_lines(self, path, start_line, end_line):
+        """Líneas start_line..end_line (1-based, inclusivas; end_line <= 0 significa hasta el final)"""
+        view = self._view(path)
+        start_line = max(1, start_line)
+        # En archivos grandes solo se indexan las líneas hasta el final del rango
+        total = view.line_count if end_line <= 0 else view.known_line_count(end_line + 1)
+        if total is not None:
+            end_line = total if end_line <= 0 else min(end_line, total)
+        if start_line > end_line:
+            return f"Rango vacío: {path} tiene {total} líneas"
+        header = f"# {path} líneas {start_line}-{end_line}" + (f" de {total}\n" if total is not None else "\n")
+        return header + self._capped(
+            view.lines(start_line, end_line), "pide un rango de líneas más pequeño"
+        )
+
+    def read_bytes(self, path, offset, length):
+        """length bytes desde offset (acotado por el límite de caracteres)"""
+        view = self._view(path)
+        offset = max(0, offset)
+        length = min(length if length > 0 else self.max_chars, self.max_chars)
+        end = min(view.size, offset + length)
+        if offset >= view.size:
+            return f"Offset fuera de rango: {path} tiene {view.size} bytes"
+        header = f"# {path} bytes {offset}-{end} de {view.size}\n"
+        return header + view.decode(offset, end)
+
+    def grep(self, path, pattern, context_lines=2, max_matches=MAX_GREP_MATCHES):
+        """Líneas que coinciden con la expresión regular, con context_lines líneas alrededor"""
+        try:
+            regex = re.compile(pattern.encode('utf-8'), re.MULTILINE)
+        except re.error as e:
+            return f"Expresión regular inválida '{pattern}': {e}"
+        view = self._view(path)
+        context_lines = max(0, context_lines)
+
+        # Agrupar coincidencias cercanas en bloques de líneas contiguos
+        blocks = []
+        matched_lines = set()
+        truncated = False
+        for match in regex.finditer(view.data):
+            line = view.line_of(match.start())
+            if line in matched_lines:
+                continue
+            if len(matched_lines) >= max_matches:
+                truncated = True
+                break
+            matched_lines.add(line)
+            start, end = max(1, line - context_lines), line + context_lines
+            if blocks and start <= blocks[-1][1] + 1:
+                blocks[-1][1] = end
+            else:
+                blocks.append([start, end])
+
+        if not blocks:
+            return f"Sin coincidencias para '{pattern}' en {path}"
+
+        total = view.line_count
+        parts = [f"# {path}: {len(matched_lines)} líneas coinciden con '{pattern}'\n"]
+        for start, end in blocks:
+            end = min(end, total)
+            for number, text in enumerate(view.lines(start, end).splitlines(), start):
+                marker = ">" if number in matched_lines else " "
+                parts.append(f"{marker}{number:>6}: {text}\n")
+            parts.append("--\n")
+        if truncated:
+            parts.append(f"... [se muestran las primeras {max_matches} coincidencias]\n")
+        return self._capped("".join(parts), "usa un patrón más específico o menos contexto")
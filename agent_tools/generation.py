@@ -0,0 +1,667 @@
+import asyncio
+import os
+
+from agents import Agent, ModelSettings, Runner, function_tool
+from pydantic import BaseModel
+
+from agent_tools.compile_server import build_compile_paths, format_compile_result, get_compile_server
+from agent_tools.edit_buffer import WriteClaims
+from agent_tools.fake_model import fake_model_enabled
+from agent_tools.instructions import AUTO_REFLECTION_INSTRUCTIONS
+from agent_tools.replay import REPLAY, build_run_config, configured_replay_mode
+from agent_tools.session import (
+    AgentSession,
+    batch_summary_lines,
+    configured_batch_concurrency,
+    current_session,
+    load_prompts,
+)
+from agent_tools.telemetry import instrument_tools
+from analysis.context_builder import estimate_tokens
+from analysis.memory import MemoryProbe
+from analysis.parallel import get_analysis_engine
+from analysis.pipeline import analyze_workspace, create_context_enhanced_prompt
+from analysis.records import release_terms
+from analysis.symbols import format_class, format_method
+from analysis.validator import configured_external_prefixes, format_validation_report, validate_java_files
+
+DEFAULT_MODEL = "gpt-5-pro"
+DEFAULT_MAX_TURNS = 100
+DEFAULT_TARGET_PROJECT_PATH = "../template-models"
+
+
+class FileEdit(BaseModel):
+    file_path: str
+    old_string: str
+    new_string: str
+
+
+# Las escrituras del agente se acumulan en memoria (en el EditBuffer de su sesión) y se
+# vuelcan a disco de forma atómica en cada checkpoint y al terminar; las lecturas ven
+# el contenido pendiente
+def flush_pending_edits(reason):
+    """Escribe a disco los archivos modificados de la sesión actual y devuelve un resumen para el agente"""
+    written, conflicts = current_session().edit_buffer.flush()
+    if written:
+        print(f"💾 {len(written)} archivo(s) escritos en disco ({reason})")
+    for conflict in conflicts:
+        print(f"⚠️  Conflicto al escribir: {conflict}")
+    lines = [f"Archivos escritos en disco: {len(written)}"]
+    lines.extend(f"Conflicto: {conflict}" for conflict in conflicts)
+    return "\n".join(lines)
+
+
+def build_tools(workspace, compile_server, compile_classpath, compile_sourcepath):
+    """Herramientas del agente sobre el análisis compartido; cada llamada actúa sobre current_session()"""
+    symbol_index = workspace["symbol_index"]
+    lexical_index = workspace["lexical_index"]
+
+    # Herramientas del agente para trabajar con archivos
+    @function_tool
+    def create_java_file(file_path: str, content: str) -> str:
+        """Crea un archivo Java en la ruta especificada con el contenido proporcionado"""
+        try:
+            # El directorio y el archivo se crean al volcar el buffer (checkpoint o final)
+            result = current_session().edit_buffer.create(file_path, content)
+            if not result.applied:
+                return f"Error: {result.message}: {file_path}"
+
+            print(f"✅ Archivo Java creado: {file_path}")
+            return f"Archivo creado exitosamente: {file_path}"
+        except Exception as e:
+            error_msg = f"Error creando archivo {file_path}: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    def read_file(file_path: str) -> str:
+        """Lee el contenido de un archivo (los archivos grandes se truncan; usa read_file_lines o grep_file para ellos)"""
+        try:
+            content = current_session().file_reader.read(file_path)
+            print(f"📖 Archivo leído: {file_path}")
+            return content
+        except Exception as e:
+            error_msg = f"Error leyendo archivo {file_path}: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    def read_file_lines(file_path: str, start_line: int, end_line: int) -> str:
+        """Lee las líneas start_line..end_line (1-based, inclusivas) de un archivo; end_line 0 lee hasta el final"""
+        try:
+            content = current_session().file_reader.read_lines(file_path, start_line, end_line)
+            print(f"📖 Líneas {start_line}-{end_line} leídas: {file_path}")
+            return content
+        except Exception as e:
+            error_msg = f"Error leyendo archivo {file_path}: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    def read_file_bytes(file_path: str, offset: int, length: int) -> str:
+        """Lee length bytes de un archivo a partir de offset (útil para logs o archivos generados muy grandes)"""
+        try:
+            content = current_session().file_reader.read_bytes(file_path, offset, length)
+            print(f"📖 Bytes {offset}+{length} leídos: {file_path}")
+            return content
+        except Exception as e:
+            error_msg = f"Error leyendo archivo {file_path}: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    def grep_file(file_path: str, pattern: str, context_lines: int) -> str:
+        """Busca una expresión regular en un archivo y devuelve las líneas que coinciden con context_lines líneas de contexto"""
+        try:
+            content = current_session().file_reader.grep(file_path, pattern, context_lines)
+            print(f"🔎 grep_file('{pattern}'): {file_path}")
+            return content
+        except Exception as e:
+            error_msg = f"Error buscando en {file_path}: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    def replace_string_in_file(file_path: str, old_string: str, new_string: str) -> str:
+        """Reemplaza una cadena en un archivo existente"""
+        try:
+            result = current_session().edit_buffer.replace(file_path, old_string, new_string)
+            if not result.applied:
+                return f"Error: {result.message} en {file_path}"
+
+            print(f"✏️ Archivo modificado: {file_path}")
+            return f"Reemplazo exitoso en: {file_path}"
+        except Exception as e:
+            error_msg = f"Error modificando archivo {file_path}: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    def apply_edits(edits: list[FileEdit]) -> str:
+        """Aplica varias ediciones (file_path, old_string, new_string) en una sola llamada, en orden. Las ediciones de un mismo archivo se aplican todas o ninguna; devuelve el resultado de cada edición"""
+        try:
+            results = current_session().edit_buffer.apply_edits([(edit.file_path, edit.old_string, edit.new_string) for edit in edits])
+            applied = sum(1 for result in results if result.applied)
+            print(f"✏️ Ediciones en lote: {applied}/{len(results)} aplicadas")
+            return f"{applied}/{len(results)} ediciones aplicadas\n" + "".join(f"{result}\n" for result in results)
+        except Exception as e:
+            error_msg = f"Error aplicando ediciones: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    # Herramientas de consulta del índice de símbolos
+    @function_tool
+    def find_class(class_name: str) -> str:
+        """Busca una clase del proyecto objetivo o del framework y devuelve su archivo, líneas y firmas de métodos"""
+        matches = symbol_index.find_class(class_name)
+        print(f"🔎 find_class('{class_name}'): {len(matches)} resultados")
+        if not matches:
+            return f"No se encontró ninguna clase que coincida con '{class_name}'"
+        return "".join(format_class(entry) for entry in matches)
+
+    @function_tool
+    def find_method(method_name: str, class_name: str) -> str:
+        """Busca un método por nombre en el proyecto objetivo y el framework; class_name puede ir vacío para buscar en todas las clases"""
+        matches = symbol_index.find_method(method_name, class_name)
+        print(f"🔎 find_method('{method_name}', '{class_name}'): {len(matches)} resultados")
+        if not matches:
+            return f"No se encontró ningún método que coincida con '{method_name}'"
+        return "".join(format_method(entry, method) for entry, method in matches)
+
+    @function_tool
+    def list_package(package_name: str) -> str:
+        """Lista las clases de un paquete (y sus subpaquetes) del proyecto objetivo o del framework"""
+        entries = symbol_index.list_package(package_name)
+        print(f"🔎 list_package('{package_name}'): {len(entries)} clases")
+        if not entries:
+            return f"No se encontraron clases en el paquete '{package_name}'. Paquetes disponibles: {', '.join(symbol_index.packages)}"
+        shown = entries[:100]
+        result = "".join(format_class(entry, with_methods=False) for entry in shown)
+        if len(entries) > len(shown):
+            result += f"... y {len(entries) - len(shown)} clases más; usa un paquete más específico\n"
+        return result
+
+    @function_tool
+    def search_code(query: str, top_k: int) -> str:
+        """Busca por texto libre (BM25 sobre identificadores, métodos y comentarios) las clases más relevantes del proyecto objetivo y el framework"""
+        top_k = max(1, min(top_k or 10, 50))
+        results = lexical_index.search(query, top_k)
+        print(f"🔎 search_code('{query}'): {len(results)} resultados")
+        if not results:
+            return f"No se encontraron resultados para '{query}'"
+        return "".join(
+            f"{score:.2f} [{doc['source']}] {doc['title']} — {doc['id']}\n" for score, doc in results
+        )
+
+    # Herramientas adicionales para auto-reflexión
+    @function_tool
+    def create_checkpoint(checkpoint_name: str, current_progress: str, next_steps: str) -> str:
+        """Crea un checkpoint para auto-reflexión durante el proceso de generación"""
+        try:
+            checkpoint_content = f"""
+=== CHECKPOINT: {checkpoint_name} ===
+Timestamp: {asyncio.get_event_loop().time()}
+Progress: {current_progress}
+Next Steps: {next_steps}
+=== END CHECKPOINT ===
+"""
+            print(f"🔄 Checkpoint creado: {checkpoint_name}")
+            print(f"   📊 Progreso: {current_progress}")
+            print(f"   📋 Próximos pasos: {next_steps}")
+            flush_report = flush_pending_edits(f"checkpoint {checkpoint_name}")
+            return f"Checkpoint '{checkpoint_name}' creado exitosamente\n{flush_report}"
+        except Exception as e:
+            error_msg = f"Error creando checkpoint: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    async def validate_code_quality(file_paths: list[str]) -> str:
+        """Valida la estructura de archivos Java: llaves y paréntesis balanceados, literales cerrados, nombre de archivo, imports que existen en el proyecto o el framework y métodos que existen en las clases usadas. Con una lista vacía valida todos los archivos Java creados o editados en esta ejecución"""
+        try:
+            edit_buffer = current_session().edit_buffer
+            paths = file_paths or [path for path in edit_buffer.touched_paths if path.endswith(".java")]
+            if not paths:
+                return "No hay archivos Java creados o editados en esta ejecución"
+
+            sources = {}
+            missing = []
+            for path in paths:
+                if edit_buffer.exists(path):
+                    sources[path] = edit_buffer.read_text(path)
+                else:
+                    missing.append(path)
+
+            # La validación espera al pool de procesos: en un hilo, para que las demás sesiones sigan avanzando
+            report = await asyncio.to_thread(validate_java_files, sources, symbol_index, get_analysis_engine())
+            result = format_validation_report(report)
+            result += "".join(f"❌ {path}: archivo no encontrado\n" for path in missing)
+
+            failed = sum(1 for file_report in report.values() if file_report["errors"]) + len(missing)
+            print(f"🔍 Validación completada: {len(paths) - failed}/{len(paths)} archivos sin errores")
+            return result
+        except Exception as e:
+            error_msg = f"Error validando código: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    async def compile_check(file_paths: list[str]) -> str:
+        """Compila archivos Java con javac (servidor persistente) contra el proyecto objetivo y las librerías del framework, y devuelve los errores de compilación con línea y columna. Con una lista vacía compila todos los archivos Java creados o editados en esta ejecución. Si no hay JDK disponible, usa validate_code_quality"""
+        try:
+            if not compile_server.available:
+                return (
+                    f"Compilación no disponible ({compile_server.unavailable_reason}). "
+                    "Usa validate_code_quality() para la validación estructural."
+                )
+            edit_buffer = current_session().edit_buffer
+            paths = file_paths or [path for path in edit_buffer.touched_paths if path.endswith(".java")]
+            if not paths:
+                return "No hay archivos Java creados o editados en esta ejecución"
+
+            sources = {}
+            missing = []
+            for path in paths:
+                if edit_buffer.exists(path):
+                    sources[path] = edit_buffer.read_text(path)
+                else:
+                    missing.append(path)
+
+            # javac puede tardar hasta COMPILE_TIMEOUT: se espera en un hilo para no bloquear el event loop
+            result = await asyncio.to_thread(compile_server.compile, sources, compile_classpath, compile_sourcepath)
+            if result is None:
+                return (
+                    f"Compilación no disponible ({compile_server.unavailable_reason}). "
+                    "Usa validate_code_quality() para la validación estructural."
+                )
+            output = format_compile_result(result, sources, configured_external_prefixes())
+            output += "".join(f"❌ {path}: archivo no encontrado\n" for path in missing)
+            print(f"☕ Compilación de {len(sources)} archivo(s) en {result.elapsed_ms} ms: {'OK' if result.success else 'con errores'}")
+            return output
+        except Exception as e:
+            error_msg = f"Error compilando código: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    @function_tool
+    def reflect_on_progress(current_task: str, completed_actions: str, identified_issues: str, improvement_plan: str) -> str:
+        """Permite al agente reflexionar sobre su progreso y planificar mejoras"""
+        try:
+            reflection = f"""
+🤔 AUTO-REFLEXIÓN DEL AGENTE
+============================
+Tarea actual: {current_task}
+Acciones completadas: {completed_actions}
+Problemas identificados: {identified_issues}
+Plan de mejora: {improvement_plan}
+
+Análisis crítico:
+- ¿Estoy reutilizando código del framework correctamente?
+- ¿He duplicado funcionalidad existente?
+- ¿El código generado sigue las mejores prácticas?
+- ¿Necesito ajustar mi enfoque?
+============================
+"""
+            print("🧠 Iniciando auto-reflexión...")
+            print(reflection)
+            return "Reflexión completada. Continuando con plan mejorado."
+        except Exception as e:
+            error_msg = f"Error en reflexión: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg
+
+    tools = [
+        create_java_file,
+        read_file,
+        read_file_lines,
+        read_file_bytes,
+        grep_file,
+        replace_string_in_file,
+        apply_edits,
+        find_class,
+        find_method,
+        list_package,
+        search_code,
+        create_checkpoint,
+        validate_code_quality,
+        compile_check,
+        reflect_on_progress,
+    ]
+    # Telemetría de la ejecución: latencia y tokens por turno, duración de cada herramienta
+    # (las herramientas son compartidas; cada llamada se registra en la sesión que la ejecuta)
+    return instrument_tools(tools, lambda: current_session().telemetry)
+
+
+class GenerationRun:
+    """Generación de código con auto-reflexión para uno o varios prompts (modo batch).
+
+    prepare() valida la configuración del modelo, analiza los repos una sola
+    vez y construye las instrucciones de cada sesión, el servidor javac y las
+    herramientas; run() ejecuta las sesiones y guarda sus resúmenes.
+    """
+
+    def __init__(self, prompt=None, prompts_file=None, target_project_path=None, model=None, max_turns=None,
+                 snapshot=None):
+        self.prompt = prompt
+        self.prompts_file = prompts_file
+        self.target_project_path = target_project_path or DEFAULT_TARGET_PROJECT_PATH
+        self.model = model or DEFAULT_MODEL
+        self.max_turns = max_turns or DEFAULT_MAX_TURNS
+        # Snapshot del análisis (autoqa.py analyze --snapshot) que evita volver a analizar los repos
+        self.snapshot = snapshot
+        self.batch_output_dir = None
+        self.write_claims = None
+        self.sessions = []
+        self.run_config = None
+        self.replay_store = None
+        self.replay_mode = None
+        self.analysis_memory = None
+        self.compile_server = None
+        self.tools = None
+        self.model_settings = None
+
+        if not self.prompt and not self.prompts_file:
+            raise ValueError("PROMPT environment variable is not set")
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Configuración desde PROMPT, PROMPTS_FILE, TARGET_PROJECT_PATH, OPENAI_MODEL, MAX_TURNS y ANALYSIS_SNAPSHOT"""
+        config = {
+            "prompt": os.environ.get("PROMPT"),
+            # Modo batch: un archivo con varios prompts que comparten un único análisis de los repos
+            "prompts_file": os.environ.get("PROMPTS_FILE"),
+            "target_project_path": os.environ.get("TARGET_PROJECT_PATH"),
+            "model": os.environ.get("OPENAI_MODEL"),
+            "max_turns": int(os.environ.get("MAX_TURNS", DEFAULT_MAX_TURNS)),
+            "snapshot": os.environ.get("ANALYSIS_SNAPSHOT"),
+        }
+        config.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**config)
+
+    def _configure_model(self):
+        # Grabación/reproducción de respuestas del modelo (AUTOQA_REPLAY_MODE=record|replay)
+        self.run_config, self.replay_store = build_run_config()
+        self.replay_mode = configured_replay_mode()
+
+        # Determinar si es modelo de Claude o OpenAI
+        if self.replay_mode == REPLAY:
+            # En replay las respuestas salen de las grabaciones: no se necesita API key ni red
+            print(f"▶️  Modo replay: respuestas grabadas de {self.replay_store.directory} para el modelo {self.model}")
+        elif fake_model_enabled():
+            # Modelo simulado para pruebas de carga del bucle del agente: sin API key ni red
+            print(f"🧪 Modelo simulado (AUTOQA_MODEL_PROVIDER=fake) en lugar de {self.model}")
+        elif "claude" in self.model.lower():
+            if not os.environ.get("ANTHROPIC_API_KEY"):
+                raise ValueError("Anthropic API key required for Claude models. Set ANTHROPIC_API_KEY")
+            print(f"✅ Using Claude model for code generation: {self.model}")
+        else:
+            if not os.environ.get("OPENAI_API_KEY"):
+                raise ValueError("OpenAI API key required for OpenAI models. Set OPENAI_API_KEY")
+            print(f"✅ Using OpenAI model for code generation: {self.model}")
+
+    def _create_sessions(self):
+        target = self.target_project_path
+        # Una sesión por prompt; en modo batch cada una guarda su resumen y su traza en su propio directorio
+        if self.prompts_file:
+            self.batch_output_dir = os.environ.get("BATCH_OUTPUT_DIR", f"{target}/AutoQA-Batch")
+            self.write_claims = WriteClaims()
+            self.sessions = [
+                AgentSession.for_batch(index, session_id, prompt, self.batch_output_dir, self.write_claims)
+                for index, (session_id, prompt) in enumerate(load_prompts(self.prompts_file), 1)
+            ]
+            print(f"📦 Modo batch: {len(self.sessions)} prompts desde {self.prompts_file}")
+        else:
+            self.sessions = [AgentSession(
+                "principal", self.prompt, target,
+                trace_path=os.environ.get("AUTOQA_TRACE_PATH", f"{target}/AutoQA-Trace.jsonl"),
+            ).activate()]
+
+    def prepare(self):
+        """Configura el modelo, analiza los repos y construye instrucciones, servidor javac y herramientas"""
+        self._configure_model()
+        target = self.target_project_path
+
+        print(f"🎯 Directorio objetivo configurado: {target}")
+        print(f"🗂️  Directorio de trabajo actual: {os.getcwd()}")
+        print(f"🔍 ¿Existe el directorio objetivo?: {os.path.exists(target)}")
+        if os.path.exists(target):
+            print(f"📁 Contenido del directorio objetivo: {os.listdir(target)}")
+
+        self._create_sessions()
+
+        # Medir el pico de memoria de toda la fase de análisis y construcción del contexto
+        with MemoryProbe("análisis") as self.analysis_memory:
+            workspace = analyze_workspace(target, self.snapshot)
+            code_analysis = workspace["code_analysis"]
+            framework_analysis = workspace["framework_analysis"]
+
+            # Crear prompt con contexto del código existente, librerías del framework y proyectos adicionales
+            for session in self.sessions:
+                session.instructions, session.context_report = create_context_enhanced_prompt(
+                    session.prompt, code_analysis, framework_analysis, target,
+                    workspace["additional_projects"], workspace["symbol_index"],
+                    lexical_index=workspace["lexical_index"], static_instructions=AUTO_REFLECTION_INSTRUCTIONS,
+                )
+                print(f"📐 Presupuesto de contexto ({session.id}):" if self.prompts_file else "📐 Presupuesto de contexto:")
+                for line in session.context_report.summary_lines():
+                    print(f"   {line}")
+
+            # Las frecuencias de términos ya están en el índice BM25 y en el ranking del contexto
+            release_terms(code_analysis, framework_analysis)
+
+        # La JVM del servidor javac arranca en segundo plano mientras se configura el agente
+        self.compile_server = get_compile_server()
+        compile_classpath, compile_sourcepath = build_compile_paths(
+            [target] + [lib["path"] for lib in framework_analysis["libraries"]]
+        )
+
+        print("🧠 Memoria del análisis:")
+        for line in self.analysis_memory.summary_lines():
+            print(f"   {line}")
+
+        # Configurar modelo con capacidades avanzadas
+        self.model_settings = ModelSettings(
+            truncation="auto",
+            reasoning={"summary": "auto"},
+            temperature=0.7,  # Más creatividad para auto-reflexión
+            max_tokens=8000   # Mayor capacidad para razonamiento complejo
+        )
+
+        # Configurar el agente con capacidades de auto-reflexión
+        print("🧠 Configurando agente con capacidades de auto-reflexión")
+        self.tools = build_tools(workspace, self.compile_server, compile_classpath, compile_sourcepath)
+        return self
+
+    def build_agent(self, instructions):
+        """Crea el agente con herramientas ampliadas y auto-reflexión para unas instrucciones"""
+        return Agent(
+            model=self.model,
+            model_settings=self.model_settings,
+            name="AutoQA Reflective Code Generator Agent",
+            instructions=instructions,
+            tools=self.tools
+        )
+
+    # Ejecutar agente con auto-reflexión y razonamiento iterativo
+    async def run_session(self, session):
+        """Ejecuta el agente para una sesión y guarda su resumen en session.output_dir"""
+        session.activate()
+        tag = f"[{session.id}] " if self.prompts_file else ""
+        telemetry = session.telemetry
+        edit_buffer = session.edit_buffer
+        model = self.model
+        max_turns = self.max_turns
+
+        # Usar directamente el prompt de la sesión
+        # No añadir más instrucciones aquí - ya están en las instructions del agente
+        telemetry.start_run(
+            model, session.instructions, session.prompt, estimate_tokens(session.instructions),
+            prefix_sha256=session.context_report.prefix_sha256,
+        )
+        result = Runner.run_streamed(self.build_agent(session.instructions), session.prompt, max_turns=max_turns, run_config=self.run_config)
+
+        print(f"{tag}📊 Monitoreando proceso de auto-reflexión...")
+
+        try:
+            async for event in result.stream_events():
+                # Contar tipos de llamadas para estadísticas
+                tool_name = telemetry.observe(event)
+                count = session.count_tool(tool_name)
+                if tool_name == "create_checkpoint":
+                    print(f"{tag}🔄 Checkpoint #{count} creado")
+                elif tool_name == "validate_code_quality":
+                    print(f"{tag}🔍 Validación #{count} ejecutada")
+                elif tool_name == "reflect_on_progress":
+                    print(f"{tag}🤔 Auto-reflexión #{count} completada")
+
+                # Capturar razonamiento del agente
+                if event.type == "raw_response_event":
+                    data = event.data
+                    if getattr(data, "type", None) == "response.reasoning_summary_text.done":
+                        print(f"{tag}🧠 Razonamiento del agente: {data.text}")
+        finally:
+            # Volcar a disco lo que quede pendiente aunque la ejecución falle
+            flush_pending_edits("final de la ejecución")
+            telemetry.finish_run()
+        session.final_output = result.final_output
+
+        print(f"{tag}⏱️  Telemetría de la ejecución:")
+        for line in telemetry.summary_lines():
+            print(f"   {line}")
+
+        checkpoint_count = session.tool_counts["create_checkpoint"]
+        validation_count = session.tool_counts["validate_code_quality"]
+        reflection_count = session.tool_counts["reflect_on_progress"]
+
+        # Estadísticas finales
+        print(f"""
+{tag}📊 ESTADÍSTICAS DE AUTO-REFLEXIÓN:
+================================
+✅ Checkpoints creados: {checkpoint_count}
+🔍 Validaciones ejecutadas: {validation_count}
+🤔 Auto-reflexiones realizadas: {reflection_count}
+🎯 Máximo de turnos: {max_turns}
+
+📝 RESULTADO FINAL:
+{result.final_output}
+
+✅ Ejecución completada con auto-reflexión en: {self.target_project_path}
+""")
+
+        # Guardar resumen de la sesión con estadísticas
+        try:
+            os.makedirs(session.output_dir, exist_ok=True)
+            summary_path = f"{session.output_dir}/AutoQA-Reflection-Summary.md"
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                f.write(f"""# AutoQA - Resumen de Sesión con Auto-Reflexión
+
+## Configuración
+- **Modelo**: {model}
+- **Máximo turnos**: {max_turns}
+- **Directorio objetivo**: {self.target_project_path}
+- **Grabación de respuestas**: {self.replay_mode or "desactivada"}
+- **Modelo simulado**: {"sí" if fake_model_enabled() else "no"}
+
+## Contexto del Prompt
+{chr(10).join(f"- {line}" for line in session.context_report.summary_lines())}
+
+## Memoria del Análisis
+{chr(10).join(f"- {line}" for line in self.analysis_memory.summary_lines())}
+
+## Escrituras de Archivos
+- **Archivos escritos**: {edit_buffer.flushed_files}
+- **Archivos con conflicto (no escritos)**: {len(edit_buffer.conflicted_paths)}
+{chr(10).join(f"  - {path}" for path in sorted(edit_buffer.conflicted_paths))}
+
+## Telemetría
+{chr(10).join(f"- {line}" for line in telemetry.summary_lines())}
+
+## Estadísticas de Auto-Reflexión
+- **Checkpoints creados**: {checkpoint_count}
+- **Validaciones ejecutadas**: {validation_count}
+- **Auto-reflexiones realizadas**: {reflection_count}
+
+## Capacidades Utilizadas
+- ✅ Razonamiento iterativo con checkpoints
+- ✅ Auto-validación de código
+- ✅ Meta-cognición y mejora continua
+- ✅ Integración con {"Anthropic Workbench" if "claude" in model.lower() else "OpenAI Assistants API"}
+
+## Resultado Final
+{result.final_output}
+
+---
+*Generado por AutoQA con capacidades de auto-reflexión*
+""")
+            print(f"{tag}📄 Resumen guardado en: {summary_path}")
+        except Exception as e:
+            print(f"{tag}⚠️  No se pudo guardar el resumen: {e}")
+
+    async def run_batch(self):
+        """Ejecuta todas las sesiones con como mucho BATCH_CONCURRENCY a la vez y guarda el resumen agregado"""
+        sessions = self.sessions
+        concurrency = configured_batch_concurrency()
+        semaphore = asyncio.Semaphore(concurrency)
+        started = asyncio.get_running_loop().time()
+        print(f"📦 Ejecutando {len(sessions)} sesiones (máximo {concurrency} en paralelo)")
+
+        async def run_limited(session):
+            async with semaphore:
+                try:
+                    await self.run_session(session)
+                except Exception as e:
+                    # Una sesión fallida no detiene al resto del batch
+                    session.error = f"{type(e).__name__}: {e}"
+                    print(f"[{session.id}] ❌ Sesión fallida: {session.error}")
+
+        await asyncio.gather(*(run_limited(session) for session in sessions))
+
+        lines = batch_summary_lines(sessions, asyncio.get_running_loop().time() - started)
+        failed = [session for session in sessions if session.error is not None]
+        print("📦 RESUMEN DEL BATCH:")
+        for line in lines:
+            print(f"   {line}")
+        if failed:
+            print(f"❌ {len(failed)} sesión(es) con error:")
+            for session in failed:
+                print(f"   {session.id}: {session.error}")
+        try:
+            os.makedirs(self.batch_output_dir, exist_ok=True)
+            summary_path = f"{self.batch_output_dir}/AutoQA-Batch-Summary.md"
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                f.write(f"""# AutoQA - Resumen del Batch
+
+## Configuración
+- **Modelo**: {self.model}
+- **Archivo de prompts**: {self.prompts_file}
+- **Sesiones en paralelo**: {concurrency}
+- **Directorio objetivo**: {self.target_project_path}
+
+## Resultados
+{chr(10).join(f"- {line}" for line in lines)}
+
+## Sesiones con Error
+{chr(10).join(f"- {session.id}: {session.error}" for session in failed) or "- Ninguna"}
+
+## Conflictos de Escritura
+{chr(10).join(f"- {path}: {owner} no pudo editarlo (lo editaba {other})" for path, owner, other in self.write_claims.conflicts) or "- Ninguno"}
+""")
+            print(f"📄 Resumen del batch guardado en: {summary_path}")
+        except Exception as e:
+            print(f"⚠️  No se pudo guardar el resumen del batch: {e}")
+        return failed
+
+    async def run(self):
+        """Ejecuta la sesión o el batch; devuelve las sesiones que fallaron (en modo batch no se lanzan sus errores)"""
+        print("🚀 Iniciando AutoQA con capacidades de auto-reflexión...")
+        try:
+            if self.prompts_file:
+                return await self.run_batch()
+            await self.run_session(self.sessions[0])
+            return []
+        finally:
+            self.compile_server.shutdown()
+            if self.replay_store is not None:
+                print(f"🎞️  Grabación de respuestas ({self.replay_mode}):")
+                for line in self.replay_store.summary_lines():
+                    print(f"   {line}")
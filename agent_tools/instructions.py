@@ -0,0 +1,17 @@
+# Instrucciones de auto-reflexión: forman parte del prefijo estático de las instrucciones
+# (no dependen del prompt), así que van antes del código relevante y del prompt
+AUTO_REFLECTION_INSTRUCTIONS = """
+
+=== CAPACIDADES DE AUTO-REFLEXIÓN ACTIVADAS ===
+Tienes acceso a herramientas de auto-reflexión. Úsalas durante tu trabajo:
+
+1. 🔄 create_checkpoint() - Crea checkpoints regulares para marcar progreso
+2. 🔍 validate_code_quality() - Valida en una sola llamada todos los archivos que generes (lista vacía = todos)
+3. ☕ compile_check() - Compila con javac los archivos que generes (lista vacía = todos); si no hay JDK, usa validate_code_quality()
+4. 🤔 reflect_on_progress() - Reflexiona sobre tu trabajo y mejóralo
+
+PROCESO RECOMENDADO:
+- Checkpoint inicial → Análisis → Generación → Validación → Reflexión → Mejora si es necesario
+
+Estas herramientas son opcionales, úsalas cuando consideres que añaden valor.
+"""
@@ -0,0 +1,132 @@
+import java.io.BufferedReader;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Paths;
+import java.util.ArrayList;
+import java.util.Base64;
+import java.util.List;
+import java.util.Locale;
+import javax.tools.Diagnostic;
+import javax.tools.DiagnosticCollector;
+import javax.tools.JavaCompiler;
+import javax.tools.JavaFileObject;
+import javax.tools.SimpleJavaFileObject;
+import javax.tools.StandardJavaFileManager;
+import javax.tools.ToolProvider;
+
+/**
+ * Servidor de compilación persistente de AutoQA.
+ *
+ * Se lanza una sola vez por ejecución (java CompileServer.java) y compila bajo
+ * demanda con javax.tools reutilizando la JVM caliente y el file manager. El
+ * protocolo es de líneas por stdin/stdout; el cliente está en
+ * agent_tools/compile_server.py:
+ *
+ *   COMPILE                         inicia una petición
+ *   OPTION\t{opción}                opción de javac (una por línea)
+ *   SOURCE\t{ruta}\t{base64}        fuente en memoria (UTF-8 en base64)
+ *   END                             compila y responde
+ *   QUIT                            termina el proceso
+ *
+ * Respuesta: una línea DIAG\t{tipo}\t{ruta}\t{línea}\t{columna}\t{código}\t{mensaje en base64}
+ * por diagnóstico y una línea final DONE\t{true|false}\t{milisegundos}.
+ */
+public final class CompileServer {
+
+    private static final Base64.Encoder ENCODER = Base64.getEncoder();
+    private static final Base64.Decoder DECODER = Base64.getDecoder();
+
+    /** Fuente en memoria: el contenido pendiente del agente puede no estar todavía en disco. */
+    private static final class MemorySource extends SimpleJavaFileObject {
+        private final String path;
+        private final String content;
+
+        MemorySource(String path, String content) {
+            super(Paths.get(path).toAbsolutePath().toUri(), Kind.SOURCE);
+            this.path = path;
+            this.content = content;
+        }
+
+        @Override
+        public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+            return content;
+        }
+    }
+
+    private CompileServer() {
+    }
+
+    private static String encode(String text) {
+        return ENCODER.encodeToString(text.getBytes(StandardCharsets.UTF_8));
+    }
+
+    private static String sourcePath(JavaFileObject source) {
+        if (source == null) {
+            return "";
+        }
+        if (source instanceof MemorySource) {
+            return ((MemorySource) source).path;
+        }
+        return source.toUri().getPath();
+    }
+
+    private static void compile(JavaCompiler compiler, StandardJavaFileManager fileManager,
+                                List<String> options, List<JavaFileObject> sources, PrintStream out) {
+        long started = System.nanoTime();
+        DiagnosticCollector<JavaFileObject> diagnostics = new DiagnosticCollector<>();
+        boolean success;
+        try {
+            success = compiler.getTask(null, fileManager, diagnostics, options, null, sources).call();
+        } catch (RuntimeException e) {
+            out.println("DIAG\tERROR\t\t0\t0\tcompiler.crash\t" + encode(String.valueOf(e)));
+            success = false;
+        }
+        for (Diagnostic<? extends JavaFileObject> diagnostic : diagnostics.getDiagnostics()) {
+            out.println("DIAG\t" + diagnostic.getKind()
+                + "\t" + sourcePath(diagnostic.getSource())
+                + "\t" + diagnostic.getLineNumber()
+                + "\t" + diagnostic.getColumnNumber()
+                + "\t" + diagnostic.getCode()
+                + "\t" + encode(diagnostic.getMessage(Locale.ROOT)));
+        }
+        out.println("DONE\t" + success + "\t" + (System.nanoTime() - started) / 1_000_000);
+    }
+
+    public static void main(String[] args) throws IOException {
+        PrintStream out = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            out.println("UNAVAILABLE\tla JVM no incluye compilador (se necesita un JDK, no un JRE)");
+            return;
+        }
+        StandardJavaFileManager fileManager =
+            compiler.getStandardFileManager(null, Locale.ROOT, StandardCharsets.UTF_8);
+        out.println("READY\t" + System.getProperty("java.version"));
+
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        List<String> options = new ArrayList<>();
+        List<JavaFileObject> sources = new ArrayList<>();
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.equals("QUIT")) {
+                break;
+            } else if (line.equals("COMPILE")) {
+                options.clear();
+                sources.clear();
+            } else if (line.startsWith("OPTION\t")) {
+                options.add(line.substring("OPTION\t".length()));
+            } else if (line.startsWith("SOURCE\t")) {
+                String[] parts = line.split("\t", 3);
+                String content = new String(DECODER.decode(parts[2]), StandardCharsets.UTF_8);
+                sources.add(new MemorySource(parts[1], content));
+            } else if (line.equals("END")) {
+                compile(compiler, fileManager, options, new ArrayList<>(sources), out);
+            }
+        }
+        fileManager.close();
+    }
+}
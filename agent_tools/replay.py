@@ -0,0 +1,289 @@
+import dataclasses
+import enum
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from agents import Model, ModelProvider, RunConfig
+from agents.items import ModelResponse
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputItem, ResponseStreamEvent
+from pydantic import BaseModel, TypeAdapter
+
+from agent_tools.fake_model import FakeModelProvider, fake_model_enabled
+
+DEFAULT_REPLAY_DIR = ".autoqa-replay"
+
+RECORD = "record"
+REPLAY = "replay"
+
+_stream_events = TypeAdapter(ResponseStreamEvent)
+_output_items = TypeAdapter(list[ResponseOutputItem])
+
+
+def configured_replay_mode():
+    """Modo de grabación/reproducción (AUTOQA_REPLAY_MODE=record|replay); None si está desactivado"""
+    mode = os.environ.get("AUTOQA_REPLAY_MODE", "").strip().lower()
+    if mode in ("", "off", "0"):
+        return None
+    if mode not in (RECORD, REPLAY):
+        raise ValueError(f"AUTOQA_REPLAY_MODE inválido ({mode}): usa record o replay")
+    return mode
+
+
+def configured_replay_dir():
+    return os.environ.get("AUTOQA_REPLAY_DIR", DEFAULT_REPLAY_DIR)
+
+
+def _canonical(value):
+    """Representación JSON estable de los parámetros de una petición al modelo"""
+    if isinstance(value, BaseModel):
+        return _canonical(value.model_dump(mode="json", exclude_none=True))
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            field.name: _canonical(getattr(value, field.name))
+            for field in dataclasses.fields(value)
+            if not callable(getattr(value, field.name))
+        }
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, enum.Enum):
+        return value.name
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "json_schema"):
+        return {"json_schema": _canonical(value.json_schema())}
+    # Objetos sin representación estable (p. ej. el Computer de un ComputerTool): solo su tipo
+    return type(value).__name__
+
+
+def request_key(model_name, system_instructions, input, model_settings, tools, output_schema, handoffs, previous_response_id=None):
+    """sha256 de la petición: igual petición, misma respuesta grabada"""
+    request = {
+        "model": model_name,
+        "system_instructions": system_instructions,
+        "input": input,
+        "model_settings": model_settings,
+        "tools": tools,
+        "output_schema": output_schema,
+        "handoffs": [getattr(handoff, "tool_name", None) for handoff in handoffs or []],
+        "previous_response_id": previous_response_id,
+    }
+    payload = json.dumps(_canonical(request), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReplayMiss(RuntimeError):
+    """No hay ninguna respuesta grabada para la petición en modo replay"""
+
+
+class ReplayStore:
+    """Respuestas grabadas en disco: un JSON por clave de petición más un índice en orden de grabación.
+
+    Una misma petición repetida guarda sus respuestas en orden y en replay se
+    sirven en ese orden. Si una petición no coincide exactamente (p. ej. la
+    salida de una herramienta incluye un tiempo), con strict=False se sirve la
+    siguiente grabación aún no usada en el orden original.
+    """
+
+    def __init__(self, directory, strict=False):
+        self.directory = directory
+        self.strict = strict
+        self.recorded = 0
+        self.exact_hits = 0
+        self.fallback_hits = 0
+        self._served = {}
+        self._used = set()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key, model_name, kind, payload):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            entry = self._load(key) or {"key": key, "model": model_name, "responses": []}
+            entry["responses"].append({"kind": kind, **payload})
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+            with open(os.path.join(self.directory, "index.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"key": key, "position": len(entry["responses"]) - 1, "model": model_name}) + "\n")
+            self.recorded += 1
+
+    def _index(self):
+        try:
+            with open(os.path.join(self.directory, "index.jsonl"), 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def lookup(self, key):
+        """Siguiente respuesta grabada para key (o, sin strict, la siguiente no usada); ReplayMiss si no hay"""
+        with self._lock:
+            entry = self._load(key)
+            if entry is not None:
+                responses = entry["responses"]
+                served = self._served.get(key, 0)
+                # Siguiente respuesta de key que no se haya servido ya (tampoco por orden de grabación)
+                position = next((p for p in range(served, len(responses)) if (key, p) not in self._used), None)
+                if position is None and served >= len(responses):
+                    # La petición se repite más veces que en la grabación: se repite la última respuesta
+                    position = len(responses) - 1
+                if position is not None:
+                    self._served[key] = position + 1
+                    self._used.add((key, position))
+                    self.exact_hits += 1
+                    return responses[position]
+            if not self.strict:
+                for record in self._index():
+                    marker = (record["key"], record["position"])
+                    if marker not in self._used:
+                        self._used.add(marker)
+                        self.fallback_hits += 1
+                        return self._load(record["key"])["responses"][record["position"]]
+        raise ReplayMiss(
+            f"No hay respuesta grabada para la petición {key[:16]} en {self.directory} "
+            "(graba de nuevo con AUTOQA_REPLAY_MODE=record)"
+        )
+
+    def summary_lines(self):
+        lines = [f"Directorio de grabaciones: {self.directory}"]
+        if self.recorded:
+            lines.append(f"Respuestas grabadas: {self.recorded}")
+        if self.exact_hits or self.fallback_hits:
+            lines.append(
+                f"Respuestas reproducidas: {self.exact_hits + self.fallback_hits} "
+                f"({self.exact_hits} exactas, {self.fallback_hits} por orden de grabación)"
+            )
+        return lines
+
+
+class RecordReplayModel(Model):
+    """Model que graba las respuestas del modelo real (record) o las sirve desde el ReplayStore (replay)"""
+
+    def __init__(self, model_name, store, mode, model=None):
+        self.model_name = model_name
+        self.store = store
+        self.mode = mode
+        self.model = model
+
+    def _key(self, system_instructions, input, model_settings, tools, output_schema, handoffs, previous_response_id):
+        return request_key(
+            self.model_name, system_instructions, input, model_settings, tools, output_schema, handoffs,
+            previous_response_id,
+        )
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *, previous_response_id=None):
+        key = self._key(system_instructions, input, model_settings, tools, output_schema, handoffs, previous_response_id)
+        if self.mode == REPLAY:
+            recorded = self.store.lookup(key)
+            if recorded["kind"] == "stream":
+                return _response_from_events([_stream_events.validate_python(event) for event in recorded["events"]])
+            return ModelResponse(
+                output=_output_items.validate_python(recorded["output"]),
+                usage=Usage(**recorded["usage"]),
+                response_id=recorded["response_id"],
+            )
+
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id,
+        )
+        self.store.save(key, self.model_name, "response", {
+            "output": [item.model_dump(mode="json") for item in response.output],
+            "usage": dataclasses.asdict(response.usage),
+            "response_id": response.response_id,
+        })
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *, previous_response_id=None):
+        key = self._key(system_instructions, input, model_settings, tools, output_schema, handoffs, previous_response_id)
+        if self.mode == REPLAY:
+            recorded = self.store.lookup(key)
+            if recorded["kind"] != "stream":
+                raise ReplayMiss(f"La petición {key[:16]} se grabó sin streaming; grábala de nuevo con run_streamed")
+            for event in recorded["events"]:
+                yield _stream_events.validate_python(event)
+            return
+
+        events = []
+        async for event in self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id,
+        ):
+            events.append(event.model_dump(mode="json"))
+            yield event
+        # Solo se graban las respuestas completas
+        self.store.save(key, self.model_name, "stream", {"events": events})
+
+
+def _response_from_events(events):
+    """ModelResponse a partir de los eventos grabados de una respuesta en streaming"""
+    for event in reversed(events):
+        if event.type == "response.completed":
+            response = event.response
+            usage = response.usage
+            return ModelResponse(
+                output=response.output,
+                usage=Usage(
+                    requests=1,
+                    input_tokens=usage.input_tokens if usage else 0,
+                    output_tokens=usage.output_tokens if usage else 0,
+                    total_tokens=usage.total_tokens if usage else 0,
+                ),
+                response_id=response.id,
+            )
+    raise ReplayMiss("La grabación no contiene un evento response.completed")
+
+
+class RecordReplayModelProvider(ModelProvider):
+    """ModelProvider que envuelve al proveedor real en modo record y no lo usa en modo replay"""
+
+    def __init__(self, mode, store, base_provider=None):
+        self.mode = mode
+        self.store = store
+        self.base_provider = base_provider
+
+    def get_model(self, model_name):
+        if self.mode == REPLAY:
+            return RecordReplayModel(model_name, self.store, REPLAY)
+        return RecordReplayModel(model_name, self.store, RECORD, self.base_provider.get_model(model_name))
+
+
+def build_run_config(store=None):
+    """RunConfig para Runner según AUTOQA_REPLAY_MODE y AUTOQA_MODEL_PROVIDER; (None, None) sin ninguno.
+
+    En replay no se usa la red: las respuestas salen del directorio de
+    grabaciones (AUTOQA_REPLAY_DIR) y el envío de trazas está desactivado.
+    AUTOQA_REPLAY_STRICT=1 exige que cada petición coincida exactamente.
+    Con AUTOQA_MODEL_PROVIDER=fake el modelo es el simulado (agent_tools.fake_model),
+    también como modelo base al grabar.
+    """
+    mode = configured_replay_mode()
+    fake = fake_model_enabled() and mode != REPLAY
+    if mode is None:
+        if fake:
+            return RunConfig(model_provider=FakeModelProvider(), tracing_disabled=True), None
+        return None, None
+    store = store or ReplayStore(configured_replay_dir(), strict=os.environ.get("AUTOQA_REPLAY_STRICT") == "1")
+    base_provider = None
+    if mode == RECORD:
+        base_provider = FakeModelProvider() if fake else RunConfig().model_provider
+    run_config = RunConfig(
+        model_provider=RecordReplayModelProvider(mode, store, base_provider),
+        tracing_disabled=mode == REPLAY or fake,
+    )
+    return run_config, store
@@ -0,0 +1,131 @@
+import contextvars
+import json
+import os
+import re
+
+from agent_tools.edit_buffer import EditBuffer
+from agent_tools.file_access import FileReader
+from agent_tools.telemetry import RunTelemetry, percentile
+
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# Herramientas cuyas llamadas se cuentan en las estadísticas de auto-reflexión
+COUNTED_TOOLS = ("create_checkpoint", "validate_code_quality", "reflect_on_progress")
+
+_current_session = contextvars.ContextVar("autoqa_session")
+
+
+def current_session():
+    """Sesión del agente que está ejecutando la herramienta actual"""
+    return _current_session.get()
+
+
+def configured_batch_concurrency():
+    """Sesiones que se ejecutan a la vez en modo batch (BATCH_CONCURRENCY)"""
+    value = os.environ.get("BATCH_CONCURRENCY", "")
+    try:
+        return max(1, int(value)) if value else DEFAULT_BATCH_CONCURRENCY
+    except ValueError:
+        print(f"   ⚠️  BATCH_CONCURRENCY inválido ({value}), usando {DEFAULT_BATCH_CONCURRENCY}")
+        return DEFAULT_BATCH_CONCURRENCY
+
+
+def load_prompts(path):
+    """Lee los prompts de un archivo batch; devuelve [(id, prompt)].
+
+    Un .jsonl tiene un objeto por línea con "prompt" y opcionalmente "id". En
+    cualquier otro archivo los prompts se separan con una línea que solo
+    contiene ---.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    prompts = []
+    if path.endswith(".jsonl"):
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            prompts.append((str(entry.get("id") or f"prompt-{len(prompts) + 1}"), entry["prompt"]))
+    else:
+        for block in re.split(r"^---\s*$", text, flags=re.MULTILINE):
+            if block.strip():
+                prompts.append((f"prompt-{len(prompts) + 1}", block.strip()))
+    if not prompts:
+        raise ValueError(f"El archivo de prompts {path} no contiene ningún prompt")
+    return prompts
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", text).strip("-")[:60] or "sesion"
+
+
+class AgentSession:
+    """Estado de una ejecución del agente para un prompt.
+
+    Cada sesión tiene su propio buffer de escritura, lector de archivos,
+    telemetría y contadores; el análisis de los repos y los índices se
+    comparten. Las herramientas obtienen la sesión con current_session(), que
+    se resuelve por contextvars, así que varias sesiones pueden ejecutarse a la
+    vez en el mismo bucle asyncio.
+    """
+
+    def __init__(self, session_id, prompt, output_dir, trace_path=None, claims=None):
+        self.id = session_id
+        self.prompt = prompt
+        self.output_dir = output_dir
+        self.instructions = None
+        self.context_report = None
+        self.edit_buffer = EditBuffer(claims=claims, owner=session_id)
+        self.file_reader = FileReader(overlay=self.edit_buffer.pending_content)
+        self.edit_buffer.on_flush = self.file_reader.invalidate
+        self.telemetry = RunTelemetry(trace_path or os.path.join(output_dir, "AutoQA-Trace.jsonl"))
+        self.tool_counts = dict.fromkeys(COUNTED_TOOLS, 0)
+        self.final_output = None
+        self.error = None
+
+    @classmethod
+    def for_batch(cls, index, session_id, prompt, batch_dir, claims):
+        output_dir = os.path.join(batch_dir, f"{index:02d}-{_slug(session_id)}")
+        return cls(session_id, prompt, output_dir, claims=claims)
+
+    def activate(self):
+        """Hace de esta sesión la actual en el contexto (tarea asyncio) en curso"""
+        _current_session.set(self)
+        return self
+
+    def count_tool(self, tool_name):
+        """Cuenta una llamada a herramienta; devuelve el total si es una de COUNTED_TOOLS"""
+        if tool_name not in self.tool_counts:
+            return None
+        self.tool_counts[tool_name] += 1
+        return self.tool_counts[tool_name]
+
+
+def batch_summary_lines(sessions, wall_s):
+    """Estadísticas agregadas de un batch: totales y una línea por sesión"""
+    totals = [session.telemetry.totals() for session in sessions]
+    durations = [session.telemetry.wall_s for session in sessions if session.telemetry.wall_s is not None]
+    failed = [session for session in sessions if session.error is not None]
+    conflicts = sum(len(session.edit_buffer.conflicted_paths) for session in sessions)
+    lines = [
+        f"Sesiones: {len(sessions)} ({len(sessions) - len(failed)} completadas, {len(failed)} con error) en {wall_s:.1f} s",
+        f"Tokens: entrada {sum(total['input_tokens'] for total in totals)} "
+        f"({sum(total['cached_tokens'] for total in totals)} cacheados), "
+        f"salida {sum(total['output_tokens'] for total in totals)}",
+        f"Archivos escritos: {sum(session.edit_buffer.flushed_files for session in sessions)}; "
+        f"archivos con conflicto: {conflicts}",
+    ]
+    if durations:
+        lines.append(
+            f"Duración por sesión: p50 {percentile(durations, 0.5):.1f} s, "
+            f"p90 {percentile(durations, 0.9):.1f} s, máx {max(durations):.1f} s"
+        )
+    for session, total in zip(sessions, totals):
+        status = f"error: {session.error}" if session.error is not None else "ok"
+        duration = f"{session.telemetry.wall_s:.1f} s" if session.telemetry.wall_s is not None else "-"
+        lines.append(
+            f"{session.id}: {status}; {duration}, {total['turns']} turnos, {total['tool_calls']} herramientas, "
+            f"{session.edit_buffer.flushed_files} archivos escritos, "
+            f"{len(session.edit_buffer.conflicted_paths)} con conflicto — {session.output_dir}"
+        )
+    return lines
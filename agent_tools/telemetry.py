@@ -0,0 +1,217 @@
+import json
+import math
+import os
+import time
+
+
+def percentile(values, fraction):
+    """Percentil por rango más cercano (fraction entre 0 y 1); None si no hay valores"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _format_ms(value):
+    return "-" if value is None else f"{value * 1000:.0f} ms"
+
+
+def _distribution(values):
+    return (
+        f"p50 {_format_ms(percentile(values, 0.5))}, p90 {_format_ms(percentile(values, 0.9))}, "
+        f"p99 {_format_ms(percentile(values, 0.99))}, máx {_format_ms(max(values) if values else None)}"
+    )
+
+
+def _usage_counts(usage):
+    """(input, output, cacheados) de un objeto usage de la Responses API, o ceros si no hay"""
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, "input_tokens_details", None)
+    return (
+        getattr(usage, "input_tokens", 0) or 0,
+        getattr(usage, "output_tokens", 0) or 0,
+        getattr(details, "cached_tokens", 0) or 0,
+    )
+
+
+class RunTelemetry:
+    """Telemetría de una ejecución del agente: turnos del modelo y herramientas.
+
+    observe() recibe los eventos de Runner.run_streamed: cada turno va desde que
+    el agente queda esperando al modelo (inicio de la ejecución o fin de la
+    última herramienta) hasta response.completed, con el tiempo al primer token
+    y los tokens de entrada y salida. instrument_tools() envuelve las
+    herramientas para medir cuánto tarda cada invocación.
+
+    Cada turno y cada herramienta se escribe como una línea en trace_path (JSONL)
+    a medida que ocurre, de modo que una ejecución interrumpida deja su traza.
+    """
+
+    def __init__(self, trace_path=None, clock=time.perf_counter):
+        self.trace_path = trace_path
+        self.clock = clock
+        self.turns = []
+        self.tool_calls = []
+        self.prompt = {}
+        self._trace = None
+        self._run_started = None
+        self._turn_started = None
+        self._first_token = None
+        self.wall_s = None
+
+    def _write(self, record):
+        if self.trace_path is None:
+            return
+        if self._trace is None:
+            directory = os.path.dirname(self.trace_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._trace = open(self.trace_path, 'w', encoding='utf-8')
+        self._trace.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._trace.flush()
+
+    def start_run(self, model, instructions, user_input, estimated_tokens=None, prefix_sha256=None):
+        """Marca el inicio de la ejecución y registra el tamaño del prompt y el hash de su prefijo estático"""
+        self._run_started = self._turn_started = self.clock()
+        self.prompt = {
+            "model": model,
+            "instructions_chars": len(instructions),
+            "input_chars": len(user_input),
+            "estimated_tokens": estimated_tokens,
+            "prefix_sha256": prefix_sha256,
+        }
+        self._write({"event": "run_start", "time": time.time(), **self.prompt})
+
+    def observe(self, event):
+        """Procesa un evento del stream; devuelve el nombre de la herramienta si es una llamada"""
+        event_type = getattr(event, "type", None)
+        if event_type == "raw_response_event":
+            self._observe_raw(event.data)
+        elif event_type == "run_item_stream_event" and event.name == "tool_called":
+            return getattr(event.item.raw_item, "name", None)
+        return None
+
+    def _observe_raw(self, data):
+        data_type = getattr(data, "type", "")
+        now = self.clock()
+        if self._turn_started is None:
+            self._turn_started = now
+        if data_type.endswith(".delta") and self._first_token is None:
+            self._first_token = now
+        elif data_type == "response.completed":
+            response = getattr(data, "response", None)
+            input_tokens, output_tokens, cached_tokens = _usage_counts(getattr(response, "usage", None))
+            turn = {
+                "event": "turn",
+                "turn": len(self.turns) + 1,
+                "latency_s": now - self._turn_started,
+                "ttft_s": None if self._first_token is None else self._first_token - self._turn_started,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cached_tokens": cached_tokens,
+            }
+            self.turns.append(turn)
+            self._write(turn)
+            self._turn_started = now
+            self._first_token = None
+
+    def instrument_tools(self, tools):
+        """Envuelve on_invoke_tool de cada herramienta para medir su duración"""
+        return instrument_tools(tools, lambda: self)
+
+    def record_tool(self, name, started, finished, ok, arguments, output):
+        call = {
+            "event": "tool",
+            "tool": name,
+            "duration_s": finished - started,
+            "ok": ok,
+            "arguments_chars": len(arguments or ""),
+            "output_chars": len(str(output)) if output is not None else 0,
+        }
+        self.tool_calls.append(call)
+        self._write(call)
+        # El siguiente turno del modelo empieza cuando termina la última herramienta
+        self._turn_started = finished
+        self._first_token = None
+
+    def finish_run(self):
+        if self._run_started is not None and self.wall_s is None:
+            self.wall_s = self.clock() - self._run_started
+            self._write({"event": "run_end", "wall_s": self.wall_s, **self.totals()})
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+    def totals(self):
+        return {
+            "turns": len(self.turns),
+            "tool_calls": len(self.tool_calls),
+            "input_tokens": sum(turn["input_tokens"] for turn in self.turns),
+            "output_tokens": sum(turn["output_tokens"] for turn in self.turns),
+            "cached_tokens": sum(turn["cached_tokens"] for turn in self.turns),
+            "model_s": sum(turn["latency_s"] for turn in self.turns),
+            "tools_s": sum(call["duration_s"] for call in self.tool_calls),
+        }
+
+    def summary_lines(self):
+        totals = self.totals()
+        lines = []
+        if self.wall_s is not None:
+            lines.append(
+                f"Duración total: {self.wall_s:.1f} s (modelo {totals['model_s']:.1f} s, "
+                f"herramientas {totals['tools_s']:.1f} s)"
+            )
+        if self.prompt:
+            estimated = self.prompt.get("estimated_tokens")
+            lines.append(
+                f"Prompt: {self.prompt['instructions_chars']} caracteres de instrucciones"
+                + (f" (~{estimated} tokens)" if estimated else "")
+            )
+        lines.append(
+            f"Turnos del modelo: {totals['turns']}; tokens de entrada {totals['input_tokens']} "
+            f"({totals['cached_tokens']} cacheados), de salida {totals['output_tokens']}"
+        )
+        if self.turns:
+            lines.append(f"Latencia por turno: {_distribution([turn['latency_s'] for turn in self.turns])}")
+            first_tokens = [turn["ttft_s"] for turn in self.turns if turn["ttft_s"] is not None]
+            if first_tokens:
+                lines.append(f"Tiempo al primer token: {_distribution(first_tokens)}")
+        by_tool = {}
+        for call in self.tool_calls:
+            by_tool.setdefault(call["tool"], []).append(call["duration_s"])
+        for name, durations in sorted(by_tool.items(), key=lambda item: -sum(item[1])):
+            lines.append(f"Herramienta {name}: {len(durations)} llamada(s), {_distribution(durations)}")
+        if self.trace_path:
+            lines.append(f"Traza: {self.trace_path}")
+        return lines
+
+
+def instrument_tools(tools, resolve_telemetry):
+    """Envuelve on_invoke_tool de cada herramienta; resolve_telemetry() da el RunTelemetry que registra la llamada.
+
+    Con varias sesiones concurrentes las herramientas son compartidas, así que
+    la telemetría se resuelve en cada invocación (p. ej. la de la sesión actual).
+    """
+    for tool in tools:
+        tool.on_invoke_tool = _timed(tool.name, tool.on_invoke_tool, resolve_telemetry)
+    return tools
+
+
+def _timed(name, invoke, resolve_telemetry):
+    async def timed_invoke(context, arguments):
+        telemetry = resolve_telemetry()
+        started = telemetry.clock()
+        ok = True
+        output = None
+        try:
+            output = await invoke(context, arguments)
+            return output
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            telemetry.record_tool(name, started, telemetry.clock(), ok, arguments, output)
+
+    return timed_invoke
@@ -0,0 +1,178 @@
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import tempfile
+
+from analysis.terms import split_identifier
+
+# Incrementar si cambia el formato persistido
+INDEX_VERSION = 1
+
+K1 = 1.2
+B = 0.75
+
+
+class BM25Index:
+    """Índice invertido BM25 sobre los archivos Java analizados.
+
+    Cada documento es un archivo; sus términos salen de los identificadores
+    (divididos por camelCase), nombres de métodos y comentarios. Las listas de
+    postings se guardan como dos listas paralelas (documento, frecuencia).
+    """
+
+    def __init__(self):
+        self.docs = []          # Metadatos por documento: {"id", "title", "source"}
+        self.doc_lengths = []
+        self.postings = {}      # término -> ([ids de documento], [frecuencias])
+        self.fingerprint = None
+        self._avg_length = 0.0
+        self._idf = {}
+        self._weights = {}      # término -> pesos BM25 precalculados por posting
+
+    def add_document(self, doc_id, title, source, terms):
+        """Añade un documento con su diccionario término -> frecuencia"""
+        doc_index = len(self.docs)
+        self.docs.append({"id": doc_id, "title": title, "source": source})
+        self.doc_lengths.append(sum(terms.values()))
+        for term, frequency in terms.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = ([], [])
+            posting[0].append(doc_index)
+            posting[1].append(frequency)
+        self._idf = {}
+        self._weights = {}
+
+    def _prepare(self):
+        if self._idf or not self.docs:
+            return
+        total = len(self.docs)
+        self._avg_length = sum(self.doc_lengths) / total or 1.0
+        self._idf = {
+            term: math.log(1 + (total - len(posting[0]) + 0.5) / (len(posting[0]) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def _term_weights(self, term):
+        """Pesos BM25 (sin idf) de cada posting del término; se calculan una vez por término"""
+        weights = self._weights.get(term)
+        if weights is None:
+            lengths = self.doc_lengths
+            norm = K1 * (1 - B)
+            scale = K1 * B / (self._avg_length or 1.0)
+            doc_ids, frequencies = self.postings[term]
+            weights = self._weights[term] = [
+                frequency * (K1 + 1) / (frequency + norm + scale * lengths[doc_index])
+                for doc_index, frequency in zip(doc_ids, frequencies)
+            ]
+        return weights
+
+    def search(self, query, top_k=10):
+        """Devuelve los top_k documentos más relevantes como [(puntuación, metadatos)]"""
+        self._prepare()
+        terms = {term for term in split_identifier(query) if len(term) > 1}
+        scores = {}
+        get = scores.get
+        for term in terms:
+            if term not in self.postings:
+                continue
+            idf = self._idf[term]
+            for doc_index, weight in zip(self.postings[term][0], self._term_weights(term)):
+                scores[doc_index] = get(doc_index, 0.0) + idf * weight
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, self.docs[doc_index]) for doc_index, score in best]
+
+    def scores(self, query):
+        """Puntuación BM25 de todos los documentos que contienen algún término: {id: puntuación}"""
+        return {doc["id"]: score for score, doc in self.search(query, top_k=len(self.docs))}
+
+    def save(self, path):
+        """Persiste el índice comprimido de forma atómica"""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        payload = {
+            "version": INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "docs": self.docs,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with gzip.open(os.fdopen(fd, 'wb'), 'wt', encoding='utf-8', compresslevel=1) as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Carga un índice persistido; devuelve None si no existe o es de otra versión"""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  Índice BM25 ilegible, se reconstruirá: {e}")
+            return None
+        if payload.get("version") != INDEX_VERSION:
+            return None
+        index = cls()
+        index.fingerprint = payload["fingerprint"]
+        index.docs = payload["docs"]
+        index.doc_lengths = payload["doc_lengths"]
+        index.postings = {term: (posting[0], posting[1]) for term, posting in payload["postings"].items()}
+        return index
+
+
+def _documents(code_analysis, framework_analysis, target_name):
+    """Documentos a indexar: (id, título, origen, términos) del framework y del proyecto objetivo"""
+    for lib in framework_analysis["libraries"]:
+        for cls in lib["classes"]:
+            yield cls.file, cls.class_name, lib["name"], cls.terms or {}
+    for java_file in code_analysis["all_java_files"]:
+        yield java_file.file, java_file.class_name, target_name, java_file.terms or {}
+
+
+def corpus_fingerprint(code_analysis, framework_analysis, target_name):
+    """Huella del corpus a partir de ruta, mtime y tamaño de cada archivo"""
+    digest = hashlib.sha1(f"{INDEX_VERSION}".encode())
+    for doc_id, _, source, _ in _documents(code_analysis, framework_analysis, target_name):
+        try:
+            stat = os.stat(doc_id)
+            digest.update(f"{source}\0{doc_id}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode("utf-8"))
+        except OSError:
+            digest.update(f"{source}\0{doc_id}\0missing\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_or_build_index(code_analysis, framework_analysis, target_path, cache_dir=None):
+    """Carga el índice BM25 persistido si el corpus no cambió; si no, lo reconstruye y lo guarda"""
+    target_name = target_path.rstrip("/").split("/")[-1] or target_path
+    fingerprint = corpus_fingerprint(code_analysis, framework_analysis, target_name)
+    index_path = os.path.join(cache_dir, "bm25-index.json.gz") if cache_dir else None
+
+    if index_path:
+        index = BM25Index.load(index_path)
+        if index is not None and index.fingerprint == fingerprint:
+            print(f"   💾 Índice BM25 cargado desde caché: {len(index.docs)} documentos")
+            return index
+
+    index = BM25Index()
+    for doc_id, title, source, terms in _documents(code_analysis, framework_analysis, target_name):
+        index.add_document(doc_id, title, source, terms)
+    index.fingerprint = fingerprint
+    print(f"   🔤 Índice BM25 construido: {len(index.docs)} documentos, {len(index.postings)} términos")
+
+    if index_path:
+        try:
+            index.save(index_path)
+        except OSError as e:
+            print(f"   ⚠️  No se pudo guardar el índice BM25: {e}")
+    return index
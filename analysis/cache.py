@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import tempfile
+
+# Incrementar cuando cambie el formato de las entradas o la lógica de extracción,
+# para que las cachés antiguas se descarten automáticamente
+CACHE_VERSION = 5
+
+DEFAULT_CACHE_DIR = ".autoqa-cache"
+
+
+class AnalysisCache:
+    """Caché en disco del análisis por archivo, indexada por ruta + mtime + tamaño"""
+
+    def __init__(self, cache_dir, base_path):
+        self.cache_dir = cache_dir
+        self.base_path = os.path.abspath(base_path)
+        digest = hashlib.sha1(self.base_path.encode("utf-8")).hexdigest()[:16]
+        self.cache_file = os.path.join(cache_dir, f"analysis-{digest}.json")
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._dirty = False
+
+    def load(self):
+        """Carga la caché desde disco; una caché corrupta o de otra versión se ignora"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            print(f"      ⚠️  Caché de análisis ilegible, se reconstruirá: {e}")
+            return self
+
+        if data.get("version") != CACHE_VERSION or data.get("base_path") != self.base_path:
+            print("      ℹ️  Caché de análisis de otra versión, se reconstruirá")
+            self._dirty = True
+            return self
+
+        self.entries = data.get("entries", {})
+        return self
+
+    def lookup(self, relative_path, stat):
+        """Devuelve los datos cacheados si el archivo no cambió desde la última ejecución"""
+        entry = self.entries.get(relative_path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            self.hits += 1
+            return entry["data"]
+        self.misses += 1
+        return None
+
+    def store(self, relative_path, stat, data):
+        """Guarda el resultado del análisis de un archivo"""
+        self.entries[relative_path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "data": data,
+        }
+        self._dirty = True
+
+    def prune(self, seen_paths):
+        """Elimina las entradas de archivos que ya no existen"""
+        stale = [path for path in self.entries if path not in seen_paths]
+        for path in stale:
+            del self.entries[path]
+        if stale:
+            self._dirty = True
+        self.evicted += len(stale)
+        return len(stale)
+
+    def save(self):
+        """Escribe la caché de forma atómica (archivo temporal + rename)"""
+        if not self._dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        payload = {
+            "version": CACHE_VERSION,
+            "base_path": self.base_path,
+            "entries": self.entries,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._dirty = False
+
+
+def analysis_cache_dir():
+    """Directorio de caché de análisis (ANALYSIS_CACHE_DIR); None si está desactivada"""
+    return os.environ.get("ANALYSIS_CACHE_DIR", DEFAULT_CACHE_DIR) or None
+
+
+def open_analysis_cache(base_path):
+    """Abre la caché de análisis para base_path; ANALYSIS_CACHE_DIR vacío la desactiva"""
+    cache_dir = analysis_cache_dir()
+    if not cache_dir:
+        return None
+    return AnalysisCache(cache_dir, base_path).load()
@@ -0,0 +1,182 @@
+import hashlib
+import os
+
+from analysis.terms import split_identifier
+
+DEFAULT_TOKEN_BUDGET = 30000
+
+# Aproximación habitual para código y texto mixto: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimación rápida del número de tokens de un texto"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def configured_token_budget():
+    """Presupuesto de tokens para el contexto (CONTEXT_TOKEN_BUDGET)"""
+    value = os.environ.get("CONTEXT_TOKEN_BUDGET", "")
+    try:
+        return int(value) if value else DEFAULT_TOKEN_BUDGET
+    except ValueError:
+        print(f"   ⚠️  CONTEXT_TOKEN_BUDGET inválido ({value}), usando {DEFAULT_TOKEN_BUDGET}")
+        return DEFAULT_TOKEN_BUDGET
+
+
+class ContextCandidate:
+    """Bloque opcional de contexto con su versión completa y una versión compacta.
+
+    body son los términos del contenido (texto o frecuencias ya extraídas).
+    estimated_tokens permite decidir si el bloque cabe sin renderizarlo, de modo
+    que el contenido de los bloques descartados nunca se lee de disco.
+    """
+
+    __slots__ = (
+        "category", "key", "identity", "name_terms", "body_terms", "render", "render_compact",
+        "estimated_tokens", "score",
+    )
+
+    def __init__(self, category, key, names, body, render, render_compact=None, estimated_tokens=None):
+        self.category = category
+        self.key = key
+        # El nombre principal (p. ej. la clase) citado literalmente en el prompt pesa más
+        self.identity = os.path.splitext(os.path.basename(names[0]))[0].lower() if names else ""
+        self.name_terms = set(split_identifier(" ".join(names)))
+        if isinstance(body, str):
+            self.body_terms = set(split_identifier(body))
+        else:
+            self.body_terms = set(body or ())
+        self.render = render
+        self.render_compact = render_compact
+        self.estimated_tokens = estimated_tokens
+        self.score = 0.0
+
+
+class ContextBudgetReport:
+    """Resumen de lo incluido y descartado al construir el contexto"""
+
+    def __init__(self, budget_tokens):
+        self.budget_tokens = budget_tokens
+        self.used_tokens = 0
+        self.included = 0
+        self.compacted = 0
+        self.dropped = 0
+        self.dropped_tokens = 0
+        self.by_category = {}
+        # Prefijo estático (igual entre ejecuciones y prompts) que el proveedor puede cachear
+        self.prefix_tokens = 0
+        self.prefix_sha256 = None
+
+    def count(self, category, outcome):
+        stats = self.by_category.setdefault(category, {"included": 0, "compacted": 0, "dropped": 0})
+        stats[outcome] += 1
+
+    def as_dict(self):
+        return {
+            "budget_tokens": self.budget_tokens,
+            "used_tokens": self.used_tokens,
+            "included": self.included,
+            "compacted": self.compacted,
+            "dropped": self.dropped,
+            "dropped_tokens": self.dropped_tokens,
+            "by_category": self.by_category,
+            "prefix_tokens": self.prefix_tokens,
+            "prefix_sha256": self.prefix_sha256,
+        }
+
+    def summary_lines(self):
+        lines = [
+            f"Tokens usados: {self.used_tokens}/{self.budget_tokens}",
+            f"Bloques incluidos: {self.included} (compactados: {self.compacted})",
+            f"Bloques descartados: {self.dropped} (~{self.dropped_tokens} tokens)",
+        ]
+        if self.prefix_sha256 is not None:
+            lines.append(f"Prefijo estático: ~{self.prefix_tokens} tokens, sha256 {self.prefix_sha256[:16]}")
+        for category, stats in self.by_category.items():
+            lines.append(
+                f"  - {category}: {stats['included']} incluidos, "
+                f"{stats['compacted']} compactados, {stats['dropped']} descartados"
+            )
+        return lines
+
+
+class ContextBuilder:
+    """Ensambla el contexto por partes respetando un presupuesto de tokens.
+
+    Las secciones obligatorias se añaden siempre; los candidatos opcionales se
+    ordenan por relevancia y se incluyen mientras quede presupuesto. El texto se
+    acumula en una lista y se une una sola vez al final (coste lineal).
+
+    mark_static_prefix() marca el final de la parte que no depende del prompt;
+    build() calcula su hash para poder comprobar que se reutiliza entre ejecuciones.
+    """
+
+    def __init__(self, budget_tokens=None):
+        self.report = ContextBudgetReport(budget_tokens or configured_token_budget())
+        self._parts = []
+        self._prefix_parts = None
+
+    @property
+    def remaining_tokens(self):
+        return self.report.budget_tokens - self.report.used_tokens
+
+    def add(self, text):
+        """Añade una sección obligatoria (consume presupuesto aunque lo exceda)"""
+        self._parts.append(text)
+        self.report.used_tokens += estimate_tokens(text)
+
+    def add_ranked(self, candidates, terms, reserve_tokens=0, lexical_scores=None):
+        """Añade los candidatos más relevantes para los términos dados hasta agotar el presupuesto.
+
+        lexical_scores ({clave: puntuación}, p. ej. de BM25) se normaliza y se suma
+        a la puntuación por coincidencia de términos.
+        """
+        lexical_scores = lexical_scores or {}
+        top_lexical = max(lexical_scores.values(), default=0.0) or 1.0
+        for candidate in candidates:
+            name_hits = len(candidate.name_terms & terms)
+            body_hits = len(candidate.body_terms & terms)
+            candidate.score = 3.0 * name_hits + body_hits
+            candidate.score += 5.0 * lexical_scores.get(candidate.key, 0.0) / top_lexical
+            if candidate.identity in terms:
+                candidate.score += 10.0
+        # Orden determinista: a igual puntuación, por clave
+        ranked = sorted(candidates, key=lambda candidate: (-candidate.score, candidate.key))
+
+        for candidate in ranked:
+            available = self.remaining_tokens - reserve_tokens
+            tokens = candidate.estimated_tokens
+            if tokens is None or tokens <= available:
+                text = candidate.render()
+                tokens = estimate_tokens(text)
+                if tokens <= available:
+                    self.add(text)
+                    self.report.included += 1
+                    self.report.count(candidate.category, "included")
+                    continue
+
+            if candidate.render_compact is not None:
+                compact = candidate.render_compact()
+                compact_tokens = estimate_tokens(compact)
+                if compact_tokens <= available:
+                    self.add(compact)
+                    self.report.included += 1
+                    self.report.compacted += 1
+                    self.report.count(candidate.category, "compacted")
+                    continue
+
+            self.report.dropped += 1
+            self.report.dropped_tokens += tokens
+            self.report.count(candidate.category, "dropped")
+
+    def mark_static_prefix(self):
+        """Marca lo añadido hasta ahora como prefijo estático"""
+        self._prefix_parts = len(self._parts)
+
+    def build(self):
+        if self._prefix_parts is not None:
+            prefix = "".join(self._parts[:self._prefix_parts])
+            self.report.prefix_tokens = estimate_tokens(prefix)
+            self.report.prefix_sha256 = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        return "".join(self._parts)
@@ -0,0 +1,45 @@
+from analysis.java_scanner import main_type, scan_java
+
+
+def public_method_names(structure):
+    """Nombres de los métodos públicos (sin constructores) de todos los tipos del archivo"""
+    return [
+        method["name"]
+        for type_info in structure["types"]
+        for method in type_info["methods"]
+        if method["kind"] == "method" and method["public"]
+    ]
+
+
+def public_method_signatures(types):
+    """Firmas completas de los métodos y constructores públicos de los tipos indicados"""
+    return [
+        method["signature"]
+        for type_info in types or []
+        for method in type_info["methods"]
+        if method["public"]
+    ]
+
+
+def main_class_name(structure):
+    """Nombre del tipo principal del archivo, o "Unknown" si no declara ninguno"""
+    type_info = main_type(structure)
+    return type_info["name"] if type_info else "Unknown"
+
+
+def extract_methods_from_java(java_content):
+    """Extrae los nombres de métodos públicos de un archivo Java"""
+    return public_method_names(scan_java(java_content))
+
+
+def extract_class_name_from_java(java_content):
+    """Extrae el nombre de la clase principal de un archivo Java"""
+    return main_class_name(scan_java(java_content))
+
+
+def parse_java_source(java_content):
+    """Analiza un archivo Java en una sola pasada y devuelve su estructura completa.
+
+    Es una función de módulo para que pueda ejecutarse en un pool de procesos.
+    """
+    return scan_java(java_content, collect_terms=True)
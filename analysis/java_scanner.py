@@ -0,0 +1,402 @@
+import re
+from collections import Counter
+
+from analysis.terms import split_identifier
+
+# Tokens de Java. Cada alternativa consume texto de forma lineal (sin retroceso
+# anidado): los comentarios y cadenas sin cerrar se consumen hasta el final.
+_TOKEN_PATTERN = re.compile(
+    r'\s*(?:'
+    r'(?P<comment>//[^\n]*|/\*(?:[^*]|\*(?!/))*(?:\*/|\Z))'
+    r'|(?P<text_block>"""(?:[^"\\]|\\.|"(?!""))*(?:"""|\Z))'
+    r'|(?P<string>"(?:[^"\\\n]|\\.)*"?)'
+    r"|(?P<char>'(?:[^'\\\n]|\\.)*'?)"
+    r'|(?P<ident>[A-Za-z_$][\w$]*)'
+    r'|(?P<number>\d[\w.]*)'
+    r'|(?P<symbol>\S))',
+    re.DOTALL,
+)
+_LITERAL_GROUPS = {"string", "char", "text_block"}
+
+IDENT = "ident"
+LITERAL = "literal"
+NUMBER = "number"
+SYMBOL = "symbol"
+
+MODIFIERS = {
+    "public", "protected", "private", "static", "final", "abstract",
+    "synchronized", "native", "default", "strictfp", "transient", "volatile",
+    "sealed", "non-sealed",
+}
+TYPE_KEYWORDS = {"class", "interface", "enum", "record"}
+JAVA_KEYWORDS = MODIFIERS | TYPE_KEYWORDS | {
+    "abstract", "assert", "boolean", "break", "byte", "case", "catch", "char",
+    "const", "continue", "do", "double", "else", "extends", "false", "finally",
+    "float", "for", "goto", "if", "implements", "import", "instanceof", "int",
+    "long", "new", "null", "package", "return", "short", "super", "switch",
+    "this", "throw", "throws", "true", "try", "var", "void", "while", "yield",
+}
+
+
+class Token:
+    __slots__ = ("kind", "text", "line")
+
+    def __init__(self, kind, text, line):
+        self.kind = kind
+        self.text = text
+        self.line = line
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r}, {self.line})"
+
+
+def tokenize_java(source, comments=None):
+    """Genera los tokens de un archivo Java omitiendo espacios y comentarios.
+
+    Si se pasa una lista en comments, se le añade el texto de cada comentario.
+    """
+    line = 1
+    position = 0
+    for match in _TOKEN_PATTERN.finditer(source):
+        kind = match.lastgroup
+        if kind is None:
+            continue  # Espacio final del archivo
+        start = match.start(kind)
+        line += source.count("\n", position, start)
+        position = start
+        if kind == "comment":
+            if comments is not None:
+                comments.append(match.group(kind))
+            continue
+        text = match.group(kind)
+        yield Token(LITERAL if kind in _LITERAL_GROUPS else kind, text, line)
+
+
+def _skip_balanced(tokens, index, open_text, close_text):
+    """Devuelve el índice del token que cierra el grupo abierto en tokens[index]"""
+    depth = 0
+    for position in range(index, len(tokens)):
+        text = tokens[position].text
+        if text == open_text:
+            depth += 1
+        elif text == close_text:
+            depth -= 1
+            if depth == 0:
+                return position
+    return len(tokens) - 1
+
+
+def _join_type(tokens):
+    """Reconstruye el texto de un tipo a partir de sus tokens (List<String>[])"""
+    text = ""
+    for token in tokens:
+        if token.text in (",",):
+            text += ", "
+        elif text and token.kind == IDENT and text[-1] not in "<.([ ":
+            text += " " + token.text
+        else:
+            text += token.text
+    return text
+
+
+def _split_params(tokens):
+    """Separa los parámetros de un método por comas de nivel superior"""
+    params = []
+    current = []
+    depth = 0
+    for token in tokens:
+        if token.text in ("<", "(", "["):
+            depth += 1
+        elif token.text in (">", ")", "]"):
+            depth -= 1
+        if token.text == "," and depth == 0:
+            params.append(current)
+            current = []
+        else:
+            current.append(token)
+    if current:
+        params.append(current)
+
+    result = []
+    for param in params:
+        param = [token for token in param if token.text not in ("final",)]
+        if not param:
+            continue
+        name = param[-1].text
+        result.append({"type": _join_type(param[:-1]), "name": name})
+    return result
+
+
+def _parse_member(declaration, type_name):
+    """Interpreta la declaración pendiente como método o constructor, o devuelve None"""
+    paren = None
+    depth = 0
+    for position, token in enumerate(declaration):
+        if token.text == "<":
+            depth += 1
+        elif token.text == ">":
+            depth -= 1
+        elif token.text == "=" and depth == 0:
+            return None  # Campo con inicializador, lambda o clase anónima
+        elif token.text == "(" and depth == 0:
+            paren = position
+            break
+    if paren is None or paren == 0 or declaration[paren - 1].kind != IDENT:
+        return None
+
+    name = declaration[paren - 1].text
+    head = declaration[:paren - 1]
+
+    modifiers = []
+    position = 0
+    while position < len(head) and head[position].text in MODIFIERS:
+        modifiers.append(head[position].text)
+        position += 1
+
+    type_params = ""
+    if position < len(head) and head[position].text == "<":
+        end = _skip_balanced(head, position, "<", ">")
+        type_params = _join_type(head[position:end + 1])
+        position = end + 1
+
+    return_tokens = head[position:]
+    if not return_tokens:
+        if name != type_name.split(".")[-1]:
+            return None  # Llamada o constante de enum, no una declaración
+        kind = "constructor"
+        return_type = None
+    else:
+        if any(token.kind != IDENT and token.text not in "<>[].,?&" for token in return_tokens):
+            return None
+        kind = "method"
+        return_type = _join_type(return_tokens)
+
+    close = _skip_balanced(declaration, paren, "(", ")")
+    params = _split_params(declaration[paren + 1:close])
+
+    throws = []
+    rest = declaration[close + 1:]
+    if rest and rest[0].text == "throws":
+        throws = [token.text for token in rest[1:] if token.kind == IDENT and token.text != "default"]
+
+    parts = list(modifiers)
+    if type_params:
+        parts.append(type_params)
+    if return_type:
+        parts.append(return_type)
+    signature = " ".join(parts + [name]) if parts else name
+    signature += "(" + ", ".join(f"{param['type']} {param['name']}" for param in params) + ")"
+    if throws:
+        signature += " throws " + ", ".join(throws)
+
+    return {
+        "name": name,
+        "kind": kind,
+        "modifiers": modifiers,
+        "return_type": return_type,
+        "params": params,
+        "throws": throws,
+        "signature": signature,
+        "start_line": declaration[0].line,
+        "end_line": declaration[-1].line,
+    }
+
+
+def _supertypes(tokens):
+    """Nombres (sin genéricos) de los tipos tras extends/implements en la cabecera de un tipo"""
+    names = []
+    current = ""
+    depth = 0
+    collecting = False
+    for token in tokens:
+        text = token.text
+        if text in ("<", "("):
+            depth += 1
+        elif text in (">", ")"):
+            depth -= 1
+        elif depth:
+            continue
+        elif text in ("extends", "implements", "permits", ","):
+            if collecting and current:
+                names.append(current)
+            current = ""
+            collecting = text != "permits" and (collecting or text != ",")
+        elif collecting and (token.kind == IDENT or text == "."):
+            current += text
+    if collecting and current:
+        names.append(current)
+    return names
+
+
+def _type_header(declaration):
+    """Devuelve (tipo, nombre, modificadores, supertipos) si la declaración abre una clase/interfaz/enum"""
+    for position, token in enumerate(declaration):
+        if token.kind != IDENT or token.text not in TYPE_KEYWORDS:
+            continue
+        if position > 0 and declaration[position - 1].text == ".":
+            continue  # Foo.class
+        if position + 1 >= len(declaration) or declaration[position + 1].kind != IDENT:
+            continue
+        if token.text == "record" and (
+            position + 2 >= len(declaration) or declaration[position + 2].text not in ("(", "<")
+        ):
+            continue
+        kind = token.text
+        if position > 0 and declaration[position - 1].text == "@":
+            kind = "annotation"
+        modifiers = [t.text for t in declaration[:position] if t.text in MODIFIERS]
+        return kind, declaration[position + 1].text, modifiers, _supertypes(declaration[position + 2:])
+    return None
+
+
+def _is_public_member(method, type_info):
+    if "public" in method["modifiers"]:
+        return True
+    # Los miembros de interfaces y anotaciones son públicos salvo que se declaren private
+    return type_info["kind"] in ("interface", "annotation") and "private" not in method["modifiers"]
+
+
+def _index_terms(tokens, comments):
+    """Frecuencia de términos (identificadores divididos y palabras de comentarios) para el índice léxico"""
+    identifiers = Counter(
+        token.text for token in tokens if token.kind == IDENT and token.text not in JAVA_KEYWORDS
+    )
+    terms = Counter()
+    # Cada identificador distinto se divide una sola vez
+    for identifier, count in identifiers.items():
+        for term in split_identifier(identifier):
+            terms[term] += count
+    for comment in comments:
+        terms.update(term for term in split_identifier(comment) if len(term) > 2)
+    return dict(terms)
+
+
+def scan_java(source, collect_terms=False):
+    """Analiza un archivo Java en una sola pasada lineal.
+
+    Devuelve un diccionario con el paquete, los imports y todos los tipos
+    (clases, interfaces, enums, records y anotaciones, incluidos los anidados)
+    con las firmas completas de sus métodos y sus rangos de líneas. Con
+    collect_terms=True añade "terms", la frecuencia de términos del archivo
+    para el índice BM25.
+    """
+    comments = [] if collect_terms else None
+    tokens = list(tokenize_java(source, comments))
+    result = scan_tokens(tokens)
+    if collect_terms:
+        result["terms"] = _index_terms(tokens, comments)
+    return result
+
+
+def scan_tokens(tokens):
+    """Como scan_java, pero sobre una lista de tokens ya generada por tokenize_java"""
+    result = {"package": None, "imports": [], "types": []}
+
+    stack = []          # Tipos abiertos: (type_info, profundidad del cuerpo)
+    depth = 0
+    declaration = []    # Tokens de la declaración en curso
+    enum_constants = False
+
+    index = 0
+    total = len(tokens)
+    while index < total:
+        token = tokens[index]
+        text = token.text
+
+        # Anotaciones: se omiten completas, salvo la declaración @interface
+        if text == "@" and index + 1 < total and tokens[index + 1].text != "interface":
+            index += 2
+            while index + 1 < total and tokens[index].text == "." and tokens[index + 1].kind == IDENT:
+                index += 2
+            if index < total and tokens[index].text == "(":
+                index = _skip_balanced(tokens, index, "(", ")") + 1
+            continue
+
+        in_type_body = bool(stack) and stack[-1][1] == depth
+
+        if depth == 0 and not stack and text in ("package", "import") and not declaration:
+            end = index
+            while end < total and tokens[end].text != ";":
+                end += 1
+            name = "".join(t.text for t in tokens[index + 1:end] if t.text != "static")
+            if text == "package":
+                result["package"] = name
+            else:
+                result["imports"].append(name)
+            index = end + 1
+            continue
+
+        if text == "{":
+            header = _type_header(declaration) if (depth == 0 or in_type_body) else None
+            if header and not (enum_constants and in_type_body):
+                kind, name, modifiers, supertypes = header
+                parent = stack[-1][0] if stack else None
+                qualified = f"{parent['name']}.{name}" if parent else name
+                type_info = {
+                    "name": qualified,
+                    "kind": kind,
+                    "modifiers": modifiers,
+                    "parent": parent["name"] if parent else None,
+                    "supertypes": supertypes,
+                    "start_line": declaration[0].line,
+                    "end_line": token.line,
+                    "methods": [],
+                }
+                result["types"].append(type_info)
+                depth += 1
+                stack.append((type_info, depth))
+                enum_constants = kind == "enum"
+                declaration = []
+                index += 1
+                continue
+
+            close = _skip_balanced(tokens, index, "{", "}")
+            if in_type_body and declaration and not enum_constants:
+                member = _parse_member(declaration + [tokens[close]], stack[-1][0]["name"])
+                if member:
+                    stack[-1][0]["methods"].append(member)
+            if declaration and any(t.text == "=" for t in declaration):
+                # Inicializador de campo ({...}, lambda o clase anónima): la declaración sigue hasta el ';'
+                declaration.extend(tokens[index:close + 1])
+            else:
+                declaration = []
+            index = close + 1
+            continue
+
+        if text == ";":
+            if in_type_body and enum_constants:
+                enum_constants = False
+            elif in_type_body and declaration:
+                member = _parse_member(declaration + [token], stack[-1][0]["name"])
+                if member:
+                    stack[-1][0]["methods"].append(member)
+            declaration = []
+            index += 1
+            continue
+
+        if text == "}":
+            if stack and stack[-1][1] == depth:
+                type_info, _ = stack.pop()
+                type_info["end_line"] = token.line
+                enum_constants = False
+            depth = max(0, depth - 1)
+            declaration = []
+            index += 1
+            continue
+
+        declaration.append(token)
+        index += 1
+
+    for type_info in result["types"]:
+        for method in type_info["methods"]:
+            method["public"] = _is_public_member(method, type_info)
+    return result
+
+
+def main_type(structure):
+    """Devuelve el tipo principal: el primer tipo público de nivel superior, o el primero"""
+    top_level = [type_info for type_info in structure["types"] if type_info["parent"] is None]
+    for type_info in top_level:
+        if "public" in type_info["modifiers"]:
+            return type_info
+    return top_level[0] if top_level else None
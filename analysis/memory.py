@@ -0,0 +1,78 @@
+import os
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _max_rss_mb(who):
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class MemoryProbe:
+    """Mide la memoria de una fase.
+
+    ru_maxrss es el pico de toda la vida del proceso (y, para los workers, de
+    los que ya terminaron), no el de la fase: se guarda el valor al entrar y al
+    salir, y la diferencia es cuánto subió la fase ese pico (0 si la fase usó
+    menos memoria que un momento anterior).
+
+    Con ANALYSIS_TRACE_MEMORY=1 además mide con tracemalloc el pico de memoria
+    Python asignada durante la fase (más preciso, pero ralentiza la ejecución).
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.trace = os.environ.get("ANALYSIS_TRACE_MEMORY") == "1"
+        self.result = {}
+        self._started_tracing = False
+        self._rss_before = None
+        self._traced_before = 0
+
+    def __enter__(self):
+        self._rss_before = _max_rss_mb(resource.RUSAGE_SELF) if resource else None
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif self.trace:
+            # Ya traza otro llamador: se mide el pico relativo a la memoria actual
+            self._traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        peak_rss = _max_rss_mb(resource.RUSAGE_SELF) if resource else None
+        self.result = {
+            # Picos de toda la vida del proceso y de los workers ya terminados
+            "peak_rss_mb": peak_rss,
+            "workers_peak_rss_mb": _max_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            "peak_rss_before_mb": self._rss_before,
+            "phase_rss_growth_mb": peak_rss - self._rss_before if peak_rss is not None else None,
+        }
+        if self.trace:
+            _, peak = tracemalloc.get_traced_memory()
+            self.result["python_peak_mb"] = (peak - self._traced_before) / (1024 * 1024)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        return False
+
+    def summary_lines(self):
+        lines = []
+        if self.result.get("peak_rss_mb") is not None:
+            lines.append(
+                f"RSS pico del proceso (desde el inicio): {self.result['peak_rss_mb']:.1f} MB; "
+                f"{self.label} lo subió {self.result['phase_rss_growth_mb']:.1f} MB"
+            )
+        if self.result.get("workers_peak_rss_mb"):
+            lines.append(f"RSS pico de los workers terminados (desde el inicio): {self.result['workers_peak_rss_mb']:.1f} MB")
+        if "python_peak_mb" in self.result:
+            lines.append(f"Memoria Python pico ({self.label}): {self.result['python_peak_mb']:.1f} MB")
+        return lines
@@ -0,0 +1,197 @@
+import atexit
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from analysis.java_parser import main_class_name, parse_java_source, public_method_names
+
+# Archivos por lote enviado a los pools. Un único lote incompleto (árboles
+# pequeños) se parsea en el hilo lector: no compensa levantar procesos.
+BATCH_SIZE = 64
+
+# Volumen mínimo de texto para que map_sources reparta el trabajo entre procesos
+PARALLEL_MIN_CHARS = 256 * 1024
+
+
+def configured_workers():
+    """Número de workers de análisis (ANALYSIS_WORKERS, por defecto el número de CPUs)"""
+    value = os.environ.get("ANALYSIS_WORKERS", "")
+    try:
+        workers = int(value) if value else (os.cpu_count() or 1)
+    except ValueError:
+        print(f"   ⚠️  ANALYSIS_WORKERS inválido ({value}), usando 1")
+        workers = 1
+    return max(1, workers)
+
+
+class FileReadResult:
+    """Resultado de leer (y opcionalmente analizar) un archivo del pool"""
+
+    __slots__ = ("path", "content", "size", "class_name", "methods", "structure", "error")
+
+    def __init__(self, path, content=None, error=None, size=None):
+        self.path = path
+        self.content = content
+        # Tamaño en bytes en disco (st_size), como el de los registros del proyecto objetivo
+        self.size = size
+        self.class_name = None
+        self.methods = None
+        self.structure = None
+        self.error = error
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return FileReadResult(path, content=f.read(), size=os.fstat(f.fileno()).st_size)
+    except Exception as e:
+        return FileReadResult(path, error=e)
+
+
+def _read_batch(paths):
+    return [_read_text(path) for path in paths]
+
+
+def _parse_batch(contents):
+    return [parse_java_source(content) for content in contents]
+
+
+def _batches(paths, size):
+    """Agrupa un iterable de rutas en listas de tamaño size sin materializarlo entero"""
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ParallelAnalysisEngine:
+    """Etapa de análisis paralela: hilos para la E/S y procesos para el parseo de Java.
+
+    Las rutas pueden llegar como generador (p. ej. desde walk_files): se envían
+    por lotes a los pools mientras el recorrido continúa y los resultados se
+    generan siempre en el mismo orden que las rutas de entrada, de modo que la
+    salida es idéntica a la del recorrido secuencial.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or configured_workers()
+        self._threads = None
+        self._processes = None
+        self._processes_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def _max_in_flight(self):
+        # Limita los lotes pendientes para que la memoria no crezca con el tamaño del árbol
+        return self.workers * 4
+
+    def _thread_pool(self):
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=min(32, self.workers * 4), thread_name_prefix="autoqa-io"
+            )
+        return self._threads
+
+    def _process_pool(self):
+        with self._lock:
+            if self._processes is None and not self._processes_failed:
+                try:
+                    self._processes = ProcessPoolExecutor(max_workers=self.workers)
+                except (OSError, NotImplementedError) as e:
+                    print(f"   ⚠️  Pool de procesos no disponible, parseo en un solo proceso: {e}")
+                    self._processes_failed = True
+            return None if self._processes_failed else self._processes
+
+    def _pipeline(self, paths, batch_function):
+        """Envía lotes al pool de hilos a medida que llegan y genera sus resultados en orden"""
+        if self.workers <= 1:
+            for batch in _batches(paths, BATCH_SIZE):
+                yield from batch_function(batch)
+            return
+
+        pool = self._thread_pool()
+        pending = deque()
+        for batch in _batches(paths, BATCH_SIZE):
+            pending.append(pool.submit(batch_function, batch))
+            while len(pending) > self._max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def _read_and_parse_batch(self, batch):
+        results = _read_batch(batch)
+        parseable = [result for result in results if result.error is None]
+        contents = [result.content for result in parseable]
+
+        pool = None
+        if self.workers > 1 and (len(batch) == BATCH_SIZE or self._processes is not None):
+            pool = self._process_pool()
+
+        parsed = None
+        if pool is not None:
+            try:
+                parsed = pool.submit(_parse_batch, contents).result()
+            except Exception as e:
+                print(f"   ⚠️  Falló el parseo en paralelo, reintentando en serie: {e}")
+                self._processes_failed = True
+        if parsed is None:
+            parsed = _parse_batch(contents)
+
+        for result, structure in zip(parseable, parsed):
+            result.structure = structure
+            result.class_name = main_class_name(structure)
+            result.methods = public_method_names(structure)
+            # Solo se conservan los símbolos: el texto no queda retenido mientras el llamador acumula resultados
+            result.content = None
+        return results
+
+    def read_files(self, paths):
+        """Genera el resultado de leer cada archivo de texto; los errores van en el resultado, no se lanzan"""
+        return self._pipeline(paths, _read_batch)
+
+    def read_and_parse_java(self, paths):
+        """Genera, para cada archivo Java, su estructura, clase y métodos (el contenido se descarta tras parsearlo)"""
+        return self._pipeline(paths, self._read_and_parse_batch)
+
+    def map_sources(self, function, sources):
+        """Aplica function (de módulo, serializable) a cada texto y devuelve los resultados en orden.
+
+        Usa el pool de procesos solo si el volumen compensa el coste de enviarlo;
+        si el pool falla, se procesa en serie.
+        """
+        sources = list(sources)
+        if self.workers > 1 and len(sources) > 1 and sum(len(source) for source in sources) >= PARALLEL_MIN_CHARS:
+            pool = self._process_pool()
+            if pool is not None:
+                try:
+                    chunksize = max(1, len(sources) // (self.workers * 4))
+                    return list(pool.map(function, sources, chunksize=chunksize))
+                except Exception as e:
+                    print(f"   ⚠️  Falló el procesado en paralelo, reintentando en serie: {e}")
+                    self._processes_failed = True
+        return [function(source) for source in sources]
+
+    def shutdown(self):
+        if self._threads is not None:
+            self._threads.shutdown()
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown()
+            self._processes = None
+
+
+_engine = None
+
+
+def get_analysis_engine():
+    """Motor compartido por todos los analizadores de la ejecución"""
+    global _engine
+    if _engine is None:
+        _engine = ParallelAnalysisEngine()
+        atexit.register(_engine.shutdown)
+    return _engine
@@ -0,0 +1,495 @@
+import os
+
+from analysis.bm25 import load_or_build_index
+from analysis.cache import analysis_cache_dir, open_analysis_cache
+from analysis.context_builder import CHARS_PER_TOKEN, ContextBuilder, ContextCandidate, estimate_tokens
+from analysis.java_parser import public_method_signatures
+from analysis.parallel import get_analysis_engine
+from analysis.records import JavaFileRecord, ProjectFileRecord
+from analysis.symbols import SymbolIndex
+from analysis.terms import prompt_terms
+from analysis.walker import walk_files
+
+# Caracteres de código mostrados por archivo cuando entra en el contexto
+TARGET_SNIPPET_CHARS = 1000
+FRAMEWORK_SNIPPET_CHARS = 1200
+REFERENCE_SNIPPET_CHARS = 600
+
+
+def classify_java_file(analysis, file_info):
+    """Añade un archivo analizado a su categoría (page object, test, utilidad) y a all_java_files"""
+    file_path = file_info.file
+    file_name = file_info.file_name
+
+    # Clasificar por tipo/ubicación
+    if "/paginas/" in file_path or "Page" in file_name:
+        analysis["page_objects"].append(file_info)
+    elif "/casos/" in file_path or "Test" in file_name:
+        analysis["test_classes"].append(file_info)
+    elif "/utils/" in file_path or "Util" in file_name or "Helper" in file_name:
+        analysis["utilities"].append(file_info)
+
+    # Agregar a la lista completa independientemente
+    analysis["all_java_files"].append(file_info)
+
+
+def configured_framework_lib_paths():
+    """Rutas de las librerías del framework (FRAMEWORK_LIB_PATHS, separadas por comas)"""
+    framework_lib_paths = os.environ.get("FRAMEWORK_LIB_PATHS", "../selenium-driver-lib,../selenium-commons-lib")
+    return [path.strip() for path in framework_lib_paths.split(",") if path.strip()]
+
+
+def configured_additional_project_paths():
+    """Rutas de los proyectos adicionales (ADDITIONAL_PROJECT_PATHS, separadas por comas)"""
+    additional_project_paths = os.environ.get("ADDITIONAL_PROJECT_PATHS", "")
+    return [path.strip() for path in additional_project_paths.split(",") if path.strip()]
+
+
+def analyze_existing_code(base_path):
+    """Analiza COMPLETAMENTE el código existente en el repositorio objetivo"""
+    analysis = {
+        "page_objects": [],
+        "test_classes": [],
+        "utilities": [],
+        "all_java_files": [],
+        "structure": {}
+    }
+    
+    if not os.path.exists(base_path):
+        return analysis
+    
+    print(f"   🔍 Analizando TODOS los archivos Java en: {base_path}")
+    
+    cache = open_analysis_cache(base_path)
+    seen_paths = set()
+    
+    # Primera pasada (en streaming): recorrer el árbol, consultar la caché y
+    # generar los archivos a re-analizar mientras el recorrido continúa
+    entries = []
+    
+    def pending_paths():
+        for file_path, _ in walk_files(base_path, ["**/*.java"]):
+            try:
+                relative_path = os.path.relpath(file_path, base_path)
+                seen_paths.add(relative_path)
+                stat = os.stat(file_path)
+            except Exception as e:
+                print(f"      ⚠️  Error leyendo {file_path}: {e}")
+                continue
+            
+            # Reutilizar el análisis cacheado si el archivo no cambió (mismo mtime y tamaño)
+            cached = cache.lookup(relative_path, stat) if cache else None
+            entries.append((file_path, relative_path, stat, cached))
+            if cached is None:
+                yield file_path
+    
+    # Segunda pasada: leer y analizar en paralelo solo los archivos nuevos o modificados
+    # (los resultados ya no llevan el contenido, solo los símbolos)
+    parsed = {
+        result.path: result
+        for result in get_analysis_engine().read_and_parse_java(pending_paths())
+    }
+    
+    print(f"   📁 Encontrados {len(entries)} archivos Java en total")
+    
+    for file_path, relative_path, stat, cached in entries:
+        if cached is None:
+            result = parsed[file_path]
+            if result.error is not None:
+                print(f"      ⚠️  Error leyendo {file_path}: {result.error}")
+                continue
+            
+            file_info = JavaFileRecord(
+                file_path, relative_path, stat.st_size, result.class_name, result.methods,
+                result.structure["package"], result.structure["types"], result.structure["terms"],
+            )
+            if cache:
+                cache.store(relative_path, stat, file_info.to_cache())
+        else:
+            file_info = JavaFileRecord.from_cache(file_path, relative_path, stat.st_size, cached)
+        
+        classify_java_file(analysis, file_info)
+    
+    if cache:
+        cache.prune(seen_paths)
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"      ⚠️  No se pudo guardar la caché de análisis: {e}")
+        print(f"   💾 Caché de análisis: {cache.hits} aciertos, {cache.misses} re-analizados, {cache.evicted} eliminados")
+    
+    print(f"   📊 Clasificación encontrada:")
+    print(f"      - Page Objects: {len(analysis['page_objects'])}")
+    print(f"      - Test Classes: {len(analysis['test_classes'])}")  
+    print(f"      - Utilities: {len(analysis['utilities'])}")
+    print(f"      - Otros archivos Java: {len(analysis['all_java_files']) - len(analysis['page_objects']) - len(analysis['test_classes']) - len(analysis['utilities'])}")
+    
+    return analysis
+
+def analyze_framework_libraries(framework_lib_paths=None):
+    """Analiza COMPLETAMENTE las librerías del framework para entender funciones disponibles"""
+    framework_analysis = {
+        "libraries": []
+    }
+    
+    # Obtener paths de librerías desde variables de entorno (separadas por comas)
+    if framework_lib_paths is None:
+        lib_paths = configured_framework_lib_paths()
+    else:
+        lib_paths = [path.strip() for path in framework_lib_paths.split(",") if path.strip()]
+    
+    for lib_path in lib_paths:
+        if os.path.exists(lib_path):
+            lib_name = os.path.basename(lib_path)
+            print(f"   📚 Analizando librería {lib_name} en: {lib_path}")
+            
+            lib_analysis = {
+                "name": lib_name,
+                "path": lib_path,
+                "classes": []
+            }
+            
+            java_files = (file_path for file_path, _ in walk_files(lib_path, ["**/*.java"]))
+            for result in get_analysis_engine().read_and_parse_java(java_files):
+                file_path = result.path
+                if result.error is not None:
+                    print(f"      ⚠️  Error leyendo {file_path}: {result.error}")
+                    continue
+                
+                lib_analysis["classes"].append(JavaFileRecord(
+                    file_path, os.path.relpath(file_path, lib_path), result.size,
+                    result.class_name, result.methods, result.structure["package"],
+                    result.structure["types"], result.structure["terms"],
+                ))
+            
+            framework_analysis["libraries"].append(lib_analysis)
+            print(f"      ✅ {len(lib_analysis['classes'])} clases analizadas en {lib_name}")
+            
+            # Imprimir resumen de métodos encontrados
+            total_methods = sum(len(cls.methods) for cls in lib_analysis['classes'])
+            print(f"      🔧 Total de métodos públicos encontrados: {total_methods}")
+        else:
+            print(f"   ⚠️  Librería no encontrada: {lib_path}")
+    
+    return framework_analysis
+
+def analyze_additional_projects(additional_project_paths=None):
+    """Analiza proyectos adicionales descargados para proporcionar contexto extra"""
+    additional_projects = []
+    
+    # Obtener paths de proyectos adicionales desde variables de entorno
+    if additional_project_paths is None:
+        additional_project_paths = os.environ.get("ADDITIONAL_PROJECT_PATHS", "")
+    if not additional_project_paths:
+        print("   ℹ️  No se especificaron proyectos adicionales (ADDITIONAL_PROJECT_PATHS vacío)")
+        return additional_projects
+    
+    project_paths = [path.strip() for path in additional_project_paths.split(",") if path.strip()]
+    if not project_paths:
+        print("   ℹ️  No se encontraron paths válidos en ADDITIONAL_PROJECT_PATHS")
+        return additional_projects
+    
+    for project_path in project_paths:
+        if os.path.exists(project_path):
+            project_name = os.path.basename(project_path)
+            print(f"   📂 Analizando proyecto adicional: {project_name} en {project_path}")
+            
+            project_analysis = {
+                "name": project_name,
+                "path": project_path,
+                "files": []
+            }
+            
+            # Buscar archivos Java, XML, properties, etc.
+            file_patterns = [
+                "**/*.java",
+                "**/*.xml", 
+                "**/*.properties",
+                "**/*.yml",
+                "**/*.yaml",
+                "**/README.md",
+                "**/pom.xml"
+            ]
+            
+            # Un único recorrido del árbol: cada archivo se compara con todos los patrones.
+            # El contenido no se lee aquí: se carga bajo demanda si se muestra en el contexto
+            for file_path, _ in walk_files(project_path, file_patterns):
+                try:
+                    file_extension = os.path.splitext(file_path)[1][1:]  # Sin el punto
+                    size = os.path.getsize(file_path)
+                except Exception as e:
+                    print(f"      ⚠️  Error leyendo {file_path}: {e}")
+                    continue
+                
+                project_analysis["files"].append(ProjectFileRecord(
+                    os.path.relpath(file_path, project_path), file_path, file_extension or "file", size,
+                    # Contenido disponible para archivos importantes y pequeños
+                    readable=file_extension in ['java', 'xml', 'properties', 'md'] and size < 5000,
+                ))
+            
+            additional_projects.append(project_analysis)
+            print(f"      📁 {len(project_analysis['files'])} archivos encontrados")
+        else:
+            print(f"   ⚠️  Proyecto adicional no encontrado: {project_path}")
+    
+    return additional_projects
+
+def analyze_workspace(target_project_path, snapshot=None):
+    """Analiza el proyecto objetivo, las librerías del framework y los proyectos adicionales y construye los índices.
+
+    Con snapshot (archivo o directorio de `autoqa.py analyze --snapshot`), si
+    corresponde a los commits actuales de los repos se carga en lugar de
+    volver a analizarlos. Devuelve un diccionario con code_analysis,
+    framework_analysis, additional_projects, symbol_index, lexical_index y
+    from_snapshot. Los pools de análisis quedan liberados al terminar.
+    """
+    loaded = None
+    if snapshot:
+        from analysis.snapshot import load_snapshot
+
+        print(f"💾 Buscando snapshot del análisis en: {snapshot}")
+        loaded = load_snapshot(snapshot, target_project_path)
+
+    if loaded is not None:
+        code_analysis, framework_analysis, additional_projects = loaded
+    else:
+        analysis_engine = get_analysis_engine()
+        print(f"⚙️  Workers de análisis en paralelo: {analysis_engine.workers}")
+        print(f"🔍 Analizando código existente en: {target_project_path}")
+        code_analysis = analyze_existing_code(target_project_path)
+        print(f"   📁 Page Objects encontrados: {len(code_analysis['page_objects'])}")
+        print(f"   📁 Tests encontrados: {len(code_analysis['test_classes'])}")
+        print(f"   📁 Utilidades encontradas: {len(code_analysis['utilities'])}")
+
+        print(f"🔍 Analizando librerías del framework...")
+        framework_analysis = analyze_framework_libraries()
+        for lib in framework_analysis['libraries']:
+            print(f"   📚 Clases en {lib['name']}: {len(lib['classes'])}")
+
+        print(f"🔍 Analizando proyectos adicionales...")
+        additional_projects = analyze_additional_projects()
+        for project in additional_projects:
+            print(f"   📂 Archivos en {project['name']}: {len(project['files'])}")
+
+        # Liberar los pools de análisis antes de construir los índices y ejecutar el agente
+        analysis_engine.shutdown()
+
+    # Índice de símbolos que el agente consulta con sus herramientas
+    symbol_index = SymbolIndex.build(code_analysis, framework_analysis, target_project_path)
+    print(f"🗂️  Índice de símbolos: {len(symbol_index.classes)} clases en {len(symbol_index.packages)} paquetes")
+    lexical_index = load_or_build_index(code_analysis, framework_analysis, target_project_path, analysis_cache_dir())
+
+    return {
+        "code_analysis": code_analysis,
+        "framework_analysis": framework_analysis,
+        "additional_projects": additional_projects,
+        "symbol_index": symbol_index,
+        "lexical_index": lexical_index,
+        "from_snapshot": loaded is not None,
+    }
+
+
+def _snippet_tokens(record, limit):
+    """Tokens estimados del fragmento de código de un registro, sin leerlo de disco"""
+    return min(record.size, limit) // CHARS_PER_TOKEN + 1
+
+def _java_file_candidate(category, java_file):
+    """Candidato de contexto para un archivo Java del proyecto objetivo"""
+    signatures = public_method_signatures(java_file.types)
+    
+    def render_compact():
+        return f"""
+📁 {java_file.relative_path}
+   Clase: {java_file.class_name}
+   Métodos disponibles: {', '.join(java_file.methods) if java_file.methods else 'Ninguno detectado'}
+"""
+    
+    def render():
+        # El fragmento se lee de disco solo para los archivos que entran en el contexto
+        return render_compact() + "".join(f"   - {signature}\n" for signature in signatures) + f"""
+```java
+{java_file.snippet(TARGET_SNIPPET_CHARS)}
+```
+"""
+    
+    return ContextCandidate(
+        category, java_file.file,
+        [java_file.relative_path, java_file.class_name] + java_file.methods,
+        java_file.terms, render, render_compact,
+        estimated_tokens=estimate_tokens(render_compact()) + _snippet_tokens(java_file, TARGET_SNIPPET_CHARS)
+        + sum(estimate_tokens(signature) for signature in signatures),
+    )
+
+def _framework_class_candidate(lib, cls):
+    """Candidato de contexto para una clase de una librería del framework"""
+    signatures = public_method_signatures(cls.types)
+    
+    def render_compact():
+        return f"""
+📋 [{lib['name']}] {cls.relative_path}
+   Clase: {cls.class_name}
+   Métodos públicos: {', '.join(cls.methods) if cls.methods else 'Ninguno detectado'}
+"""
+    
+    def render():
+        return render_compact() + "".join(f"   - {signature}\n" for signature in signatures) + f"""
+```java
+{cls.snippet(FRAMEWORK_SNIPPET_CHARS)}
+```
+"""
+    
+    return ContextCandidate(
+        "framework", cls.file,
+        [cls.relative_path, cls.class_name] + cls.methods,
+        cls.terms, render, render_compact,
+        estimated_tokens=estimate_tokens(render_compact()) + _snippet_tokens(cls, FRAMEWORK_SNIPPET_CHARS)
+        + sum(estimate_tokens(signature) for signature in signatures),
+    )
+
+def _reference_file_candidate(project, file_info):
+    """Candidato de contexto para un archivo de un proyecto de referencia"""
+    def render_compact():
+        return f"   - [{project['name']}] {file_info.name}: {file_info.type}\n"
+    
+    def render():
+        content = file_info.content(REFERENCE_SNIPPET_CHARS) if file_info.type == 'java' else ""
+        if not content:
+            return render_compact()
+        return render_compact() + f"""
+```java
+{content}
+```
+"""
+    
+    return ContextCandidate(
+        "referencia", f"{project['name']}/{file_info.name}",
+        [file_info.name], None, render, render_compact,
+        estimated_tokens=estimate_tokens(render_compact())
+        + (_snippet_tokens(file_info, REFERENCE_SNIPPET_CHARS) if file_info.type == 'java' and file_info.readable else 0),
+    )
+
+def create_context_enhanced_prompt(original_prompt, code_analysis, framework_analysis, target_path, additional_projects=None, symbol_index=None, token_budget=None, lexical_index=None, static_instructions=""):
+    """Agrega al prompt original el contexto más relevante del código existente, el framework y los proyectos adicionales.
+
+    El contexto se limita a un presupuesto de tokens (CONTEXT_TOKEN_BUDGET): las
+    secciones fijas se incluyen siempre y los archivos se ordenan por relevancia
+    respecto al prompt (coincidencia de términos y BM25 si se pasa lexical_index)
+    hasta llenar el presupuesto. El resto queda disponible para el agente
+    mediante find_class(), find_method(), list_package() y search_code().
+    
+    Las secciones fijas y static_instructions van primero y no dependen del
+    prompt, de modo que forman un prefijo idéntico entre ejecuciones que el
+    proveedor puede cachear; el código relevante y el prompt original van al
+    final. Todo el contenido se genera en un orden determinista.
+    
+    Devuelve el prompt enriquecido y un ContextBudgetReport con lo incluido y
+    descartado y el hash del prefijo estático.
+    """
+    if symbol_index is None:
+        symbol_index = SymbolIndex.build(code_analysis, framework_analysis, target_path)
+    package_summary = symbol_index.package_summary()
+    target_name = target_path.rstrip("/").split("/")[-1] or target_path
+    builder = ContextBuilder(token_budget)
+    
+    builder.add(f"""=== CONTEXTO AUTOMÁTICO AGREGADO POR AUTOQA ===
+
+REPOSITORIO OBJETIVO PARA CREAR/EDITAR ARCHIVOS: {target_path}
+=================================================================
+IMPORTANTE: Cuando uses create_java_file(), replace_string_in_file() o apply_edits(), las rutas deben comenzar con: {target_path}/
+Para varios cambios usa apply_edits() en una sola llamada. Los archivos se escriben en disco en cada create_checkpoint() y al terminar.
+
+ANÁLISIS DEL PROYECTO OBJETIVO: {target_path}
+=====================================================
+
+ARCHIVOS JAVA EXISTENTES: {len(code_analysis['all_java_files'])} archivos
+   - Page Objects: {len(code_analysis['page_objects'])}
+   - Test Classes: {len(code_analysis['test_classes'])}
+   - Utilities: {len(code_analysis['utilities'])}
+
+PAQUETES DEL PROYECTO OBJETIVO:
+""")
+    builder.add("".join(
+        f"   - {package} ({count} clases)\n"
+        for package, count in sorted(package_summary.get(target_name, {}).items())
+    ))
+    
+    builder.add("""
+
+LIBRERÍAS DEL FRAMEWORK DISPONIBLES:
+=====================================
+IMPORTANTE: Estas librerías ya contienen métodos implementados. NO DUPLICAR funcionalidad.
+
+""")
+    for lib in framework_analysis['libraries']:
+        builder.add(f"""
+🏗️ LIBRERÍA: {lib['name'].upper()} ({len(lib['classes'])} clases)
+   Ubicación: {lib['path']}
+   Paquetes:
+""" + "".join(
+            f"      - {package} ({count} clases)\n"
+            for package, count in sorted(package_summary.get(lib['name'], {}).items())
+        ))
+    
+    builder.add(f"""
+
+CONSULTA DE CLASES Y MÉTODOS BAJO DEMANDA:
+==========================================
+El índice de símbolos contiene {len(symbol_index.classes)} clases del proyecto objetivo y del framework.
+Usa estas herramientas para consultar firmas, archivos y líneas exactas:
+- find_class(class_name) - Busca una clase por nombre simple o cualificado y lista sus métodos
+- find_method(method_name, class_name) - Busca un método por nombre (class_name puede ir vacío)
+- list_package(package_name) - Lista las clases de un paquete
+- search_code(query, top_k) - Búsqueda por texto libre (BM25) sobre identificadores y comentarios
+Después usa read_file_lines() con el archivo y las líneas indicadas (o grep_file()) si necesitas ver la implementación.
+""")
+    
+    # Instrucciones específicas para evitar duplicación
+    builder.add("""
+
+🚨 INSTRUCCIONES CRÍTICAS PARA EVITAR DUPLICACIÓN:
+=================================================
+1. ANTES de crear cualquier método, REVISAR con find_method()/find_class() si ya existe en las librerías del framework
+2. REUTILIZAR métodos existentes en lugar de crear nuevos
+3. Si necesitas funcionalidad de esperas, acciones, o utilidades, USAR las clases del framework
+4. Solo crear métodos nuevos si NO EXISTEN en el framework
+5. Al usar métodos del framework, importar las clases correctamente
+
+EJEMPLO DE REUTILIZACIÓN:
+- Si necesitas esperar un elemento, usar métodos de las librerías de selenium
+- Si necesitas realizar acciones, usar métodos de las librerías de acciones
+- Si necesitas utilidades, usar métodos de las librerías de utils
+
+""")
+    if static_instructions:
+        builder.add(static_instructions)
+    builder.mark_static_prefix()
+    
+    # El prompt original va al final (se reserva antes de llenar el presupuesto)
+    task_section = f"""
+
+=== TAREA SOLICITADA ===
+{original_prompt}
+"""
+    
+    # Candidatos opcionales ordenados por relevancia respecto al prompt
+    candidates = []
+    for category, key in (("page_objects", "page_objects"), ("tests", "test_classes"), ("utilidades", "utilities")):
+        candidates.extend(_java_file_candidate(category, java_file) for java_file in code_analysis[key])
+    for lib in framework_analysis['libraries']:
+        candidates.extend(_framework_class_candidate(lib, cls) for cls in lib['classes'])
+    for project in additional_projects or []:
+        candidates.extend(_reference_file_candidate(project, file_info) for file_info in project['files'])
+    
+    builder.add("""
+
+CÓDIGO MÁS RELEVANTE PARA LA TAREA (ordenado por relevancia, dentro del presupuesto de contexto):
+==================================================================================================
+""")
+    lexical_scores = lexical_index.scores(original_prompt) if lexical_index is not None else None
+    builder.add_ranked(
+        candidates, prompt_terms(original_prompt),
+        reserve_tokens=estimate_tokens(task_section), lexical_scores=lexical_scores,
+    )
+    builder.add(task_section)
+    
+    return builder.build(), builder.report
@@ -0,0 +1,86 @@
+import os
+
+
+def _read_prefix(path, limit):
+    """Lee solo los primeros limit caracteres de un archivo (con "..." si se trunca)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read(limit + 1)
+    except (OSError, UnicodeDecodeError) as e:
+        return f"// No se pudo leer {path}: {e}"
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+class JavaFileRecord:
+    """Registro compacto de un archivo Java analizado.
+
+    Guarda la ruta, el tamaño y los símbolos parseados, pero no el contenido:
+    el fragmento de código se lee de disco bajo demanda, solo para los archivos
+    que se renderizan en el contexto.
+    """
+
+    __slots__ = ("file", "relative_path", "size", "class_name", "methods", "package", "types", "terms")
+
+    def __init__(self, file, relative_path, size, class_name, methods, package, types, terms=None):
+        self.file = file
+        self.relative_path = relative_path
+        self.size = size
+        self.class_name = class_name
+        self.methods = methods
+        self.package = package
+        self.types = types
+        self.terms = terms
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.file)
+
+    def snippet(self, limit):
+        """Primeros limit caracteres del archivo, leídos de disco en el momento"""
+        return _read_prefix(self.file, limit)
+
+    def to_cache(self):
+        """Datos del registro que se persisten en la caché de análisis"""
+        return {
+            "class_name": self.class_name,
+            "methods": self.methods,
+            "package": self.package,
+            "types": self.types,
+            "terms": self.terms,
+        }
+
+    @classmethod
+    def from_cache(cls, file, relative_path, size, data):
+        return cls(
+            file, relative_path, size, data["class_name"], data["methods"],
+            data["package"], data["types"], data["terms"],
+        )
+
+
+class ProjectFileRecord:
+    """Registro compacto de un archivo de un proyecto de referencia (contenido bajo demanda)"""
+
+    __slots__ = ("name", "path", "type", "size", "readable")
+
+    def __init__(self, name, path, type, size, readable):
+        self.name = name
+        self.path = path
+        self.type = type
+        self.size = size
+        # Solo los archivos importantes y pequeños se pueden mostrar en el contexto
+        self.readable = readable
+
+    def content(self, limit):
+        """Primeros limit caracteres del archivo, o "" si no es mostrable"""
+        if not self.readable:
+            return ""
+        return _read_prefix(self.path, limit)
+
+
+def release_terms(code_analysis, framework_analysis):
+    """Libera las frecuencias de términos una vez construido el índice BM25"""
+    for java_file in code_analysis["all_java_files"]:
+        java_file.terms = None
+    for lib in framework_analysis["libraries"]:
+        for cls in lib["classes"]:
+            cls.terms = None
@@ -0,0 +1,215 @@
+import gzip
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from analysis.cache import CACHE_VERSION
+from analysis.pipeline import (
+    classify_java_file,
+    configured_additional_project_paths,
+    configured_framework_lib_paths,
+)
+from analysis.records import JavaFileRecord, ProjectFileRecord
+
+# Incrementar si cambia el formato del snapshot
+SNAPSHOT_VERSION = 2
+
+GIT_TIMEOUT = 30
+
+
+def _git(path, *args):
+    """Salida de un comando git en path, o None si no es un repositorio git o git no está disponible"""
+    try:
+        completed = subprocess.run(
+            ["git", "-C", path, *args], capture_output=True, text=True, timeout=GIT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return completed.stdout.strip() if completed.returncode == 0 else None
+
+
+def _repo_state(role, path):
+    """Identidad de un repo para el snapshot: rol, nombre, commit y si tiene cambios sin commitear"""
+    commit = _git(path, "rev-parse", "HEAD")
+    status = _git(path, "status", "--porcelain") if commit else None
+    return {
+        "role": role,
+        "name": os.path.basename(path),
+        "commit": commit,
+        "dirty": bool(status),
+    }
+
+
+def current_repos(target_project_path):
+    """[(estado, ruta)] del proyecto objetivo y de las librerías y proyectos adicionales que existen"""
+    repos = [(_repo_state("target", target_project_path), target_project_path)]
+    for role, paths in (("framework", configured_framework_lib_paths()), ("additional", configured_additional_project_paths())):
+        repos.extend((_repo_state(role, path), path) for path in paths if os.path.exists(path))
+    return repos
+
+
+def snapshot_key(repo_states):
+    """Clave del snapshot: sha256 de la versión y de rol, nombre y commit de cada repo"""
+    payload = json.dumps(
+        [SNAPSHOT_VERSION, CACHE_VERSION] + [[repo["role"], repo["name"], repo["commit"]] for repo in repo_states],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def snapshot_path(path, repo_states):
+    """Si path es un directorio, el archivo del snapshot dentro de él para estos commits"""
+    if path.endswith(os.sep) or os.path.isdir(path):
+        return os.path.join(path, f"analysis-{snapshot_key(repo_states)[:16]}.json.gz")
+    return path
+
+
+def _java_record(record):
+    return [
+        record.relative_path, record.size, record.class_name, record.methods,
+        record.package, record.types, record.terms,
+    ]
+
+
+def _java_file(row, base_path):
+    relative_path, size, class_name, methods, package, types, terms = row
+    return JavaFileRecord(
+        os.path.join(base_path, relative_path), relative_path, size, class_name, methods, package, types, terms,
+    )
+
+
+def write_snapshot(path, workspace, target_project_path):
+    """Guarda el análisis de workspace en un snapshot comprimido; devuelve su ruta o None si no se puede validar.
+
+    Las rutas se guardan relativas a cada repo, así que el snapshot sirve en
+    otra máquina o job con los mismos repos en otras rutas. Sin commit (no es un
+    repo git) o con cambios sin commitear no se podría comprobar que el código
+    es el mismo, así que no se escribe.
+    """
+    repos = current_repos(target_project_path)
+    unverifiable = [state["name"] for state, _ in repos if state["commit"] is None or state["dirty"]]
+    if unverifiable:
+        print(f"   ⚠️  Snapshot no guardado: repos sin commit o con cambios sin commitear: {', '.join(unverifiable)}")
+        return None
+    paths = dict((state["name"], repo_path) for state, repo_path in repos)
+
+    framework = [
+        {"name": lib["name"], "classes": [_java_record(cls) for cls in lib["classes"]]}
+        for lib in workspace["framework_analysis"]["libraries"]
+    ]
+    additional = [
+        {
+            "name": project["name"],
+            "files": [[record.name, record.type, record.size, record.readable] for record in project["files"]],
+        }
+        for project in workspace["additional_projects"]
+    ]
+    repo_states = [state for state, _ in repos]
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "analysis_version": CACHE_VERSION,
+        "key": snapshot_key(repo_states),
+        "created_at": time.time(),
+        "repos": repo_states,
+        "target": [_java_record(record) for record in workspace["code_analysis"]["all_java_files"]],
+        "framework": framework,
+        "additional": additional,
+    }
+    missing = [lib["name"] for lib in framework + additional if lib["name"] not in paths]
+    if missing:
+        print(f"   ⚠️  Snapshot no guardado: repos analizados que ya no están configurados: {', '.join(missing)}")
+        return None
+
+    path = snapshot_path(path, repo_states)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with gzip.open(os.fdopen(fd, 'wb'), 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    print(f"   💾 Snapshot del análisis guardado en {path} ({os.path.getsize(path) // 1024} KB)")
+    return path
+
+
+def _mismatch(snapshot_repos, repos):
+    """Motivo por el que el snapshot no corresponde a los repos actuales, o None si corresponde"""
+    current = [state for state, _ in repos]
+    for state in current:
+        if state["commit"] is None:
+            return f"{state['name']} no es un repositorio git"
+        if state["dirty"]:
+            return f"{state['name']} tiene cambios sin commitear"
+    expected = [(repo["role"], repo["name"]) for repo in snapshot_repos]
+    actual = [(state["role"], state["name"]) for state in current]
+    if expected != actual:
+        return f"repos distintos (snapshot: {expected}, actuales: {actual})"
+    for repo, state in zip(snapshot_repos, current):
+        if repo["commit"] != state["commit"]:
+            return f"{state['name']} está en {state['commit'][:12]} y el snapshot es de {repo['commit'][:12]}"
+    return None
+
+
+def load_snapshot(path, target_project_path):
+    """Carga el análisis de un snapshot si corresponde a los commits actuales de los repos; None si no.
+
+    Devuelve (code_analysis, framework_analysis, additional_projects) con las
+    rutas de los repos actuales. Cualquier diferencia (versión, repos o
+    commits) se informa y devuelve None para que se haga el análisis completo.
+    """
+    repos = current_repos(target_project_path)
+    path = snapshot_path(path, [state for state, _ in repos])
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        print(f"   ℹ️  No hay snapshot del análisis en {path}, se analizarán los repos")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️  Snapshot del análisis ilegible ({e}), se analizarán los repos")
+        return None
+    if payload.get("version") != SNAPSHOT_VERSION or payload.get("analysis_version") != CACHE_VERSION:
+        print("   ℹ️  Snapshot del análisis de otra versión, se analizarán los repos")
+        return None
+    reason = _mismatch(payload["repos"], repos)
+    if reason:
+        print(f"   ⚠️  Snapshot del análisis descartado: {reason}")
+        return None
+
+    paths = dict((state["name"], repo_path) for state, repo_path in repos)
+    code_analysis = {"page_objects": [], "test_classes": [], "utilities": [], "all_java_files": [], "structure": {}}
+    for row in payload["target"]:
+        classify_java_file(code_analysis, _java_file(row, target_project_path))
+    framework_analysis = {"libraries": [
+        {
+            "name": lib["name"],
+            "path": paths[lib["name"]],
+            "classes": [_java_file(row, paths[lib["name"]]) for row in lib["classes"]],
+        }
+        for lib in payload["framework"]
+    ]}
+    additional_projects = [
+        {
+            "name": project["name"],
+            "path": paths[project["name"]],
+            "files": [
+                ProjectFileRecord(name, os.path.join(paths[project["name"]], name), file_type, size, readable)
+                for name, file_type, size, readable in project["files"]
+            ],
+        }
+        for project in payload["additional"]
+    ]
+    print(
+        f"   💾 Snapshot del análisis cargado de {path}: {len(code_analysis['all_java_files'])} archivos Java, "
+        f"{sum(len(lib['classes']) for lib in framework_analysis['libraries'])} clases del framework, "
+        f"{sum(len(project['files']) for project in additional_projects)} archivos adicionales"
+    )
+    return code_analysis, framework_analysis, additional_projects
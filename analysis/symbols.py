@@ -0,0 +1,160 @@
+from collections import defaultdict
+
+# Máximo de resultados que devuelve cada consulta, para no inundar la conversación
+MAX_RESULTS = 20
+
+
+class SymbolIndex:
+    """Índice en memoria clase → métodos → firma → archivo/línea construido a partir del análisis"""
+
+    def __init__(self):
+        self.classes = []
+        self._by_simple_name = defaultdict(list)
+        self._by_fqn = {}
+        self._by_package = defaultdict(list)
+        self._methods_by_name = defaultdict(list)
+
+    def add_file(self, source, file_path, relative_path, package, types):
+        """Registra todos los tipos declarados en un archivo analizado"""
+        for type_info in types or []:
+            fqn = f"{package}.{type_info['name']}" if package else type_info["name"]
+            entry = {
+                "name": type_info["name"],
+                "simple_name": type_info["name"].split(".")[-1],
+                "fqn": fqn,
+                "package": package or "",
+                "kind": type_info["kind"],
+                "modifiers": type_info["modifiers"],
+                "supertypes": type_info["supertypes"],
+                "source": source,
+                "file": file_path,
+                "relative_path": relative_path,
+                "start_line": type_info["start_line"],
+                "end_line": type_info["end_line"],
+                "methods": type_info["methods"],
+            }
+            self.classes.append(entry)
+            self._by_simple_name[entry["simple_name"].lower()].append(entry)
+            self._by_fqn[fqn] = entry
+            self._by_package[entry["package"]].append(entry)
+            for method in type_info["methods"]:
+                self._methods_by_name[method["name"].lower()].append((entry, method))
+
+    @classmethod
+    def build(cls, code_analysis, framework_analysis, target_path):
+        """Construye el índice con el proyecto objetivo y las librerías del framework"""
+        index = cls()
+        for lib in framework_analysis["libraries"]:
+            for class_info in lib["classes"]:
+                index.add_file(
+                    lib["name"], class_info.file, class_info.relative_path,
+                    class_info.package, class_info.types,
+                )
+        target_name = target_path.rstrip("/").split("/")[-1] or target_path
+        for java_file in code_analysis["all_java_files"]:
+            index.add_file(
+                target_name, java_file.file, java_file.relative_path,
+                java_file.package, java_file.types,
+            )
+        return index
+
+    def resolve(self, name, package="", imports=()):
+        """Resuelve un nombre de tipo como lo haría javac en un archivo con ese paquete e imports.
+
+        Prueba el nombre cualificado, los imports explícitos, el propio paquete, los
+        imports con comodín y, por último, un nombre simple único en el índice.
+        """
+        if name in self._by_fqn:
+            return self._by_fqn[name]
+        outer, _, nested = name.partition(".")
+        for imported in imports:
+            if imported.endswith("." + outer):
+                return self._by_fqn.get(f"{imported}.{nested}" if nested else imported)
+        if package and f"{package}.{name}" in self._by_fqn:
+            return self._by_fqn[f"{package}.{name}"]
+        for imported in imports:
+            if imported.endswith(".*") and f"{imported[:-2]}.{name}" in self._by_fqn:
+                return self._by_fqn[f"{imported[:-2]}.{name}"]
+        candidates = [entry for entry in self._by_simple_name.get(name.split(".")[-1].lower(), [])
+                      if entry["name"] == name or entry["simple_name"] == name]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def has_package(self, package):
+        return package in self._by_package
+
+    @property
+    def packages(self):
+        return sorted(self._by_package)
+
+    def get(self, fqn):
+        """Devuelve la clase con ese nombre completamente cualificado, si existe"""
+        return self._by_fqn.get(fqn)
+
+    def find_class(self, name):
+        """Busca clases por nombre simple o cualificado; si no hay coincidencia exacta, por subcadena"""
+        query = name.strip()
+        if not query:
+            return []
+        if query in self._by_fqn:
+            return [self._by_fqn[query]]
+        exact = self._by_simple_name.get(query.split(".")[-1].lower(), [])
+        if exact:
+            return exact[:MAX_RESULTS]
+        lowered = query.lower()
+        return [entry for entry in self.classes if lowered in entry["fqn"].lower()][:MAX_RESULTS]
+
+    def find_method(self, name, class_name=""):
+        """Busca métodos por nombre (exacto o subcadena), opcionalmente dentro de una clase"""
+        query = name.strip().lower()
+        if not query:
+            return []
+        matches = self._methods_by_name.get(query)
+        if not matches:
+            matches = [
+                (entry, method)
+                for entry in self.classes
+                for method in entry["methods"]
+                if query in method["name"].lower()
+            ]
+        if class_name:
+            owners = {id(entry) for entry in self.find_class(class_name)}
+            matches = [(entry, method) for entry, method in matches if id(entry) in owners]
+        return matches[:MAX_RESULTS]
+
+    def list_package(self, package):
+        """Lista las clases de un paquete y de sus subpaquetes"""
+        prefix = package.strip().rstrip(".")
+        if prefix in self._by_package:
+            return self._by_package[prefix]
+        return [
+            entry
+            for name in self.packages
+            if name.startswith(prefix + ".")
+            for entry in self._by_package[name]
+        ]
+
+    def package_summary(self):
+        """Devuelve {origen: {paquete: número de clases}} para el resumen del prompt"""
+        summary = defaultdict(lambda: defaultdict(int))
+        for entry in self.classes:
+            summary[entry["source"]][entry["package"] or "(default)"] += 1
+        return summary
+
+
+def format_class(entry, with_methods=True):
+    """Formatea una clase del índice para mostrarla al agente"""
+    text = (
+        f"📋 {entry['fqn']} ({entry['kind']}) — {entry['source']}: "
+        f"{entry['file']}:{entry['start_line']}-{entry['end_line']}\n"
+    )
+    if with_methods:
+        for method in entry["methods"]:
+            text += f"   - {method['signature']}  [L{method['start_line']}]\n"
+        if not entry["methods"]:
+            text += "   (sin métodos declarados)\n"
+    return text
+
+
+def format_method(entry, method):
+    """Formatea un método del índice junto con su clase y ubicación"""
+    return f"🔧 {entry['fqn']}#{method['signature']} — {entry['file']}:{method['start_line']}-{method['end_line']}\n"
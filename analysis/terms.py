@@ -0,0 +1,30 @@
+import re
+import unicodedata
+
+_WORD_PATTERN = re.compile(r'[A-Za-z0-9]+')
+_CAMEL_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "into", "test", "tests",
+    "los", "las", "del", "que", "con", "para", "por", "una", "uno", "unos", "unas",
+    "como", "debe", "sus", "est", "esta", "este", "crear", "generar", "java", "public",
+    "void", "class", "string", "return", "import", "package", "new",
+}
+
+
+def split_identifier(text):
+    """Divide identificadores camelCase/snake_case en términos en minúscula sin acentos"""
+    normalized = unicodedata.normalize("NFKD", text)
+    normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+    terms = []
+    for word in _WORD_PATTERN.findall(normalized):
+        parts = _CAMEL_PATTERN.findall(word) or [word]
+        terms.extend(part.lower() for part in parts)
+        if len(parts) > 1:
+            terms.append(word.lower())
+    return terms
+
+
+def prompt_terms(prompt):
+    """Términos significativos del prompt para puntuar la relevancia"""
+    return {term for term in split_identifier(prompt) if len(term) > 2 and term not in STOPWORDS}
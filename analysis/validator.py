@@ -0,0 +1,312 @@
+import os
+
+from analysis.java_scanner import IDENT, JAVA_KEYWORDS, LITERAL, SYMBOL, scan_tokens, tokenize_java
+from analysis.symbols import SymbolIndex
+
+# Prefijos de dependencias externas habituales que no forman parte del índice
+DEFAULT_EXTERNAL_PREFIXES = (
+    "java.", "javax.", "jakarta.", "org.openqa.", "org.junit.", "junit.", "org.testng.",
+    "org.hamcrest.", "org.slf4j.", "org.apache.", "io.github.bonigarcia.", "io.cucumber.",
+)
+
+# Métodos que existen en cualquier clase, enum o record
+IMPLICIT_METHODS = {
+    "equals", "hashCode", "toString", "getClass", "notify", "notifyAll", "wait", "clone",
+    "values", "valueOf", "name", "ordinal", "compareTo",
+}
+
+_CLOSERS = {")": "(", "]": "[", "}": "{"}
+
+# Máximo de problemas estructurales por archivo (un error de llaves suele arrastrar otros)
+MAX_PROBLEMS = 10
+
+
+def configured_external_prefixes():
+    """Prefijos externos aceptados sin verificar (VALIDATOR_EXTERNAL_PREFIXES se suma a los por defecto)"""
+    extra = os.environ.get("VALIDATOR_EXTERNAL_PREFIXES", "")
+    return DEFAULT_EXTERNAL_PREFIXES + tuple(
+        prefix.strip() if prefix.strip().endswith(".") else prefix.strip() + "."
+        for prefix in extra.split(",") if prefix.strip()
+    )
+
+
+def _check_delimiters(tokens, problems):
+    stack = []
+    for token in tokens:
+        if token.kind != SYMBOL:
+            continue
+        if token.text in "([{":
+            stack.append(token)
+        elif token.text in _CLOSERS:
+            opener = _CLOSERS[token.text]
+            if stack and stack[-1].text == opener:
+                stack.pop()
+            elif any(open_token.text == opener for open_token in stack):
+                # Cierra un grupo exterior: lo que quedó abierto en medio no se cerró
+                while stack[-1].text != opener:
+                    unclosed = stack.pop()
+                    problems.append((unclosed.line, f"'{unclosed.text}' sin cerrar antes del '{token.text}' de la línea {token.line}"))
+                stack.pop()
+            else:
+                problems.append((token.line, f"'{token.text}' sin apertura correspondiente"))
+    for unclosed in stack:
+        problems.append((unclosed.line, f"'{unclosed.text}' sin cerrar al final del archivo"))
+
+
+def _check_literals(tokens, comments, problems):
+    for token in tokens:
+        if token.kind != LITERAL:
+            continue
+        text = token.text
+        if text.startswith('"""'):
+            closed = len(text) >= 6 and text.endswith('"""')
+        else:
+            closed = len(text) >= 2 and text.endswith(text[0])
+        if not closed:
+            problems.append((token.line, "literal de texto sin cerrar"))
+    for comment in comments:
+        if comment.startswith("/*") and (len(comment) < 4 or not comment.endswith("*/")):
+            problems.append((None, "comentario /* sin cerrar"))
+
+
+def _skip_generics(tokens, index):
+    """Salta los argumentos genéricos y corchetes de array que empiezan en tokens[index]"""
+    depth = 0
+    while index < len(tokens):
+        text = tokens[index].text
+        if text == "<":
+            depth += 1
+        elif text == ">":
+            depth -= 1
+        elif text in ("[", "]", "?", ",", ".", "&", "extends", "super") or (depth and tokens[index].kind == IDENT):
+            pass
+        else:
+            return index
+        if depth < 0:
+            return index
+        index += 1
+    return index
+
+
+def _declared_type(tokens, index):
+    """(variable, tipo) si tokens[index] empieza una declaración "Tipo<...> nombre", o None"""
+    token = tokens[index]
+    if token.kind != IDENT or token.text in JAVA_KEYWORDS or not token.text[0].isupper():
+        return None
+    if index > 0 and tokens[index - 1].text == ".":
+        return None
+    after = _skip_generics(tokens, index + 1)
+    if after + 1 < len(tokens) and tokens[after].kind == IDENT and tokens[after].text not in JAVA_KEYWORDS:
+        if tokens[after + 1].text in ("=", ";", ",", ")", ":"):
+            return tokens[after].text, token.text
+    return None
+
+
+def _method_calls(tokens):
+    """Llamadas receptor.metodo(...) con el tipo del receptor: variable declarada o nombre de clase.
+
+    Las variables se resuelven por ámbito: cada bloque { } tiene las suyas, y
+    los parámetros de un método, lambda o for (declarados entre paréntesis)
+    pertenecen al bloque que abre a continuación. Así dos métodos pueden usar
+    el mismo nombre de variable con tipos distintos.
+    """
+    scopes = [{}]
+    pending = {}
+    parens = 0
+    calls = []
+    total = len(tokens)
+    for index, token in enumerate(tokens):
+        text = token.text
+        if token.kind == SYMBOL:
+            if text == "(":
+                parens += 1
+            elif text == ")":
+                parens = max(0, parens - 1)
+            elif text == "{":
+                scopes.append(pending)
+                pending = {}
+            elif text == "}":
+                if len(scopes) > 1:
+                    scopes.pop()
+                pending = {}
+            elif text == ";" and not parens:
+                pending = {}
+            continue
+
+        declaration = _declared_type(tokens, index)
+        if declaration:
+            variable, type_name = declaration
+            (pending if parens else scopes[-1])[variable] = type_name
+            continue
+
+        if index + 3 >= total or token.kind != IDENT:
+            continue
+        dot, method, paren = tokens[index + 1:index + 4]
+        if dot.text != "." or method.kind != IDENT or paren.text != "(":
+            continue
+        if index > 0 and tokens[index - 1].text == "." and not (index > 1 and tokens[index - 2].text == "this"):
+            continue  # Llamada encadenada o nombre cualificado
+        if text in ("this", "super"):
+            continue
+        for scope in (pending, *reversed(scopes)):
+            if text in scope:
+                calls.append((scope[text], method.text, method.line))
+                break
+        else:
+            if text[0].isupper():
+                calls.append((text, method.text, method.line))
+    return calls
+
+
+def scan_for_validation(source):
+    """Pasada estructural de un archivo: se ejecuta en los workers y devuelve datos serializables"""
+    comments = []
+    tokens = list(tokenize_java(source, comments))
+    problems = []
+    _check_delimiters(tokens, problems)
+    _check_literals(tokens, comments, problems)
+    structure = scan_tokens(tokens)
+    return {
+        "package": structure["package"],
+        "imports": structure["imports"],
+        "types": structure["types"],
+        "calls": _method_calls(tokens),
+        "problems": problems[:MAX_PROBLEMS],
+    }
+
+
+class _Resolver:
+    """Resuelve tipos y sus métodos (incluidos los heredados) en los archivos validados y el índice"""
+
+    def __init__(self, symbol_index, local_index):
+        self.indexes = [local_index, symbol_index] if symbol_index is not None else [local_index]
+
+    def resolve(self, name, package, imports):
+        for index in self.indexes:
+            entry = index.resolve(name, package, imports)
+            if entry is not None:
+                return entry
+        return None
+
+    def has_method(self, entry, method_name, seen=None):
+        """True/False si se puede decidir; None si algún supertipo no está en el índice"""
+        if any(method["name"] == method_name for method in entry["methods"]):
+            return True
+        seen = seen or set()
+        seen.add(entry["fqn"])
+        unknown = False
+        for supertype in entry["supertypes"]:
+            parent = self.resolve(supertype, entry["package"], ())
+            if parent is None:
+                unknown = True
+                continue
+            if parent["fqn"] in seen:
+                continue
+            found = self.has_method(parent, method_name, seen)
+            if found:
+                return True
+            unknown = unknown or found is None
+        return None if unknown else False
+
+    def known_roots(self):
+        """Raíces de paquete (dos primeros segmentos) del código analizado"""
+        return {
+            ".".join(package.split(".")[:2])
+            for index in self.indexes
+            for package in index.packages
+            if package
+        }
+
+
+def _check_imports(facts, resolver, roots, external_prefixes, errors, warnings):
+    for imported in facts["imports"]:
+        if imported.startswith(external_prefixes):
+            continue
+        if imported.endswith(".*"):
+            package = imported[:-2]
+            if any(index.has_package(package) for index in resolver.indexes) or resolver.resolve(package, "", ()):
+                continue
+        elif resolver.resolve(imported, "", ()) is not None:
+            continue
+        else:
+            # import static paquete.Clase.miembro o de una clase anidada
+            owner = imported.rsplit(".", 1)[0]
+            if resolver.resolve(owner, "", ()) is not None:
+                continue
+        if ".".join(imported.split(".")[:2]) in roots:
+            errors.append((None, f"import no resuelto: {imported} no existe en el proyecto ni en el framework"))
+        else:
+            warnings.append((None, f"import de una dependencia externa no verificada: {imported}"))
+
+
+def _check_declarations(path, facts, errors, warnings):
+    top_level = [type_info for type_info in facts["types"] if type_info["parent"] is None]
+    if not top_level:
+        errors.append((None, "el archivo no declara ninguna clase, interfaz, enum o record"))
+        return
+    if facts["package"] is None:
+        warnings.append((None, "el archivo no tiene declaración package"))
+    expected = os.path.splitext(os.path.basename(path))[0]
+    for type_info in top_level:
+        if "public" in type_info["modifiers"] and type_info["name"] != expected:
+            errors.append((type_info["start_line"], f"el tipo público {type_info['name']} debe estar en {type_info['name']}.java"))
+
+
+def _check_calls(facts, resolver, errors):
+    reported = set()
+    for type_name, method_name, line in facts["calls"]:
+        if method_name in IMPLICIT_METHODS or (type_name, method_name) in reported:
+            continue
+        entry = resolver.resolve(type_name, facts["package"], facts["imports"])
+        if entry is None or entry["kind"] == "record":
+            continue
+        if resolver.has_method(entry, method_name) is False:
+            reported.add((type_name, method_name))
+            errors.append((line, f"el método {method_name}() no existe en {entry['fqn']} ni en sus supertipos"))
+
+
+def validate_java_files(sources, symbol_index=None, engine=None):
+    """Valida un conjunto de archivos Java ({ruta: contenido}) en una sola llamada.
+
+    La pasada estructural (tokens, llaves, literales, declaraciones) se reparte
+    entre procesos con engine.map_sources; la resolución de imports y métodos se
+    hace después contra symbol_index y contra los propios archivos validados,
+    de modo que las clases nuevas de la ejecución también se reconocen.
+
+    Devuelve {ruta: {"errors": [(línea, mensaje)], "warnings": [...]}}.
+    """
+    paths = list(sources)
+    if engine is not None:
+        all_facts = engine.map_sources(scan_for_validation, [sources[path] for path in paths])
+    else:
+        all_facts = [scan_for_validation(sources[path]) for path in paths]
+
+    local_index = SymbolIndex()
+    for path, facts in zip(paths, all_facts):
+        local_index.add_file("generado", path, path, facts["package"], facts["types"])
+    resolver = _Resolver(symbol_index, local_index)
+    roots = resolver.known_roots()
+    external_prefixes = configured_external_prefixes()
+
+    report = {}
+    for path, facts in zip(paths, all_facts):
+        errors = list(facts["problems"])
+        warnings = []
+        _check_declarations(path, facts, errors, warnings)
+        _check_imports(facts, resolver, roots, external_prefixes, errors, warnings)
+        _check_calls(facts, resolver, errors)
+        report[path] = {"errors": errors, "warnings": warnings}
+    return report
+
+
+def format_validation_report(report):
+    """Texto del informe de validación para el agente"""
+    failed = sum(1 for result in report.values() if result["errors"])
+    lines = [f"Validación estructural: {len(report)} archivo(s), {failed} con errores"]
+    for path, result in report.items():
+        lines.append(f"{'❌' if result['errors'] else '✅'} {path}")
+        for line, message in result["errors"]:
+            lines.append(f"   {'L' + str(line) if line else '--'}: {message}")
+        for line, message in result["warnings"]:
+            lines.append(f"   ⚠️ {'L' + str(line) if line else '--'}: {message}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,160 @@
+import fnmatch
+import os
+
+# Directorios de build, dependencias y control de versiones que nunca contienen código fuente útil
+DEFAULT_IGNORED_DIRS = {
+    "target", "build", "out", "bin", "node_modules", ".git", ".gradle", ".idea",
+    ".mvn", "__pycache__", ".autoqa-cache",
+}
+
+
+def configured_ignored_dirs():
+    """Directorios a podar (ANALYSIS_IGNORE_DIRS, separados por comas; sustituye a los por defecto)"""
+    value = os.environ.get("ANALYSIS_IGNORE_DIRS")
+    if value is None:
+        return set(DEFAULT_IGNORED_DIRS)
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def gitignore_enabled():
+    """Respetar los .gitignore del árbol (ANALYSIS_USE_GITIGNORE=0 lo desactiva)"""
+    return os.environ.get("ANALYSIS_USE_GITIGNORE", "1") != "0"
+
+
+class _IgnoreRule:
+    __slots__ = ("base", "pattern", "negate", "dir_only", "anchored")
+
+    def __init__(self, base, pattern, negate, dir_only, anchored):
+        self.base = base
+        self.pattern = pattern
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+
+    def matches(self, relative_path, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not relative_path.startswith(self.base + "/"):
+                return False
+            relative_path = relative_path[len(self.base) + 1:]
+        if self.anchored:
+            return fnmatch.fnmatchcase(relative_path, self.pattern)
+        return fnmatch.fnmatchcase(relative_path.rsplit("/", 1)[-1], self.pattern)
+
+
+def _read_gitignore(directory, base):
+    """Lee las reglas de un .gitignore; base es la ruta relativa del directorio que lo contiene"""
+    rules = []
+    try:
+        with open(os.path.join(directory, ".gitignore"), 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return rules
+
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if line.startswith("**/"):
+            line = line[3:]
+            anchored = "/" in line
+        if line:
+            rules.append(_IgnoreRule(base, line, negate, dir_only, anchored))
+    return rules
+
+
+def _is_ignored(relative_path, is_dir, rules):
+    ignored = False
+    for rule in rules:
+        if rule.negate == ignored and rule.matches(relative_path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+def _compile_pattern(pattern):
+    """Convierte un patrón tipo glob (**/*.java, **/pom.xml) en una función sobre la ruta relativa"""
+    if pattern.startswith("**/") and "/" not in pattern[3:]:
+        name_pattern = pattern[3:]
+        return lambda relative_path, name: fnmatch.fnmatchcase(name, name_pattern)
+    return lambda relative_path, name: fnmatch.fnmatchcase(relative_path, pattern)
+
+
+def walk_files(root, patterns, ignored_dirs=None, use_gitignore=None):
+    """Recorre root una sola vez con os.scandir y genera (ruta, patrones que coinciden).
+
+    Poda los directorios ignorados, los ocultos (como glob) y lo excluido por
+    los .gitignore del árbol. Cada archivo se compara con todos los patrones en
+    la misma pasada y se genera en cuanto se encuentra, sin acumular el árbol.
+    Los enlaces simbólicos a directorios se siguen, pero cada directorio real
+    se recorre una sola vez, así que un enlace a un ancestro no crea un ciclo.
+    """
+    if ignored_dirs is None:
+        ignored_dirs = configured_ignored_dirs()
+    if use_gitignore is None:
+        use_gitignore = gitignore_enabled()
+    matchers = [(pattern, _compile_pattern(pattern)) for pattern in patterns]
+    root = root.rstrip("/") or "/"
+
+    # (st_dev, st_ino) de los directorios ya encolados
+    try:
+        root_stat = os.stat(root)
+        visited = {(root_stat.st_dev, root_stat.st_ino)}
+    except OSError:
+        visited = set()
+
+    # Pila de (directorio, ruta relativa, reglas .gitignore heredadas)
+    stack = [(root, "", [])]
+    while stack:
+        directory, relative_dir, rules = stack.pop()
+        if use_gitignore:
+            local_rules = _read_gitignore(directory, relative_dir)
+            if local_rules:
+                rules = rules + local_rules
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"      ⚠️  Error recorriendo {directory}: {e}")
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            name = entry.name
+            relative_path = f"{relative_dir}/{name}" if relative_dir else name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if name in ignored_dirs or name.startswith("."):
+                    continue
+                if rules and _is_ignored(relative_path, True, rules):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if (stat.st_dev, stat.st_ino) in visited:
+                    continue
+                visited.add((stat.st_dev, stat.st_ino))
+                subdirectories.append((entry.path, relative_path, rules))
+                continue
+            if name.startswith("."):
+                continue
+            matched = [pattern for pattern, matcher in matchers if matcher(relative_path, name)]
+            if not matched:
+                continue
+            if rules and _is_ignored(relative_path, False, rules):
+                continue
+            yield f"{root}/{relative_path}", matched
+
+        # Recorrido en profundidad en orden alfabético
+        stack.extend(reversed(subdirectories))
@@ -0,0 +1,128 @@
+"""Línea de comandos de AutoQA.
+
+Subcomandos:
+  analyze       analiza los repos (proyecto objetivo, framework, proyectos
+                adicionales); con --snapshot guarda el análisis y con --prompt
+                construye las instrucciones del agente
+  generate      genera código con el agente de auto-reflexión (lo que ejecutan
+                los workflows con workflow-entry-point.py)
+  computer-use  controla el escritorio por VNC con ComputerTool
+
+Cada subcomando importa sus dependencias al ejecutarse: `autoqa.py --help` y
+`analyze` no cargan agents, openai, PIL, numpy ni asyncvnc.
+"""
+import argparse
+import os
+import sys
+
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def run_analyze(args):
+    from agent_tools.instructions import AUTO_REFLECTION_INSTRUCTIONS
+    from analysis.memory import MemoryProbe
+    from analysis.pipeline import analyze_workspace, create_context_enhanced_prompt
+
+    with MemoryProbe("análisis") as analysis_memory:
+        # Sin --force, un snapshot válido para los commits actuales se reutiliza
+        workspace = analyze_workspace(args.target, None if args.force else args.snapshot)
+        if args.snapshot and not workspace["from_snapshot"]:
+            from analysis.snapshot import write_snapshot
+
+            write_snapshot(args.snapshot, workspace, args.target)
+        if args.prompt:
+            instructions, report = create_context_enhanced_prompt(
+                args.prompt, workspace["code_analysis"], workspace["framework_analysis"], args.target,
+                workspace["additional_projects"], workspace["symbol_index"],
+                lexical_index=workspace["lexical_index"], static_instructions=AUTO_REFLECTION_INSTRUCTIONS,
+            )
+            print("📐 Presupuesto de contexto:")
+            for line in report.summary_lines():
+                print(f"   {line}")
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(instructions)
+                print(f"📄 Instrucciones guardadas en: {args.output}")
+
+    print("🧠 Memoria del análisis:")
+    for line in analysis_memory.summary_lines():
+        print(f"   {line}")
+    return 0
+
+
+def run_generate(args):
+    import asyncio
+
+    from agent_tools.generation import GenerationRun
+
+    run = GenerationRun.from_env(
+        prompt=args.prompt, prompts_file=args.prompts_file, target_project_path=args.target,
+        model=args.model, max_turns=args.max_turns, snapshot=args.snapshot,
+    ).prepare()
+    print("Starting AutoQA code generation...")
+    failed = asyncio.run(run.run())
+    if failed:
+        print(f"Done with errors: {len(failed)} of {len(run.sessions)} session(s) failed")
+        return 1
+    print("Done")
+    return 0
+
+
+def run_computer_use(args):
+    import asyncio
+
+    from agent_tools.replay import build_run_config
+    from computer_use_agent import run_computer_use as run_agent
+
+    if not args.prompt:
+        raise ValueError("PROMPT environment variable is not set")
+    run_config, _ = build_run_config()
+    asyncio.run(run_agent(args.prompt, args.max_turns, run_config))
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="autoqa", description="AutoQA: generación de tests y control del escritorio con agentes")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = subcommands.add_parser("analyze", help="Analiza los repos sin llamar al modelo")
+    analyze.add_argument("--target", default=os.environ.get("TARGET_PROJECT_PATH", "../template-models"),
+                         help="Proyecto objetivo (TARGET_PROJECT_PATH)")
+    analyze.add_argument("--prompt", default=os.environ.get("PROMPT"),
+                         help="Construye también las instrucciones del agente para este prompt")
+    analyze.add_argument("--output", help="Archivo donde guardar las instrucciones construidas")
+    analyze.add_argument("--snapshot", help="Guarda el análisis en este archivo (o directorio) para que generate no vuelva a analizar")
+    analyze.add_argument("--force", action="store_true", help="Vuelve a analizar aunque haya un snapshot válido")
+    analyze.set_defaults(handler=run_analyze)
+
+    generate = subcommands.add_parser("generate", help="Genera código con el agente (PROMPT o PROMPTS_FILE)")
+    generate.add_argument("--prompt", help="Prompt (por defecto, PROMPT)")
+    generate.add_argument("--prompts-file", help="Archivo de prompts para el modo batch (por defecto, PROMPTS_FILE)")
+    generate.add_argument("--target", help="Proyecto objetivo (por defecto, TARGET_PROJECT_PATH)")
+    generate.add_argument("--model", help="Modelo (por defecto, OPENAI_MODEL)")
+    generate.add_argument("--max-turns", type=int, help="Máximo de turnos (por defecto, MAX_TURNS)")
+    generate.add_argument("--snapshot", help="Snapshot del análisis que se carga si coinciden los commits (por defecto, ANALYSIS_SNAPSHOT)")
+    generate.set_defaults(handler=run_generate)
+
+    computer_use = subcommands.add_parser("computer-use", help="Controla el escritorio por VNC (VNC_HOST, VNC_PORT, VNC_PASSWORD)")
+    computer_use.add_argument("--prompt", default=os.environ.get("PROMPT"))
+    computer_use.add_argument("--max-turns", type=int, default=_env_int("MAX_TURNS") or 100)
+    computer_use.set_defaults(handler=run_computer_use)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    # Antes de parse_args: los valores por defecto de los argumentos salen del entorno (.env incluido)
+    load_dotenv()
+    args = parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
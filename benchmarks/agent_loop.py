@@ -0,0 +1,507 @@
+"""Prueba de carga del bucle del agente con el modelo simulado (sin API ni red).
+
+Dos bucles:
+  tools     ejecuta workflow-entry-point.py en modo batch sobre una copia de un
+            repositorio sintético, con AUTOQA_MODEL_PROVIDER=fake llamando a las
+            herramientas reales (function_tool) de forma aleatoria
+  computer  ejecuta un Agent con ComputerTool en este proceso, contra un
+            computer nulo (captura estática) o un VNCComputer real (VNC_HOST,
+            VNC_PORT, VNC_PASSWORD)
+
+Cada turno dura la latencia simulada del modelo más el tiempo del framework
+(Runner, eventos, serialización del historial); el informe da ese overhead
+por turno, la duración de cada herramienta y cuántas sesiones agotaron
+MAX_TURNS (con --turns mayor que --max-turns o 0 = sin final).
+
+Uso:
+    python -m benchmarks.agent_loop tools --sessions 8 --turns 50 --latency-ms 200
+    python -m benchmarks.agent_loop computer --turns 100 --computer vnc --output loop.json
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from agents import Agent, AsyncComputer, ComputerTool, RunConfig, Runner  # noqa: E402
+from agents.exceptions import MaxTurnsExceeded  # noqa: E402
+
+from agent_tools.fake_model import FakeModel, FakeModelProvider  # noqa: E402
+from agent_tools.telemetry import RunTelemetry, percentile  # noqa: E402
+from benchmarks.analysis_pipeline import _git_commit  # noqa: E402
+from benchmarks.synthetic_repo import generate_workspace  # noqa: E402
+
+# Incrementar si cambia el formato del JSON de resultados
+RESULTS_VERSION = 1
+
+DEFAULT_PROMPT = "Crear un test de login que valide el mensaje de error con credenciales inválidas usando LoginPage"
+
+# Sin javac por defecto: se mide el framework, no el compilador
+DEFAULT_TOOLS_ENV = {"COMPILE_SERVER": "0"}
+
+
+def _fake_script(args, random_config):
+    return {
+        "seed": args.seed,
+        "latency_ms": args.latency_ms,
+        "ttft_ms": args.ttft_ms,
+        "jitter_ms": args.jitter_ms,
+        "random": {"turns": args.turns or None, **random_config},
+    }
+
+
+def _distribution_ms(values):
+    if not values:
+        return None
+    return {
+        "p50_ms": round(percentile(values, 0.5) * 1000, 3),
+        "p90_ms": round(percentile(values, 0.9) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+    }
+
+
+def summarize(sessions, script, max_turns, wall_s):
+    """Métricas a partir de los turnos y herramientas de cada sesión (registros de RunTelemetry)"""
+    model = FakeModel("fake", script)
+    overheads = []
+    latencies = []
+    by_tool = {}
+    per_session = []
+    for session in sessions:
+        for turn in session["turns"]:
+            latencies.append(turn["latency_s"])
+            overheads.append(max(0.0, turn["latency_s"] - model.simulated_latency_s(turn["turn"] - 1)))
+        for call in session["tool_calls"]:
+            by_tool.setdefault(call["tool"], []).append(call["duration_s"])
+        per_session.append({
+            "id": session["id"],
+            "turns": len(session["turns"]),
+            "tool_calls": len(session["tool_calls"]),
+            "failed_tool_calls": sum(1 for call in session["tool_calls"] if not call["ok"]),
+            "wall_s": session.get("wall_s"),
+        })
+    return {
+        "wall_s": round(wall_s, 4),
+        "turns": len(latencies),
+        "turns_per_s": round(len(latencies) / wall_s, 2) if wall_s else None,
+        "max_turns_reached": sum(1 for session in per_session if session["turns"] >= max_turns),
+        "turn_latency": _distribution_ms(latencies),
+        "turn_overhead": _distribution_ms(overheads),
+        "tools": {
+            name: {"calls": len(durations), **_distribution_ms(durations)}
+            for name, durations in sorted(by_tool.items())
+        },
+        "sessions": per_session,
+    }
+
+
+def _read_trace(path):
+    records = {"turns": [], "tool_calls": [], "wall_s": None}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record["event"] == "turn":
+                records["turns"].append(record)
+            elif record["event"] == "tool":
+                records["tool_calls"].append(record)
+            elif record["event"] == "run_end":
+                records["wall_s"] = record["wall_s"]
+    return records
+
+
+def _batch_errors(batch_dir):
+    """{sesión: error} de la sección "Sesiones con Error" de AutoQA-Batch-Summary.md"""
+    errors = {}
+    path = os.path.join(batch_dir, "AutoQA-Batch-Summary.md")
+    if not os.path.exists(path):
+        return errors
+    with open(path, 'r', encoding='utf-8') as f:
+        section = f.read().partition("## Sesiones con Error\n")[2].split("\n## ", 1)[0]
+    for line in section.splitlines():
+        session_id, separator, error = line[2:].partition(": ")
+        if line.startswith("- ") and separator:
+            errors[session_id] = error
+    return errors
+
+
+def _log_tail(log_path):
+    with open(log_path, 'r', encoding='utf-8') as log:
+        sys.stderr.write(log.read()[-4000:])
+
+
+def run_tools_loop(args):
+    """Sesiones batch de workflow-entry-point.py con herramientas reales sobre una copia del repo sintético"""
+    workspace = generate_workspace(args.workdir, args.files, args.seed)
+    run_dir = tempfile.mkdtemp(prefix="autoqa-loop-")
+    try:
+        # Las herramientas escriben: se trabaja sobre una copia del proyecto objetivo
+        target = shutil.copytree(workspace["target"], os.path.join(run_dir, "target-project"))
+        java_files = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(target) for name in names if name.endswith(".java")
+        )
+        rng = random.Random(args.seed)
+        paths = rng.sample(java_files, min(args.paths, len(java_files)))
+        random_config = {"paths": paths}
+        if args.tools:
+            random_config["tools"] = args.tools.split(",")
+        script = _fake_script(args, random_config)
+
+        prompts_path = os.path.join(run_dir, "prompts.jsonl")
+        with open(prompts_path, 'w', encoding='utf-8') as f:
+            for index in range(args.sessions):
+                f.write(json.dumps({"id": f"carga-{index + 1}", "prompt": args.prompt}, ensure_ascii=False) + "\n")
+        batch_dir = os.path.join(run_dir, "batch")
+        env = {
+            **DEFAULT_TOOLS_ENV,
+            **os.environ,
+            "AUTOQA_MODEL_PROVIDER": "fake",
+            "AUTOQA_FAKE_MODEL_SCRIPT": json.dumps(script),
+            "PROMPTS_FILE": prompts_path,
+            "BATCH_CONCURRENCY": str(args.concurrency or args.sessions),
+            "BATCH_OUTPUT_DIR": batch_dir,
+            "MAX_TURNS": str(args.max_turns),
+            "TARGET_PROJECT_PATH": target,
+            "FRAMEWORK_LIB_PATHS": workspace["framework"],
+            "ADDITIONAL_PROJECT_PATHS": workspace["reference"],
+            "ANALYSIS_CACHE_DIR": os.path.join(run_dir, "cache"),
+        }
+        log_path = os.path.join(run_dir, "entry-point.log")
+        started = time.perf_counter()
+        with open(log_path, 'w', encoding='utf-8') as log:
+            completed = subprocess.run(
+                [sys.executable, os.path.join(REPO_ROOT, "workflow-entry-point.py")],
+                cwd=run_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+        wall = time.perf_counter() - started
+        # Agotar MAX_TURNS es un error de la sesión, pero es lo que se mide con --turns > --max-turns
+        errors = _batch_errors(batch_dir)
+        unexpected = {
+            session_id: error for session_id, error in errors.items()
+            if not error.startswith("MaxTurnsExceeded")
+        }
+        if unexpected:
+            _log_tail(log_path)
+            raise RuntimeError(
+                f"{len(unexpected)} sesión(es) con error: "
+                + "; ".join(f"{session_id}: {error}" for session_id, error in sorted(unexpected.items()))
+            )
+        if completed.returncode != 0 and not errors:
+            _log_tail(log_path)
+            raise RuntimeError(f"workflow-entry-point.py terminó con código {completed.returncode}")
+
+        sessions = []
+        for name in sorted(os.listdir(batch_dir)):
+            trace_path = os.path.join(batch_dir, name, "AutoQA-Trace.jsonl")
+            if os.path.exists(trace_path):
+                sessions.append({"id": name, **_read_trace(trace_path)})
+        # Una sesión que falla antes del primer turno no se puede medir: el benchmark falla
+        failed = [session["id"] for session in sessions if not session["turns"]]
+        if len(sessions) < args.sessions or failed:
+            _log_tail(log_path)
+            raise RuntimeError(
+                f"{args.sessions - len(sessions)} sesión(es) sin traza y {len(failed)} sin turnos "
+                f"({', '.join(failed) or '-'}); ver el log de workflow-entry-point.py"
+            )
+        # El tiempo del proceso incluye el análisis de los repos; las sesiones, solo el bucle
+        loop_wall = max((session["wall_s"] or 0 for session in sessions), default=0)
+        return {"process_wall_s": round(wall, 4), **summarize(sessions, script, args.max_turns, loop_wall)}
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def _png(width, height, seed):
+    """PNG RGB con ruido por bloques de 16 px: tamaño comprimido parecido al de un escritorio"""
+    rng = random.Random(seed)
+    blocks = [bytes(rng.randrange(256) for _ in range(3)) * 16 for _ in range(width // 16 + 1)]
+    rows = []
+    for y in range(height):
+        if y % 16 == 0:
+            rng.shuffle(blocks)
+            row = b"".join(blocks)[:width * 3]
+        rows.append(b"\x00" + row)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b"")
+
+
+class NullComputer(AsyncComputer):
+    """Computer sin pantalla: las acciones no hacen nada y la captura es siempre la misma"""
+
+    def __init__(self, width, height, seed):
+        self._dimensions = (width, height)
+        self._screenshot = base64.b64encode(_png(width, height, seed)).decode("ascii")
+
+    @property
+    def environment(self):
+        return "linux"
+
+    @property
+    def dimensions(self):
+        return self._dimensions
+
+    async def screenshot(self):
+        return self._screenshot
+
+    async def click(self, x, y, button="left"):
+        pass
+
+    async def double_click(self, x, y):
+        pass
+
+    async def scroll(self, x, y, scroll_x, scroll_y):
+        pass
+
+    async def type(self, text):
+        pass
+
+    async def wait(self):
+        pass
+
+    async def move(self, x, y):
+        pass
+
+    async def keypress(self, keys):
+        pass
+
+    async def drag(self, path):
+        pass
+
+
+class TimedComputer(AsyncComputer):
+    """Envuelve un computer y registra cada acción como herramienta en la telemetría de la sesión"""
+
+    def __init__(self, computer, telemetry):
+        self.computer = computer
+        self.telemetry = telemetry
+
+    @property
+    def environment(self):
+        return self.computer.environment
+
+    @property
+    def dimensions(self):
+        return self.computer.dimensions
+
+    async def _timed(self, action, *args):
+        started = self.telemetry.clock()
+        ok = True
+        output = None
+        try:
+            output = await getattr(self.computer, action)(*args)
+            return output
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.telemetry.record_tool(f"computer.{action}", started, self.telemetry.clock(), ok, "", output)
+
+    async def screenshot(self):
+        return await self._timed("screenshot")
+
+    async def click(self, x, y, button="left"):
+        await self._timed("click", x, y, button)
+
+    async def double_click(self, x, y):
+        await self._timed("double_click", x, y)
+
+    async def scroll(self, x, y, scroll_x, scroll_y):
+        await self._timed("scroll", x, y, scroll_x, scroll_y)
+
+    async def type(self, text):
+        await self._timed("type", text)
+
+    async def wait(self):
+        await self._timed("wait")
+
+    async def move(self, x, y):
+        await self._timed("move", x, y)
+
+    async def keypress(self, keys):
+        await self._timed("keypress", keys)
+
+    async def drag(self, path):
+        await self._timed("drag", path)
+
+
+async def _run_computer_sessions(args, script):
+    if args.computer == "vnc":
+        from computers.screenshots import ScreenshotProfile
+        from computers.vnc import VNCComputer
+
+        shared = VNCComputer(
+            host=os.environ.get("VNC_HOST", "localhost"),
+            port=int(os.environ.get("VNC_PORT", 5900)),
+            username="ubuntu",
+            password=os.environ.get("VNC_PASSWORD"),
+            screenshot_profile=ScreenshotProfile.from_env(),
+        )
+    else:
+        width, height = (int(value) for value in args.screen.lower().split("x"))
+        shared = NullComputer(width, height, args.seed)
+
+    run_config = RunConfig(model_provider=FakeModelProvider(script), tracing_disabled=True)
+    semaphore = asyncio.Semaphore(args.concurrency or args.sessions)
+
+    async def run_one(index):
+        telemetry = RunTelemetry()
+        agent = Agent(
+            name="AutoQA Load Test Computer User",
+            instructions="Benchmark del bucle ComputerTool",
+            tools=[ComputerTool(TimedComputer(shared, telemetry))],
+        )
+        async with semaphore:
+            telemetry.start_run("fake", agent.instructions, args.prompt)
+            result = Runner.run_streamed(agent, args.prompt, max_turns=args.max_turns, run_config=run_config)
+            try:
+                async for event in result.stream_events():
+                    telemetry.observe(event)
+            except MaxTurnsExceeded:
+                pass
+            finally:
+                telemetry.finish_run()
+        return {
+            "id": f"carga-{index + 1}", "turns": telemetry.turns, "tool_calls": telemetry.tool_calls,
+            "wall_s": telemetry.wall_s,
+        }
+
+    started = time.perf_counter()
+    try:
+        sessions = await asyncio.gather(*(run_one(index) for index in range(args.sessions)))
+    finally:
+        if args.computer == "vnc":
+            await shared.close()
+    wall = time.perf_counter() - started
+    # Latencia de captura y codificación del VNCComputer (el computer nulo no captura)
+    screenshots = shared.screenshot_stats.summary() if args.computer == "vnc" else None
+    return sessions, wall, screenshots
+
+
+def run_computer_loop(args):
+    """Sesiones Agent + ComputerTool en este proceso contra el computer nulo o un VNC real"""
+    random_config = {"tools": ["computer"]}
+    if args.computer_actions:
+        random_config["computer_actions"] = args.computer_actions.split(",")
+    script = _fake_script(args, random_config)
+    with contextlib.redirect_stdout(sys.stderr):
+        sessions, wall, screenshots = asyncio.run(_run_computer_sessions(args, script))
+    result = summarize(sessions, script, args.max_turns, wall)
+    if screenshots:
+        result["screenshots"] = screenshots
+    return result
+
+
+def _print_summary(results):
+    result = results["result"]
+    config = results["config"]
+    print(
+        f"📊 Bucle {config['loop']}: {config['sessions']} sesión(es), {result['turns']} turnos en "
+        f"{result['wall_s']:.2f}s ({result['turns_per_s']} turnos/s), latencia simulada {config['latency_ms']} ms"
+    )
+    for label, key in (("latencia por turno", "turn_latency"), ("overhead por turno", "turn_overhead")):
+        distribution = result[key]
+        if distribution:
+            print(
+                f"   {label:<22} p50 {distribution['p50_ms']:.2f} ms, p90 {distribution['p90_ms']:.2f} ms, "
+                f"p99 {distribution['p99_ms']:.2f} ms, máx {distribution['max_ms']:.2f} ms"
+            )
+    for name, stats in result["tools"].items():
+        print(f"   {name:<32} {stats['calls']:>5} llamadas, p50 {stats['p50_ms']:.2f} ms, p90 {stats['p90_ms']:.2f} ms")
+    screenshots = result.get("screenshots")
+    if screenshots and screenshots["total"]:
+        print(
+            f"   capturas: {screenshots['screenshots']}, captura p50 {screenshots['capture']['p50_ms']:.2f} ms, "
+            f"total p90 {screenshots['total']['p90_ms']:.2f} ms, caché de frames {screenshots['cache_hit_rate']:.0%}"
+        )
+    if result["max_turns_reached"]:
+        print(f"   ⚠️  {result['max_turns_reached']} sesión(es) agotaron MAX_TURNS ({config['max_turns']})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del bucle del agente con el modelo simulado")
+    parser.add_argument("loop", choices=("tools", "computer"))
+    parser.add_argument("--sessions", type=int, default=1, help="Sesiones del agente")
+    parser.add_argument("--concurrency", type=int, help="Sesiones a la vez (por defecto, todas)")
+    parser.add_argument("--turns", type=int, default=20, help="Turnos con herramienta por sesión (0 = sin final)")
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latencia simulada del modelo por turno")
+    parser.add_argument("--ttft-ms", type=float, default=0, help="Tiempo simulado al primer token")
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    tools = parser.add_argument_group("bucle tools")
+    tools.add_argument("--files", type=int, default=1000, help="Tamaño del repositorio sintético")
+    tools.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "autoqa-bench"))
+    tools.add_argument("--tools", help="Herramientas que puede llamar el modelo, separadas por comas (por defecto, todas)")
+    tools.add_argument("--paths", type=int, default=20, help="Archivos Java distintos que usan las herramientas")
+    computer = parser.add_argument_group("bucle computer")
+    computer.add_argument("--computer", choices=("null", "vnc"), default="null")
+    computer.add_argument("--screen", default="1024x768", help="Resolución del computer nulo")
+    computer.add_argument("--computer-actions", help="Acciones permitidas, separadas por comas")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.loop == "tools":
+        print(f"⏱️  Ejecutando {args.sessions} sesión(es) con herramientas sobre {args.files} archivos...", file=sys.stderr)
+        result = run_tools_loop(args)
+    else:
+        print(f"⏱️  Ejecutando {args.sessions} sesión(es) con ComputerTool ({args.computer})...", file=sys.stderr)
+        result = run_computer_loop(args)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "loop": args.loop,
+            "sessions": args.sessions,
+            "concurrency": args.concurrency or args.sessions,
+            "turns": args.turns,
+            "max_turns": args.max_turns,
+            "latency_ms": args.latency_ms,
+            "ttft_ms": args.ttft_ms,
+            "jitter_ms": args.jitter_ms,
+            "seed": args.seed,
+            **({"files": args.files, "tools": args.tools} if args.loop == "tools" else
+               {"computer": args.computer, "screen": args.screen}),
+        },
+        "result": result,
+    }
+    with contextlib.redirect_stdout(sys.stderr):
+        _print_summary(results)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
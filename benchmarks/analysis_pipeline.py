@@ -0,0 +1,238 @@
+"""Benchmark del pipeline de análisis del repositorio (sin llamadas al modelo).
+
+Genera repositorios Java sintéticos (page objects en /paginas/, tests en
+/casos/, utilidades en /utils/) y mide tiempo, RSS pico y tamaño del prompt
+en cada etapa. Cada tamaño se ejecuta en un proceso nuevo para que el RSS
+pico de un tamaño no contamine al siguiente.
+
+Uso:
+    python -m benchmarks.analysis_pipeline --sizes 1000,10000,50000 --output bench.json
+    python -m benchmarks.analysis_pipeline --sizes 1000 --compare bench-anterior.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from analysis.bm25 import load_or_build_index  # noqa: E402
+from analysis.context_builder import estimate_tokens  # noqa: E402
+from analysis.memory import MemoryProbe  # noqa: E402
+from analysis.parallel import configured_workers, get_analysis_engine  # noqa: E402
+from analysis.pipeline import (  # noqa: E402
+    analyze_additional_projects,
+    analyze_existing_code,
+    analyze_framework_libraries,
+    create_context_enhanced_prompt,
+)
+from analysis.symbols import SymbolIndex  # noqa: E402
+from benchmarks.synthetic_repo import generate_workspace  # noqa: E402
+
+# Incrementar si cambia el formato del JSON de resultados
+RESULTS_VERSION = 1
+
+DEFAULT_SIZES = "1000,10000,50000"
+DEFAULT_PROMPT = "Crear un test de login que valide el mensaje de error con credenciales inválidas usando LoginPage"
+
+
+class StageTimer:
+    """Ejecuta las etapas del pipeline midiendo tiempo y memoria de cada una"""
+
+    def __init__(self):
+        self.stages = []
+
+    def run(self, name, function):
+        with MemoryProbe(name) as probe:
+            started = time.perf_counter()
+            # La salida de los analizadores no forma parte de la medida
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                value = function()
+            wall = time.perf_counter() - started
+        self.stages.append({"name": name, "wall_s": round(wall, 4), **_rounded(probe.result)})
+        return value
+
+
+def _rounded(values):
+    return {key: round(value, 2) if isinstance(value, float) else value for key, value in values.items()}
+
+
+def run_pipeline(workspace, prompt):
+    """Ejecuta todas las etapas sobre un espacio de trabajo y devuelve sus métricas"""
+    cache_dir = tempfile.mkdtemp(prefix="autoqa-bench-cache-")
+    os.environ["ANALYSIS_CACHE_DIR"] = cache_dir
+    timer = StageTimer()
+    try:
+        code_analysis = timer.run("analyze_existing_code", lambda: analyze_existing_code(workspace["target"]))
+        # Segunda pasada con la caché de análisis ya poblada
+        timer.run("analyze_existing_code_cached", lambda: analyze_existing_code(workspace["target"]))
+        framework_analysis = timer.run(
+            "analyze_framework_libraries", lambda: analyze_framework_libraries(workspace["framework"])
+        )
+        additional_projects = timer.run(
+            "analyze_additional_projects", lambda: analyze_additional_projects(workspace["reference"])
+        )
+        # Cerrar los pools para que el RSS de los workers quede registrado
+        get_analysis_engine().shutdown()
+
+        symbol_index = timer.run(
+            "symbol_index",
+            lambda: SymbolIndex.build(code_analysis, framework_analysis, workspace["target"]),
+        )
+        lexical_index = timer.run(
+            "bm25_index",
+            lambda: load_or_build_index(code_analysis, framework_analysis, workspace["target"]),
+        )
+        prompt_text, report = timer.run(
+            "create_context_enhanced_prompt",
+            lambda: create_context_enhanced_prompt(
+                prompt, code_analysis, framework_analysis, workspace["target"],
+                additional_projects, symbol_index, lexical_index=lexical_index,
+            ),
+        )
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return {
+        "java_files": len(code_analysis["all_java_files"]),
+        "framework_classes": sum(len(lib["classes"]) for lib in framework_analysis["libraries"]),
+        "reference_files": sum(len(project["files"]) for project in additional_projects),
+        "stages": timer.stages,
+        "total_wall_s": round(sum(stage["wall_s"] for stage in timer.stages), 4),
+        "prompt": {
+            "chars": len(prompt_text),
+            "estimated_tokens": estimate_tokens(prompt_text),
+            "context": report.as_dict(),
+        },
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_size_in_subprocess(files, args):
+    """Ejecuta un tamaño en un proceso nuevo y devuelve su resultado"""
+    fd, output_path = tempfile.mkstemp(prefix="autoqa-bench-", suffix=".json")
+    os.close(fd)
+    command = [
+        sys.executable, "-m", "benchmarks.analysis_pipeline", "--single", str(files),
+        "--workdir", args.workdir, "--seed", str(args.seed), "--prompt", args.prompt,
+        "--output", output_path,
+    ]
+    try:
+        subprocess.run(command, cwd=REPO_ROOT, check=True)
+        with open(output_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.unlink(output_path)
+
+
+def compare_results(current, baseline):
+    """Líneas con la variación de tiempo y RSS de cada etapa respecto a una ejecución anterior"""
+    previous = {result["files"]: result for result in baseline.get("results", [])}
+    lines = [f"Comparación con {baseline.get('commit') or 'ejecución anterior'}:"]
+    for result in current["results"]:
+        old = previous.get(result["files"])
+        if old is None:
+            lines.append(f"  {result['files']} archivos: sin datos anteriores")
+            continue
+        old_stages = {stage["name"]: stage for stage in old["stages"]}
+        lines.append(f"  {result['files']} archivos:")
+        for stage in result["stages"]:
+            old_stage = old_stages.get(stage["name"])
+            if old_stage is None:
+                continue
+            ratio = stage["wall_s"] / old_stage["wall_s"] if old_stage["wall_s"] else float("inf")
+            rss_delta = (stage.get("peak_rss_mb") or 0) - (old_stage.get("peak_rss_mb") or 0)
+            lines.append(
+                f"    {stage['name']:<32} {old_stage['wall_s']:>9.3f}s -> {stage['wall_s']:>9.3f}s "
+                f"(x{ratio:.2f}), RSS {rss_delta:+.1f} MB"
+            )
+        lines.append(
+            f"    {'prompt (tokens estimados)':<32} {old['prompt']['estimated_tokens']:>10} -> "
+            f"{result['prompt']['estimated_tokens']:>10}"
+        )
+    return lines
+
+
+def _print_summary(results):
+    for result in results["results"]:
+        print(f"📊 {result['files']} archivos ({result['java_files']} Java analizados):")
+        for stage in result["stages"]:
+            print(f"   {stage['name']:<32} {stage['wall_s']:>9.3f}s  RSS pico {stage.get('peak_rss_mb') or 0:.1f} MB "
+                  f"(+{stage.get('phase_rss_growth_mb') or 0:.1f} MB en la etapa)")
+        print(f"   {'prompt':<32} {result['prompt']['chars']} caracteres (~{result['prompt']['estimated_tokens']} tokens)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de análisis (offline)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Tamaños del proyecto objetivo, separados por comas")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "autoqa-bench"),
+                        help="Directorio donde se generan (y reutilizan) los repositorios sintéticos")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.single is not None:
+        # Proceso hijo: un solo tamaño
+        workspace = generate_workspace(args.workdir, args.single, args.seed)
+        result = {"files": args.single, **run_pipeline(workspace, args.prompt)}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return 0
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": configured_workers(),
+        "prompt": args.prompt,
+        "results": [],
+    }
+    for files in sizes:
+        print(f"⏱️  Generando y midiendo repositorio sintético de {files} archivos...", file=sys.stderr)
+        generate_workspace(args.workdir, files, args.seed)
+        results["results"].append(_run_size_in_subprocess(files, args))
+
+    with contextlib.redirect_stdout(sys.stderr):
+        _print_summary(results)
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                for line in compare_results(results, json.load(f)):
+                    print(line)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Benchmark de la captura de pantalla de VNCComputer sin servidor VNC.
+
+Una fuente de frames sintéticos (escritorio por bloques de color con algo de
+ruido) sustituye a la conexión VNC, así que se mide solo el pipeline de
+AutoQA: captura, escalado, codificación, base64 y escritura en disco. Para
+cada resolución se comparan:
+
+  legacy    el pipeline anterior: codifica el frame dos veces (archivo y
+            base64) de forma síncrona en el event loop
+  pipeline  VNCComputer.screenshot() con cada perfil de --profiles (formato,
+            calidad y tamaño máximo, ver ScreenshotProfile): una sola
+            codificación en un hilo y la escritura del archivo en segundo plano
+
+Además de la latencia por captura se mide el bloqueo del event loop: un
+ticker que duerme 1 ms registra cuánto se retrasa mientras se hacen las
+capturas (lo que notarían el keepalive de VNC u otras sesiones). Con
+--change-every mayor que 1 el escritorio solo cambia cada N capturas y se
+mide también la caché de frames (capturas sin cambios que reutilizan la
+imagen anterior).
+
+Uso:
+    python -m benchmarks.screenshots --sizes 1280x800,1920x1080,2560x1440 --count 20
+    python -m benchmarks.screenshots --profiles png,png@1280x800,jpeg:75@1280x800,webp:75@1280x800
+    python -m benchmarks.screenshots --sizes 1920x1080 --change-every 4
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+
+from agent_tools.telemetry import percentile  # noqa: E402
+from benchmarks.analysis_pipeline import _git_commit  # noqa: E402
+from computers.screenshots import ScreenshotProfile  # noqa: E402
+from computers.vnc import VNCComputer  # noqa: E402
+
+# Incrementar si cambia el formato del JSON de resultados
+RESULTS_VERSION = 3
+
+DEFAULT_SIZES = "1280x800,1920x1080,2560x1440"
+DEFAULT_PROFILES = "png"
+TICK_S = 0.001
+
+
+def synthetic_frame(width, height, seed):
+    """Frame RGBA parecido a un escritorio: bloques de 16 px de color liso con ruido en algunas filas"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, size=(height // 16 + 1, width // 16 + 1, 4), dtype=np.uint8)
+    frame = np.repeat(np.repeat(blocks, 16, axis=0), 16, axis=1)[:height, :width].copy()
+    # Texto/antialiasing: ruido en una franja de filas
+    band = slice(height // 3, height // 3 + height // 10)
+    frame[band] = rng.integers(0, 256, size=frame[band].shape, dtype=np.uint8)
+    frame[:, :, 3] = 255
+    return frame
+
+
+class FrameSource:
+    """Sustituye al gestor de conexión VNC.
+
+    Cada change_every capturas "escribe" un bloque de 48x16 px en la
+    siguiente posición (como al teclear); entre medias el frame no cambia.
+    Con change_every=0 el escritorio es estático.
+    """
+
+    is_started = True
+
+    def __init__(self, frame, change_every=1):
+        self.frame = frame.copy()
+        self.change_every = change_every
+        self.captures = 0
+        # VNCComputer lee el tamaño del framebuffer de client.video
+        height, width = frame.shape[:2]
+        self.client = types.SimpleNamespace(video=types.SimpleNamespace(width=width, height=height))
+
+    async def screenshot(self):
+        if self.change_every and self.captures % self.change_every == 0:
+            height, width = self.frame.shape[:2]
+            position = self.captures // self.change_every * 48
+            x, y = position % (width - 48), 16 + position // (width - 48) * 16 % (height - 32)
+            self.frame[y:y + 16, x:x + 48, :3] = 255 - self.frame[y:y + 16, x:x + 48, :3]
+        self.captures += 1
+        return self.frame
+
+    async def close(self):
+        pass
+
+
+async def _legacy_screenshot(connection, directory, index):
+    """Pipeline anterior: dos codificaciones PNG síncronas en el event loop"""
+    from PIL import Image
+
+    image = Image.fromarray(await connection.screenshot())
+    image.save(os.path.join(directory, f"legacy_{index}.png"))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+async def _measure(take, count):
+    """Latencias de count capturas y retrasos de un ticker de 1 ms durante ellas"""
+    lags = []
+    running = True
+
+    async def ticker():
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_S)
+            lags.append(max(0.0, time.perf_counter() - started - TICK_S))
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    latencies = []
+    for index in range(count):
+        started = time.perf_counter()
+        await take(index)
+        latencies.append(time.perf_counter() - started)
+    running = False
+    await tick_task
+    return latencies, lags
+
+
+def _distribution_ms(values):
+    return {
+        "p50_ms": round(percentile(values, 0.5) * 1000, 3),
+        "p90_ms": round(percentile(values, 0.9) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+async def _bench_profile(frame, change_every, directory, profile, count):
+    computer = VNCComputer(screenshot_dir=directory, screenshot_profile=profile)
+    computer._connection_manager = FrameSource(frame, change_every)
+    payload = {}
+
+    async def pipeline(index):
+        payload["base64"] = await computer.screenshot()
+
+    latencies, lags = await _measure(pipeline, count)
+    await computer.close()
+    return {
+        "profile": profile.describe(),
+        "image_size": "x".join(str(value) for value in computer.dimensions),
+        "payload_bytes": len(payload["base64"]),
+        "latency": _distribution_ms(latencies),
+        "loop_lag": _distribution_ms(lags),
+        "stats": computer.screenshot_stats.summary(),
+    }
+
+
+async def bench_size(width, height, profiles, count, seed, change_every):
+    frame = synthetic_frame(width, height, seed)
+    source = FrameSource(frame, change_every)
+    directory = tempfile.mkdtemp(prefix="autoqa-screens-")
+    try:
+        payload = {}
+
+        async def legacy(index):
+            payload["base64"] = await _legacy_screenshot(source, directory, index)
+
+        legacy_latencies, legacy_lags = await _measure(legacy, count)
+        pipelines = [
+            await _bench_profile(frame, change_every, directory, profile, count) for profile in profiles
+        ]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    legacy_p50 = percentile(legacy_latencies, 0.5)
+    for pipeline in pipelines:
+        pipeline["speedup_p50"] = round(legacy_p50 * 1000 / pipeline["latency"]["p50_ms"], 2)
+        pipeline["payload_ratio"] = round(pipeline["payload_bytes"] / len(payload["base64"]), 3)
+    return {
+        "size": f"{width}x{height}",
+        "legacy": {
+            "payload_bytes": len(payload["base64"]),
+            "latency": _distribution_ms(legacy_latencies),
+            "loop_lag": _distribution_ms(legacy_lags),
+        },
+        "pipelines": pipelines,
+    }
+
+
+def _print_summary(results):
+    for result in results["results"]:
+        legacy = result["legacy"]
+        print(
+            f"📸 {result['size']:>10}: legacy p50 {legacy['latency']['p50_ms']:.1f} ms "
+            f"(bloqueo máx {legacy['loop_lag']['max_ms']:.1f} ms), {legacy['payload_bytes'] // 1024} KB"
+        )
+        for pipeline in result["pipelines"]:
+            print(
+                f"   {pipeline['profile']:<20} {pipeline['image_size']:>10}: p50 {pipeline['latency']['p50_ms']:.1f} ms "
+                f"(bloqueo máx {pipeline['loop_lag']['max_ms']:.1f} ms), {pipeline['payload_bytes'] // 1024} KB, "
+                f"x{pipeline['speedup_p50']} más rápido, {pipeline['payload_ratio']:.0%} del tamaño, "
+                f"caché {pipeline['stats']['cache_hit_rate']:.0%}"
+            )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la captura de pantalla de VNCComputer")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Resoluciones separadas por comas (ANCHOxALTO)")
+    parser.add_argument("--profiles", default=DEFAULT_PROFILES,
+                        help="Perfiles de captura separados por comas (<formato>[:<calidad>][@<ancho>x<alto>])")
+    parser.add_argument("--count", type=int, default=20, help="Capturas por resolución y variante")
+    parser.add_argument("--change-every", type=int, default=1,
+                        help="El escritorio cambia cada N capturas (1 = siempre, 0 = nunca); el resto son aciertos de la caché")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [tuple(int(value) for value in size.lower().split("x")) for size in args.sizes.split(",") if size.strip()]
+    profiles = [ScreenshotProfile.parse(spec) for spec in args.profiles.split(",") if spec.strip()]
+    # Los mensajes de VNCComputer por captura no aportan nada al benchmark
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        measured = [asyncio.run(bench_size(width, height, profiles, args.count, args.seed, args.change_every)) for width, height in sizes]
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "count": args.count,
+        "change_every": args.change_every,
+        "results": measured,
+    }
+
+    with contextlib.redirect_stdout(sys.stderr):
+        _print_summary(results)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
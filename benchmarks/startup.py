@@ -0,0 +1,189 @@
+"""Benchmark del tiempo de arranque de la CLI y de los módulos de AutoQA.
+
+Cada objetivo se ejecuta en un proceso nuevo varias veces (mediana y mínimo
+del tiempo de pared) y se registra qué dependencias pesadas (agents, openai,
+PIL, numpy, asyncvnc) quedan cargadas. `autoqa.py --help` y el análisis no
+deben cargar ninguna: si lo hacen, o si la CLI supera --max-cli-ms, el
+benchmark termina con código 1, así que sirve de comprobación en CI.
+
+Uso:
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --compare startup.json --max-cli-ms 300
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.analysis_pipeline import _git_commit  # noqa: E402
+
+# Incrementar si cambia el formato del JSON de resultados
+RESULTS_VERSION = 1
+
+HEAVY_MODULES = ("agents", "openai", "PIL", "numpy", "asyncvnc")
+
+# (nombre, código que se ejecuta, debe arrancar sin dependencias pesadas)
+TARGETS = (
+    ("cli_help", "import autoqa\ntry:\n    autoqa.main(['--help'])\nexcept SystemExit:\n    pass", True),
+    ("cli_parse_analyze", "import autoqa\nautoqa.parse_args(['analyze'])", True),
+    ("import_analysis_pipeline", "import analysis.pipeline", True),
+    ("import_computers_docker", "import computers.docker", False),
+    ("import_computers_vnc", "import computers.vnc", False),
+    ("import_computer_use_agent", "import computer_use_agent", False),
+    ("import_generation", "import agent_tools.generation", False),
+)
+
+# Se añade al código de cada objetivo para informar de los módulos cargados
+_REPORT = """
+import json as _json, sys as _sys
+_loaded = sorted({name.split('.')[0] for name in _sys.modules} & set(%r))
+_sys.stderr.write('AUTOQA_STARTUP ' + _json.dumps({'heavy': _loaded, 'modules': len(_sys.modules)}) + '\\n')
+""" % (HEAVY_MODULES,)
+
+
+def _run_once(code, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    started = time.perf_counter()
+    completed = subprocess.run(
+        command + ["-c", code + _REPORT], cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    report = None
+    for line in completed.stderr.splitlines():
+        if line.startswith("AUTOQA_STARTUP "):
+            report = json.loads(line.split(" ", 1)[1])
+    return wall, report, completed
+
+
+def _slowest_imports(stderr, count):
+    """Los count módulos con más tiempo acumulado según -X importtime"""
+    imports = []
+    for line in stderr.splitlines():
+        # import time:  self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        imports.append((int(cumulative_us), name.strip()))
+    imports.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(us / 1000, 2)} for us, name in imports[:count]]
+
+
+def measure(name, code, must_be_light, repeats, top_imports):
+    """Mide un objetivo; devuelve su resultado o el error si no se pudo importar"""
+    walls = []
+    report = None
+    for _ in range(repeats):
+        wall, report, completed = _run_once(code)
+        if completed.returncode != 0 or report is None:
+            error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"código {completed.returncode}"
+            return {"name": name, "must_be_light": must_be_light, "error": error}
+        walls.append(wall)
+    _, _, traced = _run_once(code, importtime=True)
+    return {
+        "name": name,
+        "must_be_light": must_be_light,
+        "median_ms": round(statistics.median(walls) * 1000, 2),
+        "min_ms": round(min(walls) * 1000, 2),
+        "modules": report["modules"],
+        "heavy_modules": report["heavy"],
+        "slowest_imports": _slowest_imports(traced.stderr, top_imports),
+    }
+
+
+def check(results, max_cli_ms=None):
+    """Problemas que hacen fallar el benchmark: dependencias pesadas en arranques ligeros o CLI lenta"""
+    problems = []
+    for result in results["results"]:
+        if result.get("error"):
+            if result["must_be_light"]:
+                problems.append(f"{result['name']}: no arranca ({result['error']})")
+            continue
+        if result["must_be_light"] and result["heavy_modules"]:
+            problems.append(f"{result['name']}: carga {', '.join(result['heavy_modules'])} al arrancar")
+        if max_cli_ms is not None and result["name"] == "cli_help" and result["median_ms"] > max_cli_ms:
+            problems.append(f"cli_help: {result['median_ms']:.0f} ms supera el máximo de {max_cli_ms:.0f} ms")
+    return problems
+
+
+def compare_results(current, baseline):
+    """Líneas con la variación de la mediana de cada objetivo respecto a una ejecución anterior"""
+    previous = {result["name"]: result for result in baseline.get("results", [])}
+    lines = [f"Comparación con {baseline.get('commit') or 'ejecución anterior'}:"]
+    for result in current["results"]:
+        old = previous.get(result["name"])
+        if old is None or "median_ms" not in old or "median_ms" not in result:
+            lines.append(f"  {result['name']:<28} sin datos comparables")
+            continue
+        ratio = result["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        lines.append(
+            f"  {result['name']:<28} {old['median_ms']:>9.1f} ms -> {result['median_ms']:>9.1f} ms (x{ratio:.2f}), "
+            f"módulos {old['modules']} -> {result['modules']}"
+        )
+    return lines
+
+
+def _print_summary(results):
+    for result in results["results"]:
+        if result.get("error"):
+            print(f"⚠️  {result['name']:<28} error: {result['error']}")
+            continue
+        heavy = f" (carga {', '.join(result['heavy_modules'])})" if result["heavy_modules"] else ""
+        print(f"⏱️  {result['name']:<28} {result['median_ms']:>9.1f} ms, {result['modules']} módulos{heavy}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del tiempo de arranque de la CLI y los módulos")
+    parser.add_argument("--repeats", type=int, default=5, help="Ejecuciones por objetivo")
+    parser.add_argument("--top-imports", type=int, default=5, help="Imports más lentos que se registran por objetivo")
+    parser.add_argument("--max-cli-ms", type=float, help="Falla si autoqa.py --help tarda más (mediana)")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeats": args.repeats,
+        "results": [
+            measure(name, code, must_be_light, args.repeats, args.top_imports)
+            for name, code, must_be_light in TARGETS
+        ],
+    }
+    problems = check(results, args.max_cli_ms)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        _print_summary(results)
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                for line in compare_results(results, json.load(f)):
+                    print(line)
+        for problem in problems:
+            print(f"❌ {problem}")
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
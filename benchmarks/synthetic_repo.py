@@ -0,0 +1,175 @@
+import os
+import random
+
+# Vocabulario para nombres de clases y métodos (da términos realistas a BM25 y al ranking)
+DOMAINS = [
+    "Login", "Checkout", "Cart", "Search", "Profile", "Payment", "Order", "Invoice",
+    "Catalog", "Product", "Account", "Address", "Shipping", "Review", "Wishlist", "Report",
+]
+ACTIONS = ["click", "type", "select", "open", "submit", "validate", "wait", "clear", "read", "scroll"]
+ELEMENTS = ["Button", "Field", "Link", "Menu", "Table", "Modal", "Banner", "Message", "Grid", "Tab"]
+
+# Proporción de archivos por capa del proyecto objetivo
+LAYOUT = (("paginas", "Page", 0.4), ("casos", "Test", 0.4), ("utils", "Util", 0.2))
+
+MARKER_FILE = ".bench-complete"
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _method_names(rng, count):
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(ACTIONS)}{rng.choice(ELEMENTS)}{rng.randint(1, 99)}")
+    return sorted(names)
+
+
+def _page_object(rng, package, class_name):
+    methods = _method_names(rng, rng.randint(4, 10))
+    locators = "".join(
+        f'    private final By {name}Locator = By.id("{name.lower()}");\n' for name in methods
+    )
+    body = "".join(f"""
+    /**
+     * Acción {name} sobre la página {class_name}.
+     */
+    public {class_name} {name}(String value) {{
+        driver.findElement({name}Locator).sendKeys(value);
+        return this;
+    }}
+""" for name in methods)
+    return f"""package {package};
+
+import org.openqa.selenium.By;
+import org.openqa.selenium.WebDriver;
+
+public class {class_name} {{
+    private final WebDriver driver;
+{locators}
+    public {class_name}(WebDriver driver) {{
+        this.driver = driver;
+    }}
+{body}}}
+"""
+
+
+def _test_class(rng, package, class_name, page_class):
+    methods = _method_names(rng, rng.randint(3, 8))
+    body = "".join(f"""
+    @Test
+    public void {name}Test() {{
+        // Verifica {name} en {page_class}
+        {page_class} page = new {page_class}(driver);
+        page.{name}("dato-{index}");
+        Assert.assertTrue(driver.getTitle().contains("{page_class}"));
+    }}
+""" for index, name in enumerate(methods))
+    return f"""package {package};
+
+import org.junit.Assert;
+import org.junit.Test;
+import org.openqa.selenium.WebDriver;
+
+public class {class_name} {{
+    private WebDriver driver;
+{body}}}
+"""
+
+
+def _utility_class(rng, package, class_name):
+    methods = _method_names(rng, rng.randint(2, 6))
+    body = "".join(f"""
+    public static String {name}(String input, int retries) {{
+        for (int i = 0; i < retries; i++) {{
+            if (input != null && !input.isEmpty()) {{
+                return input.trim();
+            }}
+        }}
+        return "";
+    }}
+""" for name in methods)
+    return f"""package {package};
+
+public final class {class_name} {{
+    private {class_name}() {{
+    }}
+{body}}}
+"""
+
+
+def _generate_target(root, files, rng):
+    page_classes = []
+    for layer, suffix, share in LAYOUT:
+        count = max(1, int(files * share))
+        base_package = f"com.bench.{layer}"
+        source_root = "src/test/java" if layer == "casos" else "src/main/java"
+        for index in range(count):
+            # Subpaquetes de ~200 clases para que el árbol sea realista
+            package = f"{base_package}.m{index // 200:03d}"
+            class_name = f"{rng.choice(DOMAINS)}{suffix}{index}"
+            path = os.path.join(root, source_root, *package.split("."), f"{class_name}.java")
+            if layer == "paginas":
+                content = _page_object(rng, package, class_name)
+                page_classes.append(class_name)
+            elif layer == "casos":
+                content = _test_class(rng, package, class_name, rng.choice(page_classes) if page_classes else "Object")
+            else:
+                content = _utility_class(rng, package, class_name)
+            _write(path, content)
+
+    # Salidas de build que el recorrido debe podar
+    for index in range(min(50, files // 20)):
+        _write(os.path.join(root, "target", "generated-sources", f"Generated{index}.java"), "class Generated {}\n")
+    _write(os.path.join(root, "pom.xml"), "<project><artifactId>bench-target</artifactId></project>\n")
+
+
+def _generate_framework(root, files, rng):
+    for index in range(files):
+        package = f"com.framework.{rng.choice(['acciones', 'esperas', 'utils'])}"
+        class_name = f"{rng.choice(DOMAINS)}Helper{index}"
+        _write(
+            os.path.join(root, "src/main/java", *package.split("."), f"{class_name}.java"),
+            _utility_class(rng, package, class_name),
+        )
+
+
+def _generate_reference(root, files, rng):
+    for index in range(files):
+        package = "com.reference.paginas"
+        class_name = f"{rng.choice(DOMAINS)}Page{index}"
+        _write(
+            os.path.join(root, "src/main/java", *package.split("."), f"{class_name}.java"),
+            _page_object(rng, package, class_name),
+        )
+    _write(os.path.join(root, "pom.xml"), "<project><artifactId>bench-reference</artifactId></project>\n")
+    _write(os.path.join(root, "README.md"), "# Proyecto de referencia\n")
+    _write(os.path.join(root, "src/main/resources/config.properties"), "browser=firefox\ntimeout=30\n")
+
+
+def generate_workspace(workdir, files, seed=1):
+    """Genera (o reutiliza) un espacio de trabajo sintético con files archivos en el proyecto objetivo.
+
+    Devuelve un diccionario con las rutas del proyecto objetivo, la librería del
+    framework (files/10 clases) y el proyecto de referencia (files/20 archivos).
+    El contenido es determinista para un mismo seed.
+    """
+    root = os.path.join(workdir, f"repo-{files}-s{seed}")
+    workspace = {
+        "root": root,
+        "target": os.path.join(root, "target-project"),
+        "framework": os.path.join(root, "framework-lib"),
+        "reference": os.path.join(root, "reference-project"),
+    }
+    if os.path.exists(os.path.join(root, MARKER_FILE)):
+        return workspace
+
+    rng = random.Random(seed)
+    _generate_target(workspace["target"], files, rng)
+    _generate_framework(workspace["framework"], max(20, files // 10), rng)
+    _generate_reference(workspace["reference"], max(10, files // 20), rng)
+    _write(os.path.join(root, MARKER_FILE), f"{files}\n")
+    return workspace
@@ -0,0 +1,343 @@
+"""Benchmark del framebuffer local de VNC contra un servidor RFB simulado.
+
+El servidor (en este proceso, sobre localhost) sirve un escritorio sintético
+de --screen con codificación ZLib y cambia un bloque de 48x16 px cada
+--change-ms (0 = escritorio estático). Responde a las peticiones
+incrementales solo con los rectángulos que cambiaron, como un servidor real,
+y cuenta los bytes que envía.
+
+Se comparan dos formas de capturar:
+
+  legacy       asyncvnc Client.screenshot(): pide el framebuffer completo en
+               cada captura (lo que hacía _VNCConnectionManager.screenshot())
+  framebuffer  _VNCConnectionManager con el bucle de actualizaciones
+               incrementales: la captura es una vista del buffer local
+
+Para cada una se mide la latencia por captura y los bytes recibidos por
+captura (incluidas las actualizaciones de fondo entre capturas).
+
+Después el servidor corta la conexión --flaps veces y se mide cuánto tarda
+una captura hecha justo tras el corte (espera a la reconexión) junto con las
+métricas de conexión del gestor.
+
+Uso:
+    python -m benchmarks.vnc_framebuffer --screen 1920x1080 --count 30 --interval-ms 200
+    python -m benchmarks.vnc_framebuffer --change-ms 0 --output vnc.json
+    python -m benchmarks.vnc_framebuffer --flaps 5
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import zlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from agent_tools.telemetry import percentile  # noqa: E402
+from benchmarks.analysis_pipeline import _git_commit  # noqa: E402
+from benchmarks.screenshots import synthetic_frame  # noqa: E402
+
+# Incrementar si cambia el formato del JSON de resultados
+RESULTS_VERSION = 2
+
+# Formato de píxel RGBA de 32 bits (el modo 'rgba' de asyncvnc) más 3 bytes de relleno
+RGBA_PIXEL_FORMAT = b"\x20\x18\x00\x01\x00\xff\x00\xff\x00\xff\x00\x08\x10\x00\x00\x00"
+
+
+class FakeRFBServer:
+    """Servidor RFB 3.8 mínimo: sin autenticación, rectángulos ZLib y peticiones incrementales"""
+
+    def __init__(self, width, height, change_s, seed):
+        self.width = width
+        self.height = height
+        self.change_s = change_s
+        self.frame = synthetic_frame(width, height, seed)
+        self.bytes_sent = 0
+        self.changes = 0
+        self._server = None
+        self._clients = set()
+        # Por cliente: rectángulos cambiados aún no enviados y evento de cambio
+        self._dirty_lists = []
+        self._events = []
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        for task in list(self._clients):
+            task.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def drop_clients(self):
+        """Corta todas las conexiones abiertas, como un servidor VNC que se reinicia"""
+        clients = list(self._clients)
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+
+    def _change(self, dirty):
+        """Invierte un bloque de 48x16 px en la siguiente posición, como al teclear"""
+        position = self.changes * 48
+        x = position % (self.width - 48)
+        y = 16 + position // (self.width - 48) * 16 % (self.height - 32)
+        self.frame[y:y + 16, x:x + 48, :3] = 255 - self.frame[y:y + 16, x:x + 48, :3]
+        self.changes += 1
+        for rects in dirty:
+            rects.append((x, y, 48, 16))
+
+    def _send(self, writer, data):
+        self.bytes_sent += len(data)
+        writer.write(data)
+
+    def _send_update(self, writer, compressor, rects):
+        self._send(writer, b"\x00\x00" + len(rects).to_bytes(2, "big"))
+        for x, y, width, height in rects:
+            pixels = self.frame[y:y + height, x:x + width].tobytes()
+            data = compressor.compress(pixels) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._send(
+                writer,
+                x.to_bytes(2, "big") + y.to_bytes(2, "big") + width.to_bytes(2, "big")
+                + height.to_bytes(2, "big") + (6).to_bytes(4, "big", signed=True)
+                + len(data).to_bytes(4, "big") + data,
+            )
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        dirty = []
+        self._dirty_lists.append(dirty)
+        changed = asyncio.Event()
+        self._events.append(changed)
+        compressor = zlib.compressobj(6)
+        pending_incremental = False
+        read = None
+        try:
+            self._send(writer, b"RFB 003.008\n")
+            await reader.readexactly(12)
+            self._send(writer, b"\x01\x01")  # un tipo de seguridad: None
+            await reader.readexactly(1)
+            self._send(writer, (0).to_bytes(4, "big"))
+            await reader.readexactly(1)  # ClientInit
+            name = b"autoqa-bench"
+            self._send(
+                writer,
+                self.width.to_bytes(2, "big") + self.height.to_bytes(2, "big") + RGBA_PIXEL_FORMAT
+                + len(name).to_bytes(4, "big") + name,
+            )
+            read = asyncio.ensure_future(reader.readexactly(1))
+            while True:
+                waiting = None
+                if pending_incremental:
+                    waiting = asyncio.ensure_future(changed.wait())
+                    await asyncio.wait({read, waiting}, return_when=asyncio.FIRST_COMPLETED)
+                    waiting.cancel()
+                    if not read.done():
+                        # Hay cambios para la petición incremental pendiente
+                        changed.clear()
+                        rects, dirty[:] = list(dirty), []
+                        self._send_update(writer, compressor, rects)
+                        pending_incremental = False
+                        await writer.drain()
+                        continue
+                message = (await read)[0]
+                if message == 0:  # SetPixelFormat
+                    await reader.readexactly(19)
+                elif message == 2:  # SetEncodings
+                    await reader.readexactly(1)
+                    count = int.from_bytes(await reader.readexactly(2), "big")
+                    await reader.readexactly(4 * count)
+                elif message == 3:  # FramebufferUpdateRequest
+                    request = await reader.readexactly(9)
+                    if request[0] and not dirty:
+                        pending_incremental = True
+                    else:
+                        rects = list(dirty) if request[0] else [(0, 0, self.width, self.height)]
+                        dirty[:] = []
+                        changed.clear()
+                        self._send_update(writer, compressor, rects)
+                        await writer.drain()
+                elif message == 4:  # KeyEvent
+                    await reader.readexactly(7)
+                elif message == 5:  # PointerEvent
+                    await reader.readexactly(5)
+                elif message == 6:  # ClientCutText
+                    await reader.readexactly(3)
+                    await reader.readexactly(int.from_bytes(await reader.readexactly(4), "big"))
+                read = asyncio.ensure_future(reader.readexactly(1))
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if read is not None:
+                read.cancel()
+                with contextlib.suppress(BaseException):
+                    await read
+            self._dirty_lists.remove(dirty)
+            self._events.remove(changed)
+            self._clients.discard(task)
+            writer.close()
+
+    async def run_changes(self):
+        """Cambia el escritorio cada change_s segundos hasta que se cancela"""
+        if not self.change_s:
+            return
+        while True:
+            await asyncio.sleep(self.change_s)
+            self._change(self._dirty_lists)
+            for event in self._events:
+                event.set()
+
+
+def _distribution_ms(values):
+    return {
+        "p50_ms": round(percentile(values, 0.5) * 1000, 3),
+        "p90_ms": round(percentile(values, 0.9) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+async def _capture_loop(server, take, count, interval_s):
+    """Latencias de count capturas separadas por interval_s y bytes enviados por el servidor durante ellas"""
+    started_bytes = server.bytes_sent
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await take()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval_s)
+    return latencies, server.bytes_sent - started_bytes
+
+
+async def _flap_loop(server, manager, flaps):
+    """Duración de una captura hecha justo después de cada corte de conexión"""
+    recoveries = []
+    for _ in range(flaps):
+        await server.drop_clients()
+        await asyncio.sleep(0.05)  # el gestor detecta el corte
+        started = time.perf_counter()
+        await manager.screenshot()
+        recoveries.append(time.perf_counter() - started)
+    return recoveries
+
+
+async def bench(width, height, count, interval_s, change_s, seed, flaps):
+    import asyncvnc
+
+    from computers.vnc import _VNCConnectionManager
+
+    server = FakeRFBServer(width, height, change_s, seed)
+    port = await server.start()
+    changes = asyncio.create_task(server.run_changes())
+    try:
+        async with asyncvnc.connect("127.0.0.1", port) as client:
+            await client.screenshot()  # la primera captura completa no se mide en ninguna variante
+
+            async def legacy():
+                await client.screenshot()
+
+            legacy_latencies, legacy_bytes = await _capture_loop(server, legacy, count, interval_s)
+
+        manager = _VNCConnectionManager("127.0.0.1", port, None, None)
+        await manager.start()
+        try:
+            await manager.screenshot()
+            framebuffer_latencies, framebuffer_bytes = await _capture_loop(
+                server, manager.screenshot, count, interval_s
+            )
+            stats = dict(manager.framebuffer_stats)
+            recoveries = await _flap_loop(server, manager, flaps)
+            connection = dict(manager.connection_stats)
+        finally:
+            await manager.close()
+    finally:
+        changes.cancel()
+        await server.close()
+
+    return {
+        "legacy": {
+            "latency": _distribution_ms(legacy_latencies),
+            "bytes_per_screenshot": round(legacy_bytes / count),
+        },
+        "framebuffer": {
+            "latency": _distribution_ms(framebuffer_latencies),
+            "bytes_per_screenshot": round(framebuffer_bytes / count),
+            "stats": stats,
+        },
+        "reconnect": {
+            "flaps": flaps,
+            "screenshot_after_drop": _distribution_ms(recoveries) if recoveries else None,
+            "connect_ms": round(connection["connect_s"] * 1000, 3),
+            "reconnect": _distribution_ms(connection["reconnect_s"]) if connection["reconnect_s"] else None,
+            "attempts": connection["attempts"],
+            "failures": connection["failures"],
+        },
+        "desktop_changes": server.changes,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del framebuffer local de VNC con un servidor simulado")
+    parser.add_argument("--screen", default="1920x1080", help="Resolución del escritorio simulado")
+    parser.add_argument("--count", type=int, default=30, help="Capturas por variante")
+    parser.add_argument("--interval-ms", type=float, default=200, help="Tiempo entre capturas")
+    parser.add_argument("--change-ms", type=float, default=1000, help="Cada cuánto cambia el escritorio (0 = nunca)")
+    parser.add_argument("--flaps", type=int, default=3, help="Cortes de conexión para medir la reconexión")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    width, height = (int(value) for value in args.screen.lower().split("x"))
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        measured = asyncio.run(bench(
+            width, height, args.count, args.interval_ms / 1000, args.change_ms / 1000, args.seed, args.flaps,
+        ))
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "screen": args.screen,
+        "count": args.count,
+        "interval_ms": args.interval_ms,
+        "change_ms": args.change_ms,
+        "flaps": args.flaps,
+        "result": measured,
+    }
+
+    with contextlib.redirect_stdout(sys.stderr):
+        for name in ("legacy", "framebuffer"):
+            variant = measured[name]
+            print(
+                f"🖥️  {name:<12} p50 {variant['latency']['p50_ms']:.2f} ms, p90 {variant['latency']['p90_ms']:.2f} ms, "
+                f"{variant['bytes_per_screenshot'] // 1024} KB por captura"
+            )
+        reconnect = measured["reconnect"]
+        print(f"🔌 conexión inicial {reconnect['connect_ms']:.1f} ms")
+        if reconnect["reconnect"]:
+            print(
+                f"🔌 {reconnect['flaps']} cortes: reconexión p50 {reconnect['reconnect']['p50_ms']:.0f} ms, "
+                f"máx {reconnect['reconnect']['max_ms']:.0f} ms; captura tras el corte "
+                f"p50 {reconnect['screenshot_after_drop']['p50_ms']:.0f} ms"
+            )
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,81 +3,129 @@ from agents import Agent, ComputerTool, ModelSettings, Runner
 import os
 from dotenv import load_dotenv
 
+from computers.screenshots import ScreenshotProfile
 from computers.vnc import VNCComputer
 
-load_dotenv()
-
 # REALIDAD: OpenAI ha descontinuado computer_use_preview completamente
 # SOLUCIÓN: Usar Anthropic Claude que SÍ tiene computer use funcionando
 
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# Variables VNC
-VNC_HOST = os.getenv("VNC_HOST")
-VNC_PORT = os.getenv("VNC_PORT")
-VNC_PASSWORD = os.getenv("VNC_PASSWORD")
-
-if not VNC_HOST:
-    print("Warning: VNC_HOST not found in environment variables")
-if not VNC_PORT:
-    print("Warning: VNC_PORT not found in environment variables")
-if not VNC_PASSWORD:
-    print("Warning: VNC_PASSWORD not found in environment variables")
-
-# Determinar qué modelo usar
-if ANTHROPIC_API_KEY:
-    # OPCIÓN 1: Usar Claude (RECOMENDADO - computer use funciona)
-    MODEL = "claude-3-5-sonnet-20241022"
-    print(f"✅ Using Anthropic Claude: {MODEL}")
-    print(f"🎯 Claude has working computer use capabilities!")
-    API_TYPE = "anthropic"
-elif OPENAI_API_KEY:
-    # OPCIÓN 2: OpenAI (ADVERTENCIA - no tiene computer use)
-    MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
-    print(f"⚠️  Using OpenAI: {MODEL}")
-    print(f"❌ WARNING: OpenAI models NO LONGER support computer_use_preview")
-    print(f"� This will FAIL. Please set ANTHROPIC_API_KEY instead.")
-    API_TYPE = "openai"
-else:
+DEFAULT_MAX_TURNS = 100
+
+
+def select_model():
+    """Devuelve (modelo, tipo de API) según las API keys disponibles; Claude si hay ANTHROPIC_API_KEY"""
+    ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+    # Determinar qué modelo usar
+    if ANTHROPIC_API_KEY:
+        # OPCIÓN 1: Usar Claude (RECOMENDADO - computer use funciona)
+        MODEL = "claude-3-5-sonnet-20241022"
+        print(f"✅ Using Anthropic Claude: {MODEL}")
+        print(f"🎯 Claude has working computer use capabilities!")
+        return MODEL, "anthropic"
+    if OPENAI_API_KEY:
+        # OPCIÓN 2: OpenAI (ADVERTENCIA - no tiene computer use)
+        MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+        print(f"⚠️  Using OpenAI: {MODEL}")
+        print(f"❌ WARNING: OpenAI models NO LONGER support computer_use_preview")
+        print(f"� This will FAIL. Please set ANTHROPIC_API_KEY instead.")
+        return MODEL, "openai"
     print(f"❌ ERROR: No API key found!")
     print(f"✅ Set ANTHROPIC_API_KEY (recommended) for computer use")
     print(f"⚠️  Or set OPENAI_API_KEY (but computer use won't work)")
     raise ValueError("No API key available")
 
-# Configurar VNC Computer
-computer = VNCComputer(
-    host=VNC_HOST if VNC_HOST is not None else "localhost",
-    username="ubuntu",
-    port=int(VNC_PORT) if VNC_PORT is not None else 5900,
-    password=VNC_PASSWORD
-)
-
-# Crear agente
-try:
-    computer_use_agent = Agent(
-        model=MODEL,
-        model_settings=ModelSettings(
-            truncation="auto",
-            reasoning={"summary": "auto"},
-        ),
-        name="Computer User",
-        instructions="""You are a helpful assistant that can control a computer.
-        You have access to a virtual machine running Ubuntu.
-        You can take screenshots, click, type, scroll, and perform other computer operations.
-        When asked to perform tasks, use the computer tool to interact with the GUI environment.
-        You have full access to the computer, including the ability to install packages.
-        Explain what you're doing as you complete tasks.""",
-        tools=[ComputerTool(computer)],
+
+def build_computer():
+    """VNCComputer configurado desde VNC_HOST, VNC_PORT, VNC_PASSWORD y AUTOQA_SCREENSHOT_PROFILE (no conecta hasta la primera acción)"""
+    # Variables VNC
+    VNC_HOST = os.getenv("VNC_HOST")
+    VNC_PORT = os.getenv("VNC_PORT")
+    VNC_PASSWORD = os.getenv("VNC_PASSWORD")
+
+    if not VNC_HOST:
+        print("Warning: VNC_HOST not found in environment variables")
+    if not VNC_PORT:
+        print("Warning: VNC_PORT not found in environment variables")
+    if not VNC_PASSWORD:
+        print("Warning: VNC_PASSWORD not found in environment variables")
+
+    # Configurar VNC Computer
+    return VNCComputer(
+        host=VNC_HOST if VNC_HOST is not None else "localhost",
+        username="ubuntu",
+        port=int(VNC_PORT) if VNC_PORT is not None else 5900,
+        password=VNC_PASSWORD,
+        # Tamaño y formato de las capturas que ve el modelo (p. ej. "jpeg:75@1280x800")
+        screenshot_profile=ScreenshotProfile.from_env(),
     )
-    print(f"✅ Agent initialized successfully with {API_TYPE}")
-    
-    if API_TYPE == "openai":
-        print(f"⚠️  WARNING: This agent will likely fail due to OpenAI computer use limitations")
-        
-except Exception as e:
-    print(f"❌ Failed to initialize agent: {e}")
-    if API_TYPE == "openai" and "computer_use" in str(e):
-        print(f"💡 EXPECTED: OpenAI no longer supports computer use")
-        print(f"🔧 SOLUTION: Set ANTHROPIC_API_KEY to use Claude instead")
-    raise
+
+
+def build_computer_use_agent(computer, model, api_type):
+    """Crea el agente que controla el computer con ComputerTool"""
+    try:
+        computer_use_agent = Agent(
+            model=model,
+            model_settings=ModelSettings(
+                truncation="auto",
+                reasoning={"summary": "auto"},
+            ),
+            name="Computer User",
+            instructions="""You are a helpful assistant that can control a computer.
+            You have access to a virtual machine running Ubuntu.
+            You can take screenshots, click, type, scroll, and perform other computer operations.
+            When asked to perform tasks, use the computer tool to interact with the GUI environment.
+            You have full access to the computer, including the ability to install packages.
+            Explain what you're doing as you complete tasks.""",
+            tools=[ComputerTool(computer)],
+        )
+        print(f"✅ Agent initialized successfully with {api_type}")
+
+        if api_type == "openai":
+            print(f"⚠️  WARNING: This agent will likely fail due to OpenAI computer use limitations")
+
+        return computer_use_agent
+    except Exception as e:
+        print(f"❌ Failed to initialize agent: {e}")
+        if api_type == "openai" and "computer_use" in str(e):
+            print(f"💡 EXPECTED: OpenAI no longer supports computer use")
+            print(f"🔧 SOLUTION: Set ANTHROPIC_API_KEY to use Claude instead")
+        raise
+
+
+async def run_computer_use(prompt, max_turns=DEFAULT_MAX_TURNS, run_config=None):
+    """Ejecuta el agente de computer use con un prompt y devuelve su salida final"""
+    load_dotenv()
+    model, api_type = select_model()
+    computer = build_computer()
+    agent = build_computer_use_agent(computer, model, api_type)
+    try:
+        result = await Runner.run(agent, prompt, max_turns=max_turns, run_config=run_config)
+    finally:
+        # Escribir las capturas pendientes y cerrar la conexión VNC
+        await computer.close()
+        print("📸 Capturas:")
+        for line in computer.screenshot_stats.summary_lines():
+            print(f"   {line}")
+        framebuffer_stats = getattr(computer, "framebuffer_stats", None)
+        if framebuffer_stats:
+            print(
+                f"   Framebuffer VNC: {framebuffer_stats['updates']} actualizaciones, "
+                f"{framebuffer_stats['rectangles']} rectángulos, {framebuffer_stats['bytes'] // 1024} KB recibidos"
+            )
+        connection_stats = getattr(computer, "connection_stats", None)
+        if connection_stats and connection_stats["connect_s"] is not None:
+            line = f"   Conexión VNC: {connection_stats['connect_s'] * 1000:.0f} ms hasta conectar"
+            if connection_stats["reconnect_s"]:
+                line += (
+                    f", {connection_stats['reconnects']} reconexiones "
+                    f"(máx {max(connection_stats['reconnect_s']):.1f} s)"
+                )
+            print(line)
+    print(f"📝 Resultado: {result.final_output}")
+    return result.final_output
+
+
+if __name__ == "__main__":
+    asyncio.run(run_computer_use(os.environ["PROMPT"], int(os.environ.get("MAX_TURNS", DEFAULT_MAX_TURNS))))
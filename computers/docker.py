@@ -1,9 +1,13 @@
+import base64
+import io
 import subprocess
 import os
 import time
 import shlex
 from agents import Computer
 
+from computers.screenshots import ScreenshotProfile
+
 
 def docker_exec(cmd: str, container_name: str, decode=True) -> str:
     safe_cmd = cmd.replace('"', '"')
@@ -20,11 +24,15 @@ class DockerComputer(Computer):
         display=":99",
         container_name="computer",
         port_mapping="5900:5900",
+        screenshot_profile=None,
     ):
         self.name = "computer"
         self.display = display
         self.container_name = container_name
         self.port_mapping = port_mapping
+        # Size and format of the screenshots sent to the model; actions are
+        # mapped back from the scaled screenshot to the real display.
+        self.screenshot_profile = screenshot_profile or ScreenshotProfile()
 
     def __enter__(self):
         print("Entering DockerComputer context")
@@ -62,6 +70,11 @@ class DockerComputer(Computer):
 
     @property
     def dimensions(self) -> tuple[int, int]:
+        return self.screenshot_profile.scaled_size(*self.screen_dimensions)
+
+    @property
+    def screen_dimensions(self) -> tuple[int, int]:
+        """Real display size"""
         if hasattr(self, "_dimensions"):
             return self._dimensions
 
@@ -93,10 +106,24 @@ class DockerComputer(Computer):
         base64_output = docker_exec(
             "base64 -w 0 /tmp/screenshot.png", self.container_name
         )
-        return base64_output
+        if self.screenshot_profile.is_passthrough:
+            return base64_output
+
+        # Scale and re-encode the full-size PNG for the model
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(base64.b64decode(base64_output)))
+        self._dimensions = image.size
+        _, encoded = self.screenshot_profile.encode_image(image)
+        return encoded
+
+    def _to_screen(self, x, y):
+        """Map screenshot coordinates from the model to the real display"""
+        return self.screenshot_profile.to_screen(x, y, self.screen_dimensions)
 
     def click(self, x: int, y: int, button: str = "left") -> None:
         print(f"🖱️ Clicking: x={x}, y={y}, button={button}")
+        x, y = self._to_screen(x, y)
         button_map = {"left": 1, "middle": 2, "right": 3, "back": 8, "forward": 9}
         button_num = button_map.get(button, 1)
         docker_exec(
@@ -106,6 +133,7 @@ class DockerComputer(Computer):
 
     def double_click(self, x: int, y: int) -> None:
         print(f"🖱️ Double-clicking: x={x}, y={y}")
+        x, y = self._to_screen(x, y)
         docker_exec(
             f"DISPLAY={self.display} xdotool mousemove {x} {y} click --repeat 2 1",
             self.container_name,
@@ -113,6 +141,7 @@ class DockerComputer(Computer):
 
     def scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> None:
         print(f"🖱️ Scrolling: position=({x}, {y}), scroll=({scroll_x}, {scroll_y})")
+        x, y = self._to_screen(x, y)
         docker_exec(
             f"DISPLAY={self.display} xdotool mousemove {x} {y}", self.container_name
         )
@@ -149,6 +178,7 @@ class DockerComputer(Computer):
 
     def move(self, x: int, y: int) -> None:
         print(f"🖱️ Moving to: x={x}, y={y}")
+        x, y = self._to_screen(x, y)
         docker_exec(
             f"DISPLAY={self.display} xdotool mousemove {x} {y}", self.container_name
         )
@@ -176,6 +206,7 @@ class DockerComputer(Computer):
         print(
             f"🖱️ Dragging: from ({path[0][0]}, {path[0][1]}) to ({path[-1][0]}, {path[-1][1]})"
         )
+        path = [self._to_screen(x, y) for x, y in path]
         start_x, start_y = path[0]
         docker_exec(
             f"DISPLAY={self.display} xdotool mousemove {start_x} {start_y}",
@@ -194,6 +225,3 @@ class DockerComputer(Computer):
 
     def get_current_url(self):
         return None
-
-
-computer = DockerComputer(display=":99", container_name="computer")
@@ -0,0 +1,440 @@
+import asyncio
+import base64
+import io
+import math
+import os
+import threading
+import time
+
+DEFAULT_WRITER_QUEUE_SIZE = 8
+DEFAULT_QUALITY = 80
+DEFAULT_DIFF_TILE = 32
+PROFILE_ENV = "AUTOQA_SCREENSHOT_PROFILE"
+
+FORMAT_ALIASES = {"png": "png", "jpeg": "jpeg", "jpg": "jpeg", "webp": "webp"}
+FILE_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+class ScreenshotProfile:
+    """How screenshots are sent to the model: maximum size, image format and quality.
+
+    Frames larger than max_width x max_height are scaled down, keeping the
+    aspect ratio. The computer then reports the scaled size as its
+    dimensions, and to_screen() maps the model's coordinates back to the
+    real framebuffer. The default profile sends full-size PNGs.
+    """
+
+    def __init__(self, max_width=None, max_height=None, format="png", quality=DEFAULT_QUALITY):
+        if format.lower() not in FORMAT_ALIASES:
+            raise ValueError(f"Unsupported screenshot format: {format} (use png, jpeg or webp)")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError(f"Screenshot quality must be between 1 and 100, got {quality}")
+        self.max_width = max_width
+        self.max_height = max_height
+        self.format = FORMAT_ALIASES[format.lower()]
+        self.quality = quality
+
+    @classmethod
+    def parse(cls, spec):
+        """Profile from "<format>[:<quality>][@<max_width>x<max_height>]", e.g. "jpeg:75@1280x800" """
+        spec = spec.strip()
+        max_width = max_height = None
+        if "@" in spec:
+            spec, size = spec.split("@", 1)
+            max_width, max_height = (int(value) for value in size.lower().split("x"))
+        format, _, quality = spec.partition(":")
+        return cls(max_width, max_height, format or "png", int(quality) if quality else DEFAULT_QUALITY)
+
+    @classmethod
+    def from_env(cls):
+        """Profile from AUTOQA_SCREENSHOT_PROFILE, or the default full-size PNG profile"""
+        spec = os.environ.get(PROFILE_ENV)
+        return cls.parse(spec) if spec else cls()
+
+    @property
+    def is_passthrough(self):
+        """True when screenshots are sent as full-size PNGs, i.e. captured PNGs need no re-encoding"""
+        return self.format == "png" and not self.max_width and not self.max_height
+
+    @property
+    def extension(self):
+        return FILE_EXTENSIONS[self.format]
+
+    def describe(self):
+        size = f"@{self.max_width}x{self.max_height}" if self.max_width or self.max_height else ""
+        quality = f":{self.quality}" if self.format != "png" else ""
+        return f"{self.format}{quality}{size}"
+
+    def scaled_size(self, width, height):
+        """Size of a width x height frame as sent to the model (never scaled up)"""
+        scale = 1.0
+        if self.max_width and width > self.max_width:
+            scale = min(scale, self.max_width / width)
+        if self.max_height and height > self.max_height:
+            scale = min(scale, self.max_height / height)
+        if scale == 1.0:
+            return width, height
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    def to_screen(self, x, y, screen_size):
+        """Map a point in the scaled screenshot back to the real screen_size framebuffer"""
+        width, height = screen_size
+        scaled_width, scaled_height = self.scaled_size(width, height)
+        if (scaled_width, scaled_height) == (width, height):
+            return x, y
+        real_x = round(x * width / scaled_width)
+        real_y = round(y * height / scaled_height)
+        return min(max(real_x, 0), width - 1), min(max(real_y, 0), height - 1)
+
+    def encode_image(self, image):
+        """Scale and encode a PIL image. Returns (image bytes, base64 string)."""
+        from PIL import Image
+
+        # VNC frames are RGBA with an opaque alpha channel: dropping it makes
+        # the scaling and every encoder work on 25% less data.
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        size = self.scaled_size(*image.size)
+        if size != image.size:
+            # Same filter and reducing gap as Image.thumbnail()
+            image = image.resize(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+        options = {}
+        if self.format in ("jpeg", "webp"):
+            options["quality"] = self.quality
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.format.upper(), **options)
+        data = buffer.getvalue()
+        return data, base64.b64encode(data).decode("ascii")
+
+    def encode(self, pixels):
+        """Scale and encode a pixel array. Returns (image bytes, base64 string)."""
+        from PIL import Image
+
+        return self.encode_image(Image.fromarray(pixels))
+
+
+def _percentile(values, fraction):
+    """Nearest-rank percentile; None when there are no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(fraction * len(ordered))) - 1]
+
+
+class ScreenshotStats:
+    """Per-screenshot latency and size, split into capture, diff, encode and total time.
+
+    Screenshots served from the frame-diff cache have no encode sample and
+    count as cache hits.
+    """
+
+    STAGES = ("capture", "diff", "encode", "total")
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in self.STAGES}
+        self.bytes = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.writes = 0
+        self.dropped_writes = 0
+        self.write_errors = 0
+
+    def record(self, capture_s, total_s, size, diff_s=None, encode_s=None, cached=False):
+        self.samples["capture"].append(capture_s)
+        self.samples["total"].append(total_s)
+        if diff_s is not None:
+            self.samples["diff"].append(diff_s)
+        if encode_s is not None:
+            self.samples["encode"].append(encode_s)
+        self.bytes.append(size)
+        if cached:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    @property
+    def count(self):
+        return len(self.samples["total"])
+
+    @property
+    def cache_hit_rate(self):
+        return self.cache_hits / self.count if self.count else None
+
+    def summary(self):
+        """JSON-serializable summary: p50/p90/max per stage in ms, mean payload size, cache and writer counters"""
+        summary = {
+            "screenshots": self.count,
+            "mean_bytes": round(sum(self.bytes) / len(self.bytes)) if self.bytes else None,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": None if self.cache_hit_rate is None else round(self.cache_hit_rate, 3),
+            "writes": self.writes,
+            "dropped_writes": self.dropped_writes,
+            "write_errors": self.write_errors,
+        }
+        for stage, values in self.samples.items():
+            summary[stage] = None if not values else {
+                "p50_ms": round(_percentile(values, 0.5) * 1000, 3),
+                "p90_ms": round(_percentile(values, 0.9) * 1000, 3),
+                "max_ms": round(max(values) * 1000, 3),
+            }
+        return summary
+
+    def summary_lines(self):
+        summary = self.summary()
+        lines = [f"Screenshots: {summary['screenshots']}, mean size {summary['mean_bytes'] or 0} bytes"]
+        for stage in self.STAGES:
+            if summary[stage]:
+                lines.append(
+                    f"{stage:<8} p50 {summary[stage]['p50_ms']:.1f} ms, p90 {summary[stage]['p90_ms']:.1f} ms, "
+                    f"max {summary[stage]['max_ms']:.1f} ms"
+                )
+        if summary["screenshots"]:
+            lines.append(
+                f"Frame cache: {summary['cache_hits']} hits, {summary['cache_misses']} misses "
+                f"({summary['cache_hit_rate']:.0%} hit rate)"
+            )
+        lines.append(
+            f"Disk writes: {summary['writes']} written, {summary['dropped_writes']} dropped, "
+            f"{summary['write_errors']} failed"
+        )
+        return lines
+
+
+class FrameDiff:
+    """Result of comparing a frame with the last encoded one"""
+
+    __slots__ = ("changed_pixels", "total_pixels", "regions")
+
+    def __init__(self, changed_pixels, total_pixels, regions):
+        self.changed_pixels = changed_pixels
+        self.total_pixels = total_pixels
+        # (x, y, width, height) boxes around the changed areas, in framebuffer pixels
+        self.regions = regions
+
+    @property
+    def changed_fraction(self):
+        return self.changed_pixels / self.total_pixels if self.total_pixels else 0.0
+
+
+def _changed_mask(frame, previous, pixel_tolerance):
+    """Boolean (height, width) mask of the pixels that differ by more than pixel_tolerance in any channel"""
+    import numpy as np
+
+    if pixel_tolerance:
+        delta = np.abs(frame.astype(np.int16) - previous.astype(np.int16))
+        return (delta > pixel_tolerance).any(axis=2)
+    if frame.ndim == 3 and frame.shape[2] == 4 and frame.flags.c_contiguous and previous.flags.c_contiguous:
+        # One 32-bit comparison per RGBA pixel instead of four byte comparisons
+        return (frame.view(np.uint32) != previous.view(np.uint32))[:, :, 0]
+    return (frame != previous).any(axis=2)
+
+
+def _changed_regions(mask, tile):
+    """Bounding boxes of the connected groups of changed tile x tile blocks, tightened to the changed pixels"""
+    import numpy as np
+
+    height, width = mask.shape
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile), dtype=bool)
+    padded[:height, :width] = mask
+    tiles = padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+
+    regions = []
+    pending = set(zip(*(index.tolist() for index in np.nonzero(tiles))))
+    while pending:
+        stack = [pending.pop()]
+        top, left, bottom, right = stack[0][0], stack[0][1], stack[0][0], stack[0][1]
+        while stack:
+            row, col = stack.pop()
+            top, bottom = min(top, row), max(bottom, row)
+            left, right = min(left, col), max(right, col)
+            for neighbour in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if neighbour in pending:
+                    pending.remove(neighbour)
+                    stack.append(neighbour)
+        y0, x0 = top * tile, left * tile
+        block = mask[y0:(bottom + 1) * tile, x0:(right + 1) * tile]
+        changed_rows = np.flatnonzero(block.any(axis=1))
+        changed_cols = np.flatnonzero(block.any(axis=0))
+        regions.append((
+            int(x0 + changed_cols[0]), int(y0 + changed_rows[0]),
+            int(changed_cols[-1] - changed_cols[0] + 1), int(changed_rows[-1] - changed_rows[0] + 1),
+        ))
+    regions.sort(key=lambda region: (region[1], region[0]))
+    return regions
+
+
+class FrameDiffCache:
+    """Reuses the last encoded screenshot while the screen does not change.
+
+    Each frame is compared with a copy of the last frame that was encoded.
+    When at most max_changed_fraction of the pixels changed by more than
+    pixel_tolerance, and the profile is the same, the cached payload is
+    returned and the reference frame is kept, so small changes add up until
+    they trigger a new encode. The defaults only reuse identical frames.
+    """
+
+    def __init__(self, pixel_tolerance=0, max_changed_fraction=0.0, tile=DEFAULT_DIFF_TILE):
+        self.pixel_tolerance = pixel_tolerance
+        self.max_changed_fraction = max_changed_fraction
+        self.tile = tile
+        self._frame = None
+        self._generation = None
+        self._profile = None
+        self._payload = None
+        self._lock = threading.Lock()
+
+    def diff(self, frame):
+        """FrameDiff against the last encoded frame, or None if there is none or the size changed"""
+        previous = self._frame
+        if previous is None or previous.shape != frame.shape:
+            return None
+        mask = _changed_mask(frame, previous, self.pixel_tolerance)
+        changed = int(mask.sum())
+        return FrameDiff(changed, mask.size, _changed_regions(mask, self.tile) if changed else [])
+
+    def encode(self, frame, profile, generation=None):
+        """Cached or freshly encoded screenshot of frame, as an EncodedScreenshot.
+
+        generation identifies the frame's framebuffer version when the source
+        tracks one: a frame with the generation of the cached one is reused
+        without diffing.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            if (
+                generation is not None
+                and generation == self._generation
+                and self._profile == profile.describe()
+                and self._frame.shape == frame.shape
+            ):
+                data, encoded = self._payload
+                unchanged = FrameDiff(0, frame.shape[0] * frame.shape[1], [])
+                return EncodedScreenshot(data, encoded, unchanged, True, time.perf_counter() - started, None)
+
+            diff = self.diff(frame)
+            diffed = time.perf_counter()
+            if (
+                diff is not None
+                and self._profile == profile.describe()
+                and diff.changed_fraction <= self.max_changed_fraction
+            ):
+                data, encoded = self._payload
+                return EncodedScreenshot(data, encoded, diff, True, diffed - started, None)
+
+            data, encoded = profile.encode(frame)
+            # Read-only frames are snapshots their source never modifies
+            self._frame = frame if not frame.flags.writeable else frame.copy()
+            self._generation = generation
+            self._profile = profile.describe()
+            self._payload = (data, encoded)
+            diff_s = diffed - started if diff is not None else None
+            return EncodedScreenshot(data, encoded, diff, False, diff_s, time.perf_counter() - diffed)
+
+
+class EncodedScreenshot:
+    """An encoded screenshot and what changed since the previous one"""
+
+    __slots__ = ("data", "base64", "diff", "cached", "diff_s", "encode_s")
+
+    def __init__(self, data, base64, diff, cached, diff_s, encode_s):
+        self.data = data
+        self.base64 = base64
+        # None for the first frame or after a resolution change
+        self.diff = diff
+        self.cached = cached
+        self.diff_s = diff_s
+        self.encode_s = encode_s
+
+    @property
+    def changed_regions(self):
+        """Changed (x, y, width, height) boxes in framebuffer pixels; None when everything may have changed"""
+        return None if self.diff is None else self.diff.regions
+
+
+def _encode_uncached(frame, profile):
+    started = time.perf_counter()
+    data, encoded = profile.encode(frame)
+    return EncodedScreenshot(data, encoded, None, False, None, time.perf_counter() - started)
+
+
+class ScreenshotWriter:
+    """Writes screenshot files from a background task so the caller never waits on disk.
+
+    submit() only enqueues. When the queue is full the screenshot is dropped
+    (and counted) rather than blocking the agent. Call flush() or close()
+    before exiting so queued files are written.
+    """
+
+    def __init__(self, directory=None, stats=None, max_queue=DEFAULT_WRITER_QUEUE_SIZE):
+        self.directory = directory or os.getcwd()
+        self.stats = stats if stats is not None else ScreenshotStats()
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+
+    def submit(self, filename, data):
+        """Queue data to be written to filename (relative to the writer directory)"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        try:
+            self._queue.put_nowait((os.path.join(self.directory, filename), data))
+        except asyncio.QueueFull:
+            self.stats.dropped_writes += 1
+            print(f"Screenshot writer queue full, dropping {filename}")
+
+    @staticmethod
+    def _write(path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    async def _run(self):
+        while True:
+            path, data = await self._queue.get()
+            try:
+                await asyncio.to_thread(self._write, path, data)
+                self.stats.writes += 1
+                print(f"Screenshot saved to {os.path.abspath(path)}")
+            except OSError as e:
+                self.stats.write_errors += 1
+                print(f"Failed to save screenshot {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def flush(self):
+        """Wait until every queued screenshot has been written"""
+        if self._task is not None:
+            await self._queue.join()
+
+    async def close(self):
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def capture_and_encode(connection, stats, profile, cache=None):
+    """Await connection.screenshot() for a pixel array and encode it once with profile in a worker thread.
+
+    With a FrameDiffCache, unchanged frames reuse the previous payload; a
+    connection that keeps a local framebuffer also reports the frame's
+    generation, which lets the cache skip the diff. Returns an
+    EncodedScreenshot and records the timings in stats.
+    """
+    started = time.perf_counter()
+    pixels = await connection.screenshot()
+    generation = getattr(connection, "frame_generation", None)
+    captured = time.perf_counter()
+    if cache is not None:
+        screenshot = await asyncio.to_thread(cache.encode, pixels, profile, generation)
+    else:
+        screenshot = await asyncio.to_thread(_encode_uncached, pixels, profile)
+    stats.record(
+        captured - started, time.perf_counter() - started, len(screenshot.data),
+        diff_s=screenshot.diff_s, encode_s=screenshot.encode_s, cached=screenshot.cached,
+    )
+    return screenshot
@@ -1,12 +1,16 @@
 import asyncio
-import base64
-import io
+import random
 import time
-import os
-from PIL import Image
-import asyncvnc
 from agents import AsyncComputer
 
+from computers.screenshots import (
+    FrameDiffCache,
+    ScreenshotProfile,
+    ScreenshotStats,
+    ScreenshotWriter,
+    capture_and_encode,
+)
+
 
 class VNCComputer(AsyncComputer):
     def __init__(
@@ -15,6 +19,10 @@ class VNCComputer(AsyncComputer):
         port=5900,
         username=None,
         password=None,
+        save_screenshots=True,
+        screenshot_dir=None,
+        screenshot_profile=None,
+        screenshot_cache=True,
     ):
         self.name = "vnc_computer"
         self.host = host
@@ -24,6 +32,22 @@ class VNCComputer(AsyncComputer):
         self._dimensions = None
         self._connection_lock = asyncio.Lock()
         self._connection_manager = None
+        # Each screenshot is encoded once, off the event loop; the PNG file is
+        # written by a background writer so disk I/O never delays the agent.
+        self.save_screenshots = save_screenshots
+        # Size and format of the screenshots sent to the model; actions are
+        # mapped back from the scaled screenshot to the real framebuffer.
+        self.screenshot_profile = screenshot_profile or ScreenshotProfile()
+        self.screenshot_stats = ScreenshotStats()
+        # Unchanged frames reuse the last encoded screenshot (True for exact
+        # matches only, or a FrameDiffCache with tolerances).
+        if screenshot_cache is True:
+            screenshot_cache = FrameDiffCache()
+        self.screenshot_cache = screenshot_cache or None
+        # Changed (x, y, width, height) framebuffer regions between the last
+        # two screenshots; None when unknown (first frame, no cache)
+        self.last_changed_regions = None
+        self._screenshot_writer = ScreenshotWriter(screenshot_dir, self.screenshot_stats)
 
     @property
     def environment(self) -> str:
@@ -31,6 +55,11 @@ class VNCComputer(AsyncComputer):
 
     @property
     def dimensions(self) -> tuple[int, int]:
+        return self.screenshot_profile.scaled_size(*self.screen_dimensions)
+
+    @property
+    def screen_dimensions(self) -> tuple[int, int]:
+        """Real framebuffer size"""
         if (
             self._connection_manager
             and self._connection_manager.client
@@ -42,6 +71,22 @@ class VNCComputer(AsyncComputer):
             )
         return (1024, 768)  # Default fallback dimensions
 
+    @property
+    def framebuffer_stats(self):
+        """Framebuffer updates, rectangles, bytes received and copy-on-write copies, or None before connecting"""
+        if self._connection_manager is None:
+            return None
+        return dict(self._connection_manager.framebuffer_stats)
+
+    @property
+    def connection_stats(self):
+        """Connection attempts, failures, first connect time and reconnect times, or None before connecting"""
+        if self._connection_manager is None:
+            return None
+        stats = dict(self._connection_manager.connection_stats)
+        stats["reconnect_s"] = list(stats["reconnect_s"])
+        return stats
+
     async def _get_connection_manager(self):
         """Get or create the connection manager"""
         async with self._connection_lock:
@@ -60,40 +105,49 @@ class VNCComputer(AsyncComputer):
         print("📸 Taking screenshot")
         connection = await self._get_connection_manager()
 
-        # Get screenshot as numpy array
-        pixels = await connection.screenshot()
-
-        # Convert to PIL Image
-        image = Image.fromarray(pixels)
-
-        # Save the image to a file
-        timestamp = int(time.time())
-        filename = f"screenshot_{timestamp}.png"
-        image.save(filename)
-        print(f"Screenshot saved to {os.path.abspath(filename)}")
-
-        # Convert to base64 (return only raw base64 string without prefix)
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
+        # Get screenshot as numpy array and encode it in a worker thread,
+        # unless it matches the previous frame
+        screenshot = await capture_and_encode(
+            connection,
+            self.screenshot_stats,
+            self.screenshot_profile,
+            self.screenshot_cache,
+        )
+        self.last_changed_regions = screenshot.changed_regions
+        if self.last_changed_regions is None:
+            # Without a cache, fall back to the regions the server updated
+            self.last_changed_regions = getattr(connection, "last_dirty_regions", None)
+        if screenshot.cached:
+            print("Screen unchanged, reusing previous screenshot")
+
+        if self.save_screenshots and not screenshot.cached:
+            timestamp = int(time.time())
+            self._screenshot_writer.submit(
+                f"screenshot_{timestamp}.{self.screenshot_profile.extension}",
+                screenshot.data,
+            )
 
         # Return raw base64 string (matching Docker implementation)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return screenshot.base64
+
+    def _to_screen(self, x, y):
+        """Map screenshot coordinates from the model to the real framebuffer"""
+        return self.screenshot_profile.to_screen(x, y, self.screen_dimensions)
 
     async def click(self, x: int, y: int, button: str = "left") -> None:
         print(f"🖱️ Clicking: x={x}, y={y}, button={button}")
         connection = await self._get_connection_manager()
-        await connection.click(x, y, button)
+        await connection.click(*self._to_screen(x, y), button)
 
     async def double_click(self, x: int, y: int) -> None:
         print(f"🖱️ Double-clicking: x={x}, y={y}")
         connection = await self._get_connection_manager()
-        await connection.double_click(x, y)
+        await connection.double_click(*self._to_screen(x, y))
 
     async def scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> None:
         print(f"🖱️ Scrolling: position=({x}, {y}), scroll=({scroll_x}, {scroll_y})")
         connection = await self._get_connection_manager()
-        await connection.scroll(x, y, scroll_x, scroll_y)
+        await connection.scroll(*self._to_screen(x, y), scroll_x, scroll_y)
 
     async def type(self, text: str) -> None:
         print(f"⌨️ Typing: '{text}'")
@@ -107,7 +161,7 @@ class VNCComputer(AsyncComputer):
     async def move(self, x: int, y: int) -> None:
         print(f"🖱️ Moving to: x={x}, y={y}")
         connection = await self._get_connection_manager()
-        await connection.move(x, y)
+        await connection.move(*self._to_screen(x, y))
 
     async def keypress(self, keys: list[str]) -> None:
         print(f"⌨️ Pressing keys: {keys}")
@@ -165,15 +219,98 @@ class VNCComputer(AsyncComputer):
             f"🖱️ Dragging: from ({path[0][0]}, {path[0][1]}) to ({path[-1][0]}, {path[-1][1]})"
         )
         connection = await self._get_connection_manager()
-        await connection.drag(path)
+        await connection.drag([self._to_screen(x, y) for x, y in path])
 
     async def get_current_url(self):
         return None
 
+    async def close(self):
+        """Write pending screenshots and close the VNC connection"""
+        await self._screenshot_writer.close()
+        if self._connection_manager:
+            await self._connection_manager.close()
+
+
+class _Framebuffer:
+    """Local copy of the remote framebuffer, kept current from VNC update rectangles.
+
+    The buffer is always stored as RGBA: each update rectangle is reordered
+    from the server's channel order when it is written, so snapshot() can
+    return a read-only view of the buffer without copying it in any pixel
+    format. The buffer is copied only when an update arrives while a
+    snapshot is still shared (copy on write), so a static desktop costs
+    nothing.
+    """
+
+    def __init__(self, width, height, mode, previous=None):
+        import numpy as np
+
+        self.width = width
+        self.height = height
+        self.mode = mode
+        # Server channel index of each of R, G and B
+        self._channels = [mode.index(channel) for channel in "rgb"]
+        self.data = np.zeros((height, width, 4), "B")
+        # Incremented after every applied framebuffer update; after a
+        # reconnect it continues from the previous framebuffer so a
+        # generation never names two different frames
+        self.generation = previous.generation if previous else 0
+        self.first_generation = self.generation
+        self.copies = previous.copies if previous else 0
+        self._shared = False
+        self._dirty = []
+
+    def write(self, x, y, width, height, pixels):
+        """Apply one update rectangle of raw pixels in the server's channel order"""
+        import numpy as np
+
+        if self._shared:
+            self.data = self.data.copy()
+            self._shared = False
+            self.copies += 1
+        region = self.data[y : y + height, x : x + width]
+        region[:, :, :3] = np.ndarray((height, width, 4), "B", pixels)[:, :, self._channels]
+        region[:, :, 3] = 255
+        self._dirty.append((x, y, width, height))
+
+    @property
+    def has_frame(self):
+        """Whether at least one update arrived since this framebuffer was created"""
+        return self.generation > self.first_generation
+
+    def commit(self):
+        self.generation += 1
+
+    def snapshot(self):
+        """(RGBA frame, generation, regions updated since the previous snapshot)"""
+        # A view of the buffer: the next update copies it first
+        frame = self.data.view()
+        frame.flags.writeable = False
+        self._shared = True
+        dirty, self._dirty = self._dirty, []
+        return frame, self.generation, dirty
+
 
 class _VNCConnectionManager:
     """Internal class to manage VNC connections"""
 
+    # Minimum time between framebuffer update requests (caps the update rate
+    # of a busy desktop)
+    UPDATE_INTERVAL = 0.05
+    # How long a screenshot taken right after an input action waits for the
+    # framebuffer update it caused
+    POST_ACTION_WAIT = 0.1
+    FIRST_FRAME_TIMEOUT = 10
+    CONNECT_TIMEOUT = 10
+    # How long an action waits for a dropped connection to come back
+    RECONNECT_TIMEOUT = 30
+    # Reconnect delays: exponential backoff with jitter, reset after a
+    # successful connection. Encoding errors need a server-side fix, so they
+    # never retry faster than ENCODING_ERROR_DELAY.
+    BACKOFF_INITIAL = 0.5
+    BACKOFF_MAX = 30
+    ENCODING_ERROR_DELAY = 5
+
     def __init__(self, host, port, username, password):
         self.host = host
         self.port = port
@@ -184,6 +321,26 @@ class _VNCConnectionManager:
         self.is_started = False
         self._closed = False
         self._event_loop = None
+        self.framebuffer = None
+        # Generation and updated regions of the last screenshot
+        self.frame_generation = None
+        self.last_dirty_regions = None
+        self.framebuffer_stats = {"updates": 0, "rectangles": 0, "bytes": 0, "copies": 0}
+        # connect_s: time from start() to the first connection; reconnect_s:
+        # time from each disconnect until the connection was back
+        self.connection_stats = {
+            "attempts": 0,
+            "failures": 0,
+            "reconnects": 0,
+            "connect_s": None,
+            "reconnect_s": [],
+        }
+        self._connected = asyncio.Event()
+        self._frame_updated = asyncio.Condition()
+        self._input_generation = None
+        self._unsupported_encoding = None
+        self._started_at = None
+        self._disconnected_at = None
 
     async def start(self):
         """Start the connection manager"""
@@ -192,35 +349,84 @@ class _VNCConnectionManager:
 
         print(f"Starting VNC connection to {self.host}:{self.port}")
         self._event_loop = asyncio.get_running_loop()
+        self._started_at = time.monotonic()
         self.task = self._event_loop.create_task(self._connection_task())
         self.is_started = True
 
         # Wait for connection to be established
-        timeout = 10
-        start_time = time.time()
-        while not self.client and time.time() - start_time < timeout:
-            await asyncio.sleep(0.1)
+        try:
+            await asyncio.wait_for(self._connected.wait(), self.CONNECT_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                f"Failed to connect to VNC server within {self.CONNECT_TIMEOUT} seconds"
+            ) from None
+
+    async def _wait_for_client(self):
+        """The connected client, waiting up to RECONNECT_TIMEOUT while the connection is re-established"""
+        if self.client:
+            return self.client
+        if self._closed or not self.is_started:
+            raise RuntimeError("VNC client not connected")
 
-        if not self.client:
+        print("Waiting for the VNC connection to be re-established")
+        try:
+            await asyncio.wait_for(self._connected.wait(), self.RECONNECT_TIMEOUT)
+        except asyncio.TimeoutError:
             raise RuntimeError(
-                f"Failed to connect to VNC server within {timeout} seconds"
-            )
+                f"VNC client not connected: no reconnect within {self.RECONNECT_TIMEOUT} seconds"
+            ) from None
+        return self.client
+
+    def _backoff_delay(self, failures):
+        """Delay before the next connection attempt after failures consecutive failures"""
+        delay = min(self.BACKOFF_MAX, self.BACKOFF_INITIAL * 2 ** (failures - 1))
+        # Half fixed, half random, so several clients don't retry in lockstep
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _set_connected(self, client):
+        now = time.monotonic()
+        if self._disconnected_at is None:
+            self.connection_stats["connect_s"] = now - self._started_at
+        else:
+            self.connection_stats["reconnects"] += 1
+            self.connection_stats["reconnect_s"].append(now - self._disconnected_at)
+            self._disconnected_at = None
+        self.framebuffer = _Framebuffer(
+            client.video.width, client.video.height, client.video.mode, self.framebuffer
+        )
+        self._input_generation = None
+        self.client = client
+        self._connected.set()
+
+    def _set_disconnected(self):
+        if self.client is not None:
+            self._disconnected_at = time.monotonic()
+        self.client = None
+        self._connected.clear()
 
     async def _connection_task(self):
         """Task that maintains the VNC connection"""
+        import asyncvnc
+
+        failures = 0
         while not self._closed:
+            self.connection_stats["attempts"] += 1
             try:
                 print(f"Connecting to VNC server at {self.host}:{self.port}")
                 # Try to connect with only standard encodings enabled
                 async with asyncvnc.connect(
                     self.host, self.port, username=self.username, password=self.password
                 ) as client:
-                    self.client = client
+                    self._set_connected(client)
+                    failures = 0
                     print("Connected to VNC server")
 
-                    # Keep connection alive until closed
-                    while not self._closed:
-                        await asyncio.sleep(1)
+                    # Keep the local framebuffer current until closed; mark
+                    # the client gone before asyncvnc finishes closing it
+                    try:
+                        await self._update_loop(client)
+                    finally:
+                        self._set_disconnected()
 
             except ValueError as e:
                 # Handle encoding errors
@@ -231,19 +437,25 @@ class _VNCConnectionManager:
                 print(
                     "You might need to configure your VNC server to use more standard encodings."
                 )
-                self.client = None
+                if str(e).isdigit():
+                    self._unsupported_encoding = e
+                self._set_disconnected()
+                failures += 1
+                self.connection_stats["failures"] += 1
 
                 if not self._closed:
-                    # Longer wait for encoding errors before retry
-                    await asyncio.sleep(5)
+                    await asyncio.sleep(max(self.ENCODING_ERROR_DELAY, self._backoff_delay(failures)))
 
             except Exception as e:
                 print(f"VNC connection error: {e}")
-                self.client = None
+                self._set_disconnected()
+                failures += 1
+                self.connection_stats["failures"] += 1
 
                 if not self._closed:
-                    # Wait before reconnecting
-                    await asyncio.sleep(2)
+                    delay = self._backoff_delay(failures)
+                    print(f"Reconnecting to VNC server in {delay:.1f} seconds")
+                    await asyncio.sleep(delay)
 
         print("VNC connection task finished")
 
@@ -258,22 +470,137 @@ class _VNCConnectionManager:
                 pass
             self.task = None
         self.client = None
+        self._connected.clear()
         self.is_started = False
 
+    def _request_update(self, client, incremental):
+        """Ask the server for a framebuffer update (FramebufferUpdateRequest)"""
+        client.writer.write(
+            b"\x03"
+            + int(incremental).to_bytes(1, "big")
+            + (0).to_bytes(2, "big")
+            + (0).to_bytes(2, "big")
+            + client.video.width.to_bytes(2, "big")
+            + client.video.height.to_bytes(2, "big")
+        )
+
+    async def _read_rectangle(self, client):
+        """Read one update rectangle into the local framebuffer"""
+        import asyncvnc
+
+        reader = client.reader
+        x = await asyncvnc.read_int(reader, 2)
+        y = await asyncvnc.read_int(reader, 2)
+        width = await asyncvnc.read_int(reader, 2)
+        height = await asyncvnc.read_int(reader, 2)
+        encoding = await asyncvnc.read_int(reader, 4)
+
+        if encoding == 0:  # Raw
+            data = await reader.readexactly(height * width * 4)
+            received = len(data)
+        elif encoding == 6:  # ZLib
+            length = await asyncvnc.read_int(reader, 4)
+            compressed = await reader.readexactly(length)
+            received = length
+            data = client.video.decompress(compressed)
+        else:
+            raise ValueError(encoding)
+
+        self.framebuffer.write(x, y, width, height, data)
+        self.framebuffer_stats["rectangles"] += 1
+        self.framebuffer_stats["bytes"] += received
+
+    async def _read_update(self, client):
+        """Read one server message; framebuffer updates go to the local framebuffer"""
+        import asyncvnc
+
+        reader = client.reader
+        update_type = asyncvnc.UpdateType(await asyncvnc.read_int(reader, 1))
+
+        if update_type is asyncvnc.UpdateType.CLIPBOARD:
+            await reader.readexactly(3)  # padding
+            client.clipboard.text = await asyncvnc.read_text(reader, "latin-1")
+
+        if update_type is asyncvnc.UpdateType.VIDEO:
+            await reader.readexactly(1)  # padding
+            for _ in range(await asyncvnc.read_int(reader, 2)):
+                await self._read_rectangle(client)
+
+        return update_type
+
+    async def _update_loop(self, client):
+        """Keep the local framebuffer current with incremental updates.
+
+        There is always one update request outstanding, so the server sends
+        changed rectangles as soon as they happen (at most one update every
+        UPDATE_INTERVAL) and nothing while the desktop is static.
+        """
+        import asyncvnc
+
+        self._request_update(client, incremental=False)
+        await client.drain()
+        requested = time.monotonic()
+        while not self._closed:
+            update_type = await self._read_update(client)
+            if update_type is not asyncvnc.UpdateType.VIDEO:
+                continue
+
+            async with self._frame_updated:
+                self.framebuffer.commit()
+                self.framebuffer_stats["updates"] += 1
+                self.framebuffer_stats["copies"] = self.framebuffer.copies
+                self._unsupported_encoding = None
+                self._frame_updated.notify_all()
+
+            delay = self.UPDATE_INTERVAL - (time.monotonic() - requested)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._request_update(client, incremental=True)
+            await client.drain()
+            requested = time.monotonic()
+
+    async def _wait_for_generation(self, generation, timeout):
+        """Wait until the framebuffer is newer than generation; False on timeout"""
+        async with self._frame_updated:
+            try:
+                await asyncio.wait_for(
+                    self._frame_updated.wait_for(
+                        lambda: self.framebuffer.generation > generation
+                    ),
+                    timeout,
+                )
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    def _mark_input(self):
+        """Remember that input was sent, so the next screenshot waits for its update"""
+        if self.framebuffer is not None and self._input_generation is None:
+            self._input_generation = self.framebuffer.generation
+
     async def screenshot(self):
-        """Take a screenshot"""
-        if not self.client:
-            raise RuntimeError("VNC client not connected")
+        """Take a screenshot from the local framebuffer"""
+        if self._unsupported_encoding is not None:
+            print(f"Unsupported VNC encoding: {self._unsupported_encoding}")
+            print("Try configuring your VNC server to use basic encodings only.")
+            # Return a placeholder image to prevent crashes
+            return self._create_placeholder_image()
+
+        await self._wait_for_client()
+
+        framebuffer = self.framebuffer
+        if not framebuffer.has_frame:
+            if not await self._wait_for_generation(framebuffer.generation, self.FIRST_FRAME_TIMEOUT):
+                raise RuntimeError(
+                    f"No framebuffer update from the VNC server within {self.FIRST_FRAME_TIMEOUT} seconds"
+                )
+        elif self._input_generation is not None:
+            # Give the screen a moment to show the result of the last action
+            await self._wait_for_generation(self._input_generation, self.POST_ACTION_WAIT)
+        self._input_generation = None
 
-        try:
-            return await self.client.screenshot()
-        except ValueError as e:
-            if str(e).isdigit():
-                print(f"Unsupported VNC encoding: {e}")
-                print("Try configuring your VNC server to use basic encodings only.")
-                # Return a placeholder image to prevent crashes
-                return self._create_placeholder_image()
-            raise
+        frame, self.frame_generation, self.last_dirty_regions = framebuffer.snapshot()
+        return frame
 
     def _create_placeholder_image(self):
         """Create a placeholder image when screenshot fails"""
@@ -292,36 +619,36 @@ class _VNCConnectionManager:
 
     async def click(self, x, y, button="left"):
         """Click at position"""
-        if not self.client:
-            raise RuntimeError("VNC client not connected")
+        client = await self._wait_for_client()
+        self._mark_input()
 
-        self.client.mouse.move(x, y)
+        client.mouse.move(x, y)
         if button == "right":
-            self.client.mouse.right_click()
+            client.mouse.right_click()
         elif button == "middle":
-            self.client.mouse.middle_click()
+            client.mouse.middle_click()
         else:
-            self.client.mouse.click()
+            client.mouse.click()
 
-        await self.client.drain()
+        await client.drain()
 
     async def double_click(self, x, y):
         """Double click at position"""
-        if not self.client:
-            raise RuntimeError("VNC client not connected")
+        client = await self._wait_for_client()
+        self._mark_input()
 
-        self.client.mouse.move(x, y)
-        self.client.mouse.click()
+        client.mouse.move(x, y)
+        client.mouse.click()
         await asyncio.sleep(0.1)
-        self.client.mouse.click()
-        await self.client.drain()
+        client.mouse.click()
+        await client.drain()
 
     async def scroll(self, x, y, scroll_x, scroll_y):
         """Scroll at position"""
-        if not self.client:
-            raise RuntimeError("VNC client not connected")
+        client = await self._wait_for_client()
+        self._mark_input()
 
-        self.client.mouse.move(x, y)
+        client.mouse.move(x, y)
 
         if scroll_y != 0:
             scroll_amount = abs(scroll_y) // 10
@@ -330,47 +657,49 @@ class _VNCConnectionManager:
 
             for _ in range(scroll_amount):
                 if scroll_y > 0:
-                    self.client.mouse.scroll_up()
+                    client.mouse.scroll_up()
                 else:
-                    self.client.mouse.scroll_down()
+                    client.mouse.scroll_down()
 
-        await self.client.drain()
+        await client.drain()
 
     async def type(self, text):
         """Type text"""
-        if not self.client:
-            raise RuntimeError("VNC client not connected")
+        client = await self._wait_for_client()
+        self._mark_input()
 
-        self.client.keyboard.write(text)
-        await self.client.drain()
+        client.keyboard.write(text)
+        await client.drain()
 
     async def move(self, x, y):
         """Move mouse to position"""
-        if not self.client:
-            raise RuntimeError("VNC client not connected")
+        client = await self._wait_for_client()
+        self._mark_input()
 
-        self.client.mouse.move(x, y)
-        await self.client.drain()
+        client.mouse.move(x, y)
+        await client.drain()
 
     async def drag(self, path):
         """Drag along path"""
-        if not self.client or not path or len(path) < 2:
+        if not path or len(path) < 2:
             return
+        client = await self._wait_for_client()
+        self._mark_input()
 
         start_x, start_y = path[0]
-        self.client.mouse.move(start_x, start_y)
+        client.mouse.move(start_x, start_y)
 
-        with self.client.mouse.hold():
+        with client.mouse.hold():
             for x, y in path[1:]:
-                self.client.mouse.move(x, y)
+                client.mouse.move(x, y)
                 await asyncio.sleep(0.01)
 
-        await self.client.drain()
+        await client.drain()
 
     async def keypress(self, keys):
         """Press keys"""
-        if not self.client:
-            raise RuntimeError("VNC client not connected")
+        client = await self._wait_for_client()
+        self._mark_input()
 
-        self.client.keyboard.press(*keys)
-        await self.client.drain()
+        client.keyboard.press(*keys)
+        await client.drain()